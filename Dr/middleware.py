@@ -0,0 +1,278 @@
+import json
+import logging
+import random
+import re
+from collections import Counter
+from contextvars import ContextVar
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+logger = logging.getLogger('Dr.sql')
+
+DEFAULTS = {
+    'ENABLED': True,
+    'SAMPLE_RATE': 1.0,  # O‘lchanadigan so‘rovlar ulushi (0..1); tanlanmagan so‘rovlarga deyarli xarajat yo‘q
+    'N_PLUS_ONE_THRESHOLD': 5,  # Bir xil ko‘rinishdagi so‘rov shuncha marta takrorlansa N+1 deb belgilanadi
+    'SERVER_TIMING': True,  # `Server-Timing` sarlavhasini qo‘shish
+}
+
+# Joriy HTTP so‘rovining statistikasi: async view'larda ORM boshqa oqimda ishlasa ham kontekst bilan o‘tadi
+_current_stats = ContextVar('sql_instrumentation_stats', default=None)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LIST_RE = re.compile(r'\((?:\s*(?:%s|\?)\s*,)*\s*(?:%s|\?)\s*\)')
+_SPACES_RE = re.compile(r'\s+')
+
+
+def get_settings():
+    return {**DEFAULTS, **getattr(settings, 'SQL_INSTRUMENTATION', {})}
+
+
+def fingerprint(sql):
+    """So‘rov ko‘rinishi: qiymatlar va IN ro‘yxati uzunligi olib tashlangan SQL"""
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _PLACEHOLDER_LIST_RE.sub('(...)', sql)
+    return _SPACES_RE.sub(' ', sql.replace('%s', '?')).strip()
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def record(self, sql, duration):
+        self.count += 1
+        self.duration += duration
+        self.shapes[fingerprint(sql)] += 1
+
+    def duplicates(self, threshold):
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+def record_query(execute, sql, params, many, context):
+    """Bazaga yuboriladigan har bir so‘rov uchun execute_wrapper (o‘lchanmayotgan so‘rovlarda faqat o‘tkazib yuboradi)"""
+    stats = _current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.record(sql, perf_counter() - started)
+
+
+def install_wrapper(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+connection_created.connect(install_wrapper, dispatch_uid='Dr.middleware.install_wrapper')
+
+
+class SQLInstrumentationMiddleware:
+    """
+    Har bir (tanlangan) so‘rov uchun SQL so‘rovlar soni, bazada o‘tgan vaqt va takrorlanuvchi
+    so‘rov ko‘rinishlarini yig‘adi: `Server-Timing` sarlavhasi va `Dr.sql` logiga bitta JSON qator yoziladi.
+    Bir xil ko‘rinishdagi so‘rov `N_PLUS_ONE_THRESHOLD` martadan ko‘p bo‘lsa, log WARNING darajasida chiqadi.
+    Sync va async (ASGI) view'lar bilan ishlaydi.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        stats, token, started = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            if token is not None:
+                _current_stats.reset(token)
+        return self.finish(request, response, stats, started)
+
+    async def __acall__(self, request):
+        stats, token, started = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            if token is not None:
+                _current_stats.reset(token)
+        return self.finish(request, response, stats, started)
+
+    def start(self):
+        config = get_settings()
+        if not config['ENABLED'] or random.random() >= config['SAMPLE_RATE']:
+            return None, None, None
+        # Middleware yuklanishidan oldin ochilgan ulanishlar (connection_created o‘tib ketgan) uchun
+        for connection in connections.all(initialized_only=True):
+            install_wrapper(connection)
+        stats = QueryStats()
+        return stats, _current_stats.set(stats), perf_counter()
+
+    def finish(self, request, response, stats, started):
+        if stats is None:
+            return response
+        config = get_settings()
+        total_ms = (perf_counter() - started) * 1000
+        db_ms = stats.duration * 1000
+        duplicates = stats.duplicates(config['N_PLUS_ONE_THRESHOLD'])
+
+        if config['SERVER_TIMING']:
+            timing = f'db;desc="{stats.count} queries";dur={db_ms:.2f}, total;dur={total_ms:.2f}'
+            response['Server-Timing'] = ', '.join(filter(None, [response.get('Server-Timing'), timing]))
+
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': stats.count,
+            'db_ms': round(db_ms, 2),
+            'total_ms': round(total_ms, 2),
+        }
+        if duplicates:
+            record['n_plus_one'] = [{'sql': shape[:300], 'count': count} for shape, count in duplicates]
+        logger.log(logging.WARNING if duplicates else logging.INFO, json.dumps(record, ensure_ascii=False))
+        return response
+
+
+COMPRESSION_DEFAULTS = {
+    'MIN_SIZE': 1024,  # Bundan kichik javoblar siqilmaydi (baytda)
+    # BREACH'ga qarshi gzip sarlavhasiga qo‘shiladigan tasodifiy uzunlikdagi to‘ldirma (Django GZipMiddleware kabi)
+    'MAX_RANDOM_BYTES': 100,
+    # O‘zi siqilgan formatlar (rasm, zip/xlsx) qayta siqilmaydi
+    'EXCLUDED_TYPES': ('image/', 'video/', 'audio/', 'application/zip', 'application/gzip',
+                       'application/vnd.openxmlformats-officedocument.'),
+}
+
+
+def get_compression_settings():
+    return {**COMPRESSION_DEFAULTS, **getattr(settings, 'RESPONSE_COMPRESSION', {})}
+
+
+def compression(enabled=True, min_size=None):
+    """
+    View uchun siqish sozlamasi: `@compression(False)` o‘chiradi, `@compression(min_size=256)` chegarani o‘zgartiradi.
+    Klass view'larda `compression = False` yoki `compression = 256` atributi ham shu ma’noda ishlaydi.
+    """
+    def decorator(view_func):
+        view_func.compression = min_size if enabled and min_size is not None else enabled
+        return view_func
+    return decorator
+
+
+_ENCODED_ETAG_RE = re.compile(r'-(gzip)"')
+
+
+def strip_encoded_etags(request):
+    """
+    Siqilgan javob ETag'i `"<etag>-gzip"` ko‘rinishida: view solishtira olishi uchun `If-None-Match` dagi
+    qo‘shimcha olib tashlanadi, kodlash esa 304 javobiga qaytarish uchun `request.etag_encoding` da saqlanadi.
+    """
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    match = header and _ENCODED_ETAG_RE.search(header)
+    if match:
+        request.META['HTTP_IF_NONE_MATCH'] = _ENCODED_ETAG_RE.sub('"', header)
+        request.etag_encoding = match.group(1)
+
+
+def encoded_etag(response, encoding):
+    """Kuchli ETag'ga kodlash qo‘shimchasi: har bir kodlashdagi tana o‘zining kuchli ETag'iga ega bo‘ladi"""
+    etag = response.get('ETag')
+    if etag and etag.startswith('"') and etag.endswith('"'):
+        response['ETag'] = f'{etag[:-1]}-{encoding}"'
+
+
+def negotiate_encoding(accept_encoding, supported=('gzip',)):
+    """`Accept-Encoding` bo‘yicha eng yuqori `q` qiymatli qo‘llab-quvvatlanadigan kodlash (teng bo‘lsa birinchisi)"""
+    weights = {}
+    for item in accept_encoding.split(','):
+        coding, _, params = item.strip().partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        weights[coding.strip().lower()] = quality
+    default = weights.get('*', 0.0)
+    ranked = [(weights.get(coding, default), coding) for coding in supported]
+    quality, coding = max(ranked, key=lambda pair: pair[0])
+    return coding if quality > 0 else None
+
+
+class CompressionMiddleware:
+    """
+    Klient qabul qilsa javobni gzip bilan siqish. `MIN_SIZE` dan kichik, streaming, allaqachon siqilgan
+    yoki siqilgan turdagi javoblar tegilmaydi; view o‘zi o‘chirishi mumkin (`compression`).
+
+    BREACH: deyarli barcha javoblar token bilan so‘ralgan va so‘rovdagi qiymatlarni (qidiruv va h.k.) qaytaradi.
+    Himoya — gzip Django'ning `compress_string` i bilan tasodifiy uzunlikdagi to‘ldirma qo‘shib siqiladi.
+    Brotli ishlatilmaydi: unga bunday to‘ldirma qo‘shib bo‘lmaydi, token'li trafikka esa berib bo‘lmas edi.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        strip_encoded_etags(request)
+        return self.compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        strip_encoded_etags(request)
+        return self.compress(request, await self.get_response(request))
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None)
+        request.compression = getattr(view_func, 'compression', getattr(view_class, 'compression', True))
+
+    def compress(self, request, response):
+        if response.status_code == 304 and getattr(request, 'etag_encoding', None):
+            # Klientdagi siqilgan nusxa tasdiqlandi: unga o‘sha nusxaning ETag'i qaytariladi
+            patch_vary_headers(response, ('Accept-Encoding',))
+            encoded_etag(response, request.etag_encoding)
+            return response
+        option = getattr(request, 'compression', True)
+        if option is False or response.streaming or response.has_header('Content-Encoding'):
+            return response
+        config = get_compression_settings()
+        min_size = config['MIN_SIZE'] if option is True else option
+        content_type = response.get('Content-Type', '').lower()
+        if len(response.content) < min_size or content_type.startswith(config['EXCLUDED_TYPES']):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if negotiate_encoding(request.META.get('HTTP_ACCEPT_ENCODING', '')) != 'gzip':
+            return response
+        content = compress_string(response.content, max_random_bytes=config['MAX_RANDOM_BYTES'])
+        if len(content) >= len(response.content):
+            return response
+
+        response.content = content
+        response['Content-Length'] = str(len(content))
+        response['Content-Encoding'] = 'gzip'
+        encoded_etag(response, 'gzip')  # Siqilgan tana bayt-bayt boshqa: ETag ham boshqa bo‘lishi kerak
+        return response
@@ -0,0 +1,42 @@
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# Datetime'lar orjson'ning o‘zida (UTC uchun `Z`, DRF kabi), qolgan turlar (Decimal, lazy matn, QuerySet, ...)
+# DRF JSONEncoder orqali kodlanadi, shuning uchun natija stdlib json bilan bir xil
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+_default = JSONEncoder().default
+
+
+def dumps(data):
+    """DRF JSONRenderer bilan bir xil JSON baytlari (ixcham, ensure_ascii'siz, \\u2028/\\u2029 ekranlangan)"""
+    return (orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+            .replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029'))
+
+
+class ORJSONRenderer(JSONRenderer):
+    """orjson bilan JSON render qilish; `indent` so‘ralsa (browsable API) DRF'ning o‘z renderiga o‘tiladi"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.ensure_ascii or not self.compact or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
+
+
+class ORJSONParser(JSONParser):
+    """orjson bilan JSON o‘qish (faqat UTF-8; boshqa kodlashlar DRF parseriga qoladi)"""
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        if encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -9,9 +9,12 @@ https://docs.djangoproject.com/en/5.1/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
+import os
 from datetime import timedelta
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -35,6 +38,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'rest_framework_simplejwt.token_blacklist',
@@ -45,9 +49,12 @@ INSTALLED_APPS = [
 
     'employee',
     'monitoring',
+    'jobs',
 ]
 
 MIDDLEWARE = [
+    'Dr.middleware.SQLInstrumentationMiddleware',  # Birinchi: butun so‘rov vaqtini o‘lchaydi
+    'Dr.middleware.CompressionMiddleware',  # Tanani o‘qiydigan/o‘zgartiradigan middleware'lardan oldin
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -96,7 +103,79 @@ DATABASES = {
         "PASSWORD": "password_dr",  # Parol (compose fayldagi POSTGRES_PASSWORD)
         "HOST": "dr_db",  # Docker compose ichidagi servis nomi
         "PORT": "5432",  # PostgreSQL standarti port
+        # PgBouncer (transaction pooling) orqasida server tomonidagi cursor'lar ishlamaydi
+        "DISABLE_SERVER_SIDE_CURSORS": os.environ.get("DB_DISABLE_SERVER_SIDE_CURSORS") == "1",
+    }
+}
+
+# Ulanishlar pool'i (psycopg 3): har bir so‘rov uchun yangi TCP+auth ulanish ochilmaydi,
+# so‘rov tugagach ulanish pool'ga qaytadi. Pool bilan CONN_MAX_AGE 0 bo‘lib qolishi kerak.
+# Hozircha o‘chiq: yutug‘i o‘lchanmagan. DB_POOL=1 bilan yoqishdan oldin ishlab turgan serverda ikkala holatni
+# solishtiring: `benchmark_api --base-url ... --output pool-0.json`, keyin DB_POOL=1 bilan
+# `benchmark_api --base-url ... --output pool-1.json --compare pool-0.json`.
+if os.environ.get("DB_POOL", "0") == "1":
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True  # Pool ulanishni berishdan oldin tirikligini tekshiradi
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", 2)),
+            "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", 10)),  # Har bir worker jarayoni uchun
+            "timeout": float(os.environ.get("DB_POOL_TIMEOUT", 10)),  # Bo‘sh ulanishni kutish (s)
+            "max_idle": 300,
+            "max_lifetime": 1800,
+        },
     }
+
+# Cache
+# Redis (docker-compose'dagi `redis` servisi) berilmasa, lokal xotira keshi ishlatiladi
+
+REDIS_URL = os.environ.get("REDIS_URL")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    # Lokal kesh har bir jarayonda alohida: bir nechta worker'da bittasidagi invalidatsiya (ma’lumotnoma
+    # versiyalari, foydalanuvchi keshi) boshqalariga yetib bormaydi va ular eski ma’lumotni beradi
+    if int(os.environ.get("WEB_CONCURRENCY", 1)) > 1:
+        raise ImproperlyConfigured("WEB_CONCURRENCY > 1 bo‘lsa umumiy kesh uchun REDIS_URL berilishi kerak")
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# So‘rovlar bo‘yicha SQL statistikasi (Dr.middleware): productionda faqat ulush bilan
+SQL_INSTRUMENTATION = {
+    "SAMPLE_RATE": float(os.environ.get("SQL_INSTRUMENTATION_SAMPLE_RATE", 1.0 if DEBUG else 0.1)),
+    "N_PLUS_ONE_THRESHOLD": 5,
+}
+
+# Javoblarni gzip bilan siqish (Dr.middleware.CompressionMiddleware)
+RESPONSE_COMPRESSION = {
+    "MIN_SIZE": int(os.environ.get("RESPONSE_COMPRESSION_MIN_SIZE", 1024)),
+}
+
+# WARNING: faqat N+1 belgilangan so‘rovlar; SQL_LOG_LEVEL=INFO bo‘lsa har bir o‘lchangan so‘rov logga yoziladi
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "Dr.sql": {"handlers": ["console"], "level": os.environ.get("SQL_LOG_LEVEL", "WARNING"), "propagate": False},
+    },
+}
+
+# Fon vazifalari (jobs ilovasi)
+# Redis bo‘lmasa vazifalar commit'dan keyin shu jarayonning fon oqimida bajariladi (alohida worker'siz).
+# JOBS_EAGER=1 — faqat testlar uchun: vazifa commit'dan keyin so‘rov oqimining o‘zida bajariladi
+
+JOBS = {
+    "EAGER": os.environ.get("JOBS_EAGER") == "1",
+    "QUEUE": "default",
 }
 
 # Password validation
@@ -140,14 +219,26 @@ STATICFILES_DIRS = [
 MEDIA_URL = "/media/"
 MEDIA_ROOT = f'{BASE_DIR}/mediafiles'
 
+# Multipart orqali yuklanadigan bemor rasmining maksimal hajmi (baytda)
+PATIENT_PHOTO_MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': (
+        'Dr.renderers.ORJSONRenderer',  # stdlib json bilan bir xil natija, lekin tezroq
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'Dr.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'employee.authentication.CachedJWTAuthentication',  # Foydalanuvchi keshdan olinadi
     ),
 }
 
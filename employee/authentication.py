@@ -0,0 +1,62 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+USER_CACHE_TIMEOUT = 60 * 5  # Signal chetlab o‘tilganda (queryset.update) ham shu vaqtdan keyin yangilanadi
+# Keshga faqat ruxsatlar uchun kerakli maydonlar yoziladi (parol xeshi emas); qolganlari so‘ralganda bazadan
+CACHED_USER_FIELDS = ('id', 'username', 'role', 'is_active', 'is_staff', 'is_superuser')
+
+
+def user_cache_key(user_id):
+    return f'auth:user-fields:{user_id}'
+
+
+def invalidate_user_cache(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
+def tokens_for_user(user):
+    """Refresh/access tokenlar juftligi: `role` va `is_superuser` ham tokenga yoziladi"""
+    refresh = RefreshToken.for_user(user)
+    refresh['role'] = user.role
+    refresh['is_superuser'] = user.is_superuser
+    return refresh
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT autentifikatsiyasi: foydalanuvchi har so‘rovda bazadan emas, qisqa muddatli keshdan olinadi.
+    Kesh foydalanuvchi saqlanganda/o‘chirilganda (employee.signals) va logout'da tozalanadi.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        data = cache.get(user_cache_key(user_id)) if user_id is not None else None
+        if data is None:
+            user = super().get_user(validated_token)  # Topilmasa yoki faol bo‘lmasa xato beradi
+            data = {name: getattr(user, name) for name in CACHED_USER_FIELDS}
+            if api_settings.CHECK_REVOKE_TOKEN:
+                data['password_md5'] = get_md5_hash_password(user.password)  # Tokendagi qiymat bilan bir xil
+            cache.set(user_cache_key(user_id), data, USER_CACHE_TIMEOUT)
+            return user
+
+        # Keshdagi foydalanuvchi uchun ham simplejwt tekshiruvlari
+        if api_settings.CHECK_USER_IS_ACTIVE and not data['is_active']:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and (
+                validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != data.get('password_md5')):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return self.user_from_cache(data)
+
+    @staticmethod
+    def user_from_cache(data):
+        """Keshdagi maydonlardan foydalanuvchi; qolgan maydonlar (deferred) murojaat qilinganda yuklanadi"""
+        User = get_user_model()
+        names = [field.attname for field in User._meta.concrete_fields if field.attname in data]
+        return User.from_db(router.db_for_read(User), names, [data[name] for name in names])
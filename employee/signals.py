@@ -0,0 +1,16 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import invalidate_user_cache
+
+
+@receiver([post_save, post_delete], sender=get_user_model())
+def invalidate_user(sender, instance, **kwargs):
+    """
+    Foydalanuvchi o‘zgarsa (rol, faollik, parol) autentifikatsiya keshini commit'dan keyin tozalash:
+    aks holda parallel so‘rov o‘zgarishdan oldingi foydalanuvchini qayta keshlab qo‘yishi mumkin.
+    """
+    user_id = instance.pk  # O‘chirilgandan keyin instance.pk None bo‘ladi
+    transaction.on_commit(lambda: invalidate_user_cache(user_id))
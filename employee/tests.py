@@ -1,3 +1,105 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+from monitoring.models import Patient
+from monitoring.tests import QueryBudgetMixin
+
+from .authentication import user_cache_key
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Employee endpointlari uchun so‘rovlar soni byudjeti (1 va 100 foydalanuvchi bilan)"""
+    rows = 1
+    BUDGETS = {'login': 3, 'logout': 5, 'users': 0}
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        User.objects.bulk_create([User(username=f'user{i}', role='doctor') for i in range(cls.rows - 1)])
+        cls.user = User.objects.create_user(username='doctor', password='parol', role='doctor')
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def check(self, name, method, path, data=None):
+        with self.assertMaxQueries(self.BUDGETS[name], f'{name} ({self.rows} qator)'):
+            response = getattr(self.client, method)(path, data, format='json')
+        self.assertLess(response.status_code, 400, name)
+        return response
+
+    def test_login_logout(self):
+        tokens = self.check('login', 'post', '/employee/login/', {'username': 'doctor', 'password': 'parol'}).data
+        self.client.force_authenticate(self.user)
+        self.check('logout', 'post', '/employee/logout/', {'refresh': tokens['refresh']})
+
+    def test_users(self):
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.check('users', 'get', '/employee/users/').data['username'], 'doctor')
+
+
+class QueryBudget100RowsTests(QueryBudgetTests):
+    rows = 100
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='admin', password='parol', role='admin',
+                                                        is_superuser=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.tokens = self.client.post('/employee/login/', {'username': 'admin', 'password': 'parol'}).data
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.tokens["access"]}')
+
+    def test_user_is_loaded_once(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get('/employee/users/').status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/employee/users/').data['username'], 'admin')
+
+    def test_token_carries_role_claims(self):
+        token = AccessToken(self.tokens['access'])
+        self.assertEqual((token['role'], token['is_superuser']), ('admin', True))
+
+    def test_cache_holds_no_password_hash(self):
+        self.client.get('/employee/users/')
+        cached = cache.get(user_cache_key(self.user.pk))
+        self.assertEqual(set(cached), {'id', 'username', 'role', 'is_active', 'is_staff', 'is_superuser'})
+
+        request_user = self.client.get('/employee/users/').wsgi_request.user
+        self.assertEqual((request_user.pk, request_user.role, request_user.is_superuser), (self.user.pk, 'admin', True))
+        with self.assertNumQueries(1):  # Keshda yo‘q maydon bazadan yuklanadi
+            self.assertEqual(request_user.password, self.user.password)
+
+    def test_cache_is_invalidated_after_commit(self):
+        self.client.get('/employee/users/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+            self.assertIsNotNone(cache.get(user_cache_key(self.user.pk)))  # Commit'gacha tegilmaydi
+        self.assertEqual(self.client.get('/employee/users/').status_code, 401)
+
+    def test_cache_is_invalidated_on_delete(self):
+        self.client.get('/employee/users/')
+        user_id = self.user.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        self.assertIsNone(cache.get(user_cache_key(user_id)))
+
+    def test_cache_is_invalidated_on_logout(self):
+        self.client.get('/employee/users/')
+        self.client.post('/employee/logout/', {'refresh': self.tokens['refresh']})
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+
+    def test_patient_detail_reads_current_superuser_flag(self):
+        url = f'/monitoring/patients/{Patient.objects.create(full_name="Ali", phone_number="1").pk}/'
+        self.assertIs(self.client.get(url).data['is_superuser'], True)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_superuser = False
+            self.user.save()
+        self.assertIs(self.client.get(url).data['is_superuser'], False)  # Token claim'i hali True
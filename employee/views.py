@@ -3,11 +3,13 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import status
 from rest_framework.permissions import AllowAny
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth.models import update_last_login
 from django.contrib.auth import get_user_model
 
 from rest_framework.permissions import IsAuthenticated
+from .authentication import invalidate_user_cache, tokens_for_user
 from .serializers import UserSimpleSerializer
 
 User = get_user_model()
@@ -23,7 +25,7 @@ class LoginView(APIView):
 
         user = authenticate(request, username=username, password=password)
         if user is not None:
-            refresh = RefreshToken.for_user(user)
+            refresh = tokens_for_user(user)
             update_last_login(None, user)
 
             return Response({
@@ -40,6 +42,7 @@ class LogoutView(APIView):
             refresh_token = request.data.get("refresh")
             token = RefreshToken(refresh_token)
             token.blacklist()  # Tokenni qora ro‘yxatga qo‘shish
+            invalidate_user_cache(token[api_settings.USER_ID_CLAIM])
             return Response({"message": "Logout muvaffaqiyatli!"}, status=status.HTTP_205_RESET_CONTENT)
         except Exception:
             return Response({"error": "Noto‘g‘ri token!"}, status=status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,152 @@
+import json
+import threading
+import time
+from collections import deque
+
+
+class RedisBackend:
+    """
+    Redis'dagi navbat: vazifalar ro‘yxati (LPUSH/BRPOP), qayta urinishlar uchun vaqt bo‘yicha
+    tartiblangan to‘plam (ZSET) va muvaffaqiyatsiz vazifalar uchun "dead-letter" ro‘yxati.
+    """
+
+    def __init__(self, url, queue='default'):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.queue_key = f'jobs:{queue}'
+        self.scheduled_key = f'jobs:{queue}:scheduled'
+        self.dead_key = f'jobs:{queue}:dead'
+
+    def push(self, payload):
+        self.client.lpush(self.queue_key, json.dumps(payload))
+
+    def pop(self, timeout):
+        item = self.client.brpop([self.queue_key], timeout=timeout)
+        return json.loads(item[1]) if item else None
+
+    def schedule(self, payload, eta):
+        self.client.zadd(self.scheduled_key, {json.dumps(payload): eta})
+
+    def promote_due(self, now=None):
+        """Vaqti kelgan qayta urinishlarni asosiy navbatga o‘tkazish (ZREM bir nechta worker'da ham bitta marta)"""
+        for item in self.client.zrangebyscore(self.scheduled_key, 0, now or time.time(), start=0, num=100):
+            if self.client.zrem(self.scheduled_key, item):
+                self.client.lpush(self.queue_key, item)
+
+    def bury(self, payload):
+        self.client.lpush(self.dead_key, json.dumps(payload))
+
+    def dead_letters(self):
+        return [json.loads(item) for item in self.client.lrange(self.dead_key, 0, -1)]
+
+    def requeue_dead(self):
+        count = 0
+        while self.client.rpoplpush(self.dead_key, self.queue_key):
+            count += 1
+        return count
+
+    def purge_dead(self):
+        return self.client.delete(self.dead_key)
+
+    def acquire(self, key, ttl):
+        """`ttl` soniya davomida faqat bitta worker oladigan qulf (davriy vazifalar uchun)"""
+        return bool(self.client.set(f'jobs:lock:{key}', 1, nx=True, ex=max(int(ttl), 1)))
+
+
+class LocalBackend:
+    """
+    Jarayon ichidagi navbat (Redis'siz ishlab chiqish va testlar uchun), RedisBackend bilan bir xil interfeys.
+    `autorun` bo‘lsa birinchi push'da jarayon uchun bitta uzoq yashovchi worker oqimi ishga tushadi: u navbatni,
+    qayta urinishlarni va davriy vazifalarni bajaradi. Navbat xotirada: jarayon to‘xtasa bajarilmagan
+    vazifalar yo‘qoladi, shuning uchun production'da REDIS_URL kerak.
+    """
+
+    def __init__(self, queue='default', autorun=False):
+        self.queue = deque()
+        self.scheduled = []
+        self.dead = []
+        self.locks = {}
+        self.autorun = autorun
+        self.ready = threading.Condition()
+        self.thread = None
+        self.stopped = threading.Event()
+
+    def push(self, payload):
+        with self.ready:
+            self.queue.appendleft(json.loads(json.dumps(payload)))
+            self.ready.notify()
+        if self.autorun and self.thread is None:
+            self.start()
+
+    def pop(self, timeout):
+        with self.ready:
+            if not self.queue and timeout:
+                self.ready.wait(timeout)
+            return self.queue.pop() if self.queue else None
+
+    def start(self):
+        """Worker oqimini ishga tushirish (jarayonda bittadan ortiq bo‘lmaydi)"""
+        with self.ready:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run_worker, name='jobs-local-worker', daemon=True)
+                self.thread.start()
+
+    def stop(self, timeout=None):
+        self.stopped.set()
+        with self.ready:
+            self.ready.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def run_worker(self):
+        from django.db import connections
+
+        from .worker import Worker, logger
+
+        worker = Worker(self, poll_timeout=1)
+        try:
+            while not self.stopped.is_set():
+                try:
+                    worker.run_once()
+                except Exception:  # Oqim to‘xtab qolmasligi kerak; vazifa xatolari execute() ichida ushlanadi
+                    logger.exception("Lokal worker xatosi")
+        finally:
+            connections.close_all()
+
+    def schedule(self, payload, eta):
+        self.scheduled.append((eta, json.loads(json.dumps(payload))))
+
+    def promote_due(self, now=None):
+        now = now or time.time()
+        with self.ready:
+            due = [item for item in self.scheduled if item[0] <= now]
+            self.scheduled = [item for item in self.scheduled if item[0] > now]
+            for _, payload in sorted(due, key=lambda item: item[0]):
+                self.queue.appendleft(payload)
+            self.ready.notify_all()
+
+    def bury(self, payload):
+        self.dead.insert(0, json.loads(json.dumps(payload)))
+
+    def dead_letters(self):
+        return list(self.dead)
+
+    def requeue_dead(self):
+        with self.ready:
+            count = len(self.dead)
+            while self.dead:
+                self.queue.appendleft(self.dead.pop())
+            self.ready.notify_all()
+        return count
+
+    def purge_dead(self):
+        count, self.dead = len(self.dead), []
+        return count
+
+    def acquire(self, key, ttl):
+        now = time.time()
+        if self.locks.get(key, 0) > now:
+            return False
+        self.locks[key] = now + ttl
+        return True
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from jobs.queue import get_backend
+
+
+class Command(BaseCommand):
+    help = "Dead-letter ro‘yxatidagi vazifalarni ko‘rsatadi, qayta navbatga qo‘yadi yoki tozalaydi"
+
+    def add_arguments(self, parser):
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument('--requeue', action='store_true', help="Barcha vazifalarni qayta navbatga qo‘yish")
+        group.add_argument('--purge', action='store_true', help="Ro‘yxatni tozalash")
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        if options['requeue']:
+            self.stdout.write(self.style.SUCCESS(f"Qayta navbatga qo‘yildi: {backend.requeue_dead()}"))
+        elif options['purge']:
+            backend.purge_dead()
+            self.stdout.write(self.style.SUCCESS("Dead-letter ro‘yxati tozalandi"))
+        else:
+            for payload in backend.dead_letters():
+                error = (payload.get('error') or '').strip().splitlines()
+                self.stdout.write(f"{payload['id']} {payload['job']} urinishlar={payload['attempts']} "
+                                  f"{error[-1] if error else ''}")
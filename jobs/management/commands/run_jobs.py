@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from jobs.queue import get_backend, get_settings
+from jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = "Fon vazifalari worker'ini ishga tushiradi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--burst', action='store_true', help="Navbat bo‘shaganda to‘xtash")
+        parser.add_argument('--poll-timeout', type=int, default=5, help="Navbatni kutish vaqti (soniya)")
+
+    def handle(self, *args, **options):
+        config = get_settings()
+        backend = get_backend()
+        if not config['REDIS_URL']:
+            self.stderr.write("REDIS_URL berilmagan: jarayon ichidagi navbat boshqa jarayonlar bilan bo‘lishilmaydi")
+            backend.autorun = False  # Navbatni shu buyruqning o‘zi bajaradi, qo‘shimcha oqim kerak emas
+        self.stdout.write(f"Worker ishga tushdi (navbat: {config['QUEUE']})")
+        Worker(backend, poll_timeout=options['poll_timeout']).run(burst=options['burst'])
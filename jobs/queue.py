@@ -0,0 +1,111 @@
+import json
+import time
+import uuid
+
+from django.conf import settings
+from django.db import transaction
+
+from .backends import LocalBackend, RedisBackend
+
+DEFAULTS = {
+    'EAGER': False,  # True bo‘lsa vazifa navbatga qo‘yilmay, commit'dan keyin shu oqimda bajariladi (testlar uchun)
+    'QUEUE': 'default',
+    'REDIS_URL': None,
+    'MAX_RETRIES': 3,
+    'RETRY_DELAY': 10,  # Soniya; har bir keyingi urinishda ikki barobar oshadi
+}
+
+_registry = {}
+_backend = None
+
+
+def get_settings():
+    return {**DEFAULTS, 'REDIS_URL': getattr(settings, 'REDIS_URL', None), **getattr(settings, 'JOBS', {})}
+
+
+def get_backend():
+    """Sozlamalar bo‘yicha navbat backend'i (Redis bo‘lmasa jarayon ichidagi navbat)"""
+    global _backend
+    if _backend is None:
+        config = get_settings()
+        if config['REDIS_URL']:
+            _backend = RedisBackend(config['REDIS_URL'], config['QUEUE'])
+        else:
+            _backend = LocalBackend(config['QUEUE'], autorun=True)  # Worker jarayoni yo‘q: fon oqimida bajariladi
+    return _backend
+
+
+class Job:
+    def __init__(self, func, name, max_retries, retry_delay, interval):
+        self.func = func
+        self.name = name
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.interval = interval  # Davriy vazifa bo‘lsa, soniyalarda
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        """Vazifani navbatga qo‘yish"""
+        return enqueue(self.name, *args, **kwargs)
+
+    def __repr__(self):
+        return f'<Job {self.name}>'
+
+
+def job(name=None, max_retries=None, retry_delay=None, interval=None):
+    """
+    Funksiyani fon vazifasi sifatida ro‘yxatga olish. Argumentlar JSON'ga o‘girilishi kerak.
+    `interval` berilsa, worker uni har `interval` soniyada bir marta (barcha worker'lar bo‘yicha) ishga tushiradi.
+    """
+    config = get_settings()
+
+    def decorator(func):
+        registered = Job(
+            func,
+            name or f'{func.__module__}.{func.__name__}',
+            config['MAX_RETRIES'] if max_retries is None else max_retries,
+            config['RETRY_DELAY'] if retry_delay is None else retry_delay,
+            interval,
+        )
+        _registry[registered.name] = registered
+        return registered
+
+    return decorator
+
+
+def get_job(name):
+    return _registry[name]
+
+
+def registered_jobs():
+    return dict(_registry)
+
+
+def make_payload(name, args=(), kwargs=None):
+    payload = {
+        'id': uuid.uuid4().hex,
+        'job': name,
+        'args': list(args),
+        'kwargs': kwargs or {},
+        'attempts': 0,
+        'enqueued_at': time.time(),
+    }
+    json.dumps(payload)  # Serializatsiya bo‘lmaydigan argumentlar navbatga qo‘yishda aniqlansin
+    return payload
+
+
+def enqueue(name, *args, **kwargs):
+    """
+    Vazifani navbatga qo‘yish. Navbatga yozish tranzaksiya muvaffaqiyatli yakunlangach bajariladi,
+    shuning uchun worker hali saqlanmagan ma’lumotni ko‘rmaydi (tranzaksiya bekor qilinsa vazifa ham bekor).
+    EAGER rejimida ham commit kutiladi, keyin vazifa navbatsiz shu oqimda bajariladi.
+    """
+    registered = get_job(name)
+    payload = make_payload(name, args, kwargs)
+    if get_settings()['EAGER']:
+        transaction.on_commit(lambda: registered.func(*payload['args'], **payload['kwargs']))
+    else:
+        transaction.on_commit(lambda: get_backend().push(payload))
+    return payload['id']
@@ -0,0 +1,108 @@
+import threading
+import time
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from .backends import LocalBackend
+from .queue import enqueue, job, make_payload
+from .worker import Worker
+
+calls = []
+
+
+@job(name='jobs.tests.record', max_retries=2, retry_delay=0)
+def record(value):
+    calls.append(value)
+
+
+@job(name='jobs.tests.fail', max_retries=2, retry_delay=0)
+def fail():
+    raise RuntimeError("xato")
+
+
+@job(name='jobs.tests.periodic', interval=60)
+def periodic():
+    calls.append('periodic')
+
+
+class WorkerTests(TestCase):
+    def setUp(self):
+        calls.clear()
+        self.backend = LocalBackend()
+        self.worker = Worker(self.backend, poll_timeout=0)
+
+    def test_executes_queued_job(self):
+        self.backend.push(make_payload('jobs.tests.record', [1]))
+        while self.worker.run_once():
+            pass
+        self.assertIn(1, calls)
+        self.assertFalse(self.backend.queue)
+        self.assertFalse(self.backend.dead_letters())
+
+    def test_retries_then_dead_letters(self):
+        self.backend.push(make_payload('jobs.tests.fail'))
+        while self.worker.run_once():
+            pass
+        dead, = self.backend.dead_letters()
+        self.assertEqual(dead['attempts'], 3)  # Birinchi urinish + 2 ta qayta urinish
+        self.assertIn('RuntimeError', dead['error'])
+
+        self.assertEqual(self.backend.requeue_dead(), 1)
+        self.assertEqual(len(self.backend.queue), 1)
+
+    def test_unknown_job_goes_to_dead_letters(self):
+        self.backend.push({**make_payload('jobs.tests.record'), 'job': 'missing'})
+        while self.worker.run_once():
+            pass
+        dead, = self.backend.dead_letters()
+        self.assertEqual(dead['job'], 'missing')
+
+    def test_periodic_job_runs_once_per_interval(self):
+        # Navbatda boshqa ilovalarning davriy vazifalari ham bo‘ladi: hammasi bajarilguncha
+        while self.worker.run_once():
+            pass
+        self.worker.run_once()
+        self.assertEqual(calls.count('periodic'), 1)
+
+
+class EnqueueTests(TestCase):
+    @override_settings(JOBS={'EAGER': True})
+    def test_eager_mode_runs_inline_after_commit(self):
+        calls.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            enqueue('jobs.tests.record', 'eager')
+            self.assertEqual(calls, [])
+        self.assertEqual(calls, ['eager'])
+
+        with self.captureOnCommitCallbacks() as callbacks:  # Tranzaksiya bekor qilinsa callback chaqirilmaydi
+            enqueue('jobs.tests.record', 'rolled back')
+        self.assertEqual((len(callbacks), calls), (1, ['eager']))
+
+    def test_local_backend_autorun_uses_one_worker_thread(self):
+        calls.clear()
+        backend = LocalBackend(autorun=True)
+        # Davriy vazifalar (boshqa ilovalarniki ham) bu testda fon oqimida ishga tushmasin
+        with mock.patch('jobs.worker.registered_jobs', return_value={}), \
+                mock.patch('threading.Thread', wraps=threading.Thread) as thread:
+            try:
+                for value in range(5):
+                    backend.push(make_payload('jobs.tests.record', [value]))
+                deadline = time.monotonic() + 5
+                while len(calls) < 5 and time.monotonic() < deadline:
+                    time.sleep(0.01)
+            finally:
+                backend.stop(timeout=5)
+        self.assertEqual(sorted(calls), [0, 1, 2, 3, 4])
+        self.assertEqual(thread.call_count, 1)
+        self.assertFalse(backend.thread.is_alive())
+
+    @override_settings(JOBS={'EAGER': False})
+    def test_job_is_pushed_after_commit(self):
+        backend = LocalBackend()
+        with mock.patch('jobs.queue.get_backend', return_value=backend):
+            with self.captureOnCommitCallbacks(execute=True):
+                record.delay('later')
+                self.assertFalse(backend.queue)
+        payload, = backend.queue
+        self.assertEqual((payload['job'], payload['args']), ('jobs.tests.record', ['later']))
@@ -0,0 +1,78 @@
+import logging
+import signal
+import time
+import traceback
+
+from django.db import close_old_connections
+
+from .queue import get_job, make_payload, registered_jobs
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """
+    Navbatdagi vazifalarni bajaruvchi worker: xatoda kechiktirib qayta urinadi,
+    urinishlar tugasa vazifani dead-letter ro‘yxatiga o‘tkazadi va davriy vazifalarni navbatga qo‘yadi.
+    """
+
+    def __init__(self, backend, poll_timeout=5):
+        self.backend = backend
+        self.poll_timeout = poll_timeout
+        self.stopped = False
+
+    def stop(self, *args):
+        self.stopped = True
+
+    def enqueue_periodic(self):
+        for name, registered in registered_jobs().items():
+            if registered.interval and self.backend.acquire(f'periodic:{name}', registered.interval):
+                self.backend.push(make_payload(name))
+
+    def run_once(self, timeout=None):
+        """Bitta vazifani bajarish; navbat bo‘sh bo‘lsa False qaytaradi"""
+        self.backend.promote_due()
+        self.enqueue_periodic()
+        payload = self.backend.pop(self.poll_timeout if timeout is None else timeout)
+        if payload is None:
+            return False
+        self.execute(payload)
+        return True
+
+    def execute(self, payload):
+        try:
+            registered = get_job(payload['job'])
+        except KeyError:
+            logger.error("Noma’lum vazifa: %s", payload['job'])
+            self.backend.bury({**payload, 'error': 'unknown job'})
+            return
+
+        close_old_connections()
+        started = time.monotonic()
+        try:
+            registered.func(*payload['args'], **payload['kwargs'])
+        except Exception:
+            attempts = payload['attempts'] + 1
+            failed = {**payload, 'attempts': attempts, 'error': traceback.format_exc()}
+            if attempts <= registered.max_retries:
+                delay = registered.retry_delay * 2 ** (attempts - 1)
+                logger.warning("%s (%s) xato, %s s dan keyin qayta urinish %s/%s", registered.name,
+                               payload['id'], delay, attempts, registered.max_retries)
+                self.backend.schedule(failed, time.time() + delay)
+            else:
+                logger.error("%s (%s) dead-letter ro‘yxatiga o‘tkazildi", registered.name, payload['id'])
+                self.backend.bury(failed)
+        else:
+            logger.info("%s (%s) %.1f ms da bajarildi", registered.name, payload['id'],
+                        (time.monotonic() - started) * 1000)
+        finally:
+            close_old_connections()
+
+    def run(self, burst=False):
+        """Worker tsikli; `burst` bo‘lsa navbat bo‘shaganda to‘xtaydi"""
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        while not self.stopped:
+            processed = self.run_once(timeout=1 if burst else None)
+            if burst and not processed:
+                break
@@ -0,0 +1,63 @@
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+from .models import Appointment
+from .planner import plan_queryset
+from .serializers import PatientSerializer
+
+
+def day_range(start_date, end_date):
+    """
+    `[start_date, end_date]` kunlari uchun yarim ochiq `[boshlanish, tugash)` vaqt oralig‘i (joriy vaqt zonasida).
+    `appointment_time__date=` dan farqli ravishda ustun o‘zgartirilmaydi, shuning uchun indeks ishlatiladi.
+    """
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(start_date, time.min), tz)
+    end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min), tz)
+    return start, end
+
+
+def appointments_between(start_date, end_date):
+    """Faol bemorlarning shu kunlardagi uchrashuvlari (indeksli oraliq sharti bilan)"""
+    start, end = day_range(start_date, end_date)
+    return Appointment.objects.filter(appointment_time__gte=start, appointment_time__lt=end,
+                                      patient__is_deleted=False)
+
+
+def calendar_appointments(start_date, end_date):
+    """Taqvim uchun uchrashuvlar (bemor PatientSerializer kerak qiladigan ustunlar bilan birga, bitta so‘rov)"""
+    appointments = appointments_between(start_date, end_date).order_by('appointment_time', 'id')
+    return plan_queryset(appointments, PatientSerializer, prefix='patient', fields=('appointment_time',))
+
+
+def calendar_days(appointments, start_date, end_date, request=None):
+    """Yuklangan uchrashuvlarni kunlar bo‘yicha guruhlash (so‘rov bajarmaydi)"""
+    days = {start_date + timedelta(days=offset): {'appointment_count': 0, 'patients': {}}
+            for offset in range((end_date - start_date).days + 1)}
+    serialized = {}
+    for appointment in appointments:
+        day = days[timezone.localtime(appointment.appointment_time).date()]
+        day['appointment_count'] += 1
+        patient = appointment.patient
+        if patient.pk not in serialized:
+            serialized[patient.pk] = PatientSerializer(patient, context={'request': request}).data
+        day['patients'].setdefault(patient.pk, serialized[patient.pk])
+
+    return [
+        {
+            'date': day.isoformat(),
+            'appointment_count': bucket['appointment_count'],
+            'patient_count': len(bucket['patients']),
+            'patients': list(bucket['patients'].values()),
+        }
+        for day, bucket in days.items()
+    ]
+
+
+def appointment_calendar(start_date, end_date, request=None):
+    """
+    Kunlar bo‘yicha uchrashuvlar: har bir kun uchun uchrashuvlar soni, bemorlar soni va bemorlar qisqa ma’lumoti.
+    Oraliq uzunligidan qat’i nazar bitta so‘rov bajariladi.
+    """
+    return calendar_days(calendar_appointments(start_date, end_date), start_date, end_date, request)
@@ -0,0 +1,131 @@
+from functools import wraps
+from math import ceil
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.utils.timezone import localdate, timedelta
+from rest_framework.exceptions import AuthenticationFailed, MethodNotAllowed, NotAuthenticated, NotFound
+from rest_framework.pagination import _positive_int
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from Dr.renderers import dumps
+
+from .appointments import appointments_between, calendar_appointments, calendar_days
+from .models import Patient, PatientStatusCounter
+from .pagination import PatientPagination
+from .search import search_patients
+from .serializers import PATIENT_LIST_VALUES, serialize_patient_values
+from .views import PatientStatisticsView
+
+
+def json_response(data, status=200):
+    """DRF renderer (ORJSONRenderer) bilan bir xil kodlash (Decimal, sana va h.k.)"""
+    return HttpResponse(dumps(data), status=status, content_type='application/json')
+
+
+async def authenticate(request):
+    """DRF sozlamasidagi autentifikatsiya klasslari (JWT) bilan foydalanuvchini aniqlash"""
+    for authenticator_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        authenticator = authenticator_class()
+        # Token tekshiruvi foydalanuvchini bazadan oladi: sync kod oqimda bajariladi
+        result = await sync_to_async(authenticator.authenticate)(request)
+        if result is not None:
+            return result[0]
+    return AnonymousUser()
+
+
+def async_api_view(authenticated=True):
+    """
+    Faqat o‘qiydigan async view dekoratori (DRF async view'larni qo‘llamaydi): autentifikatsiya
+    va 401/405 javoblari DRF'dagidek. So‘rovlar async ORM bilan bajariladi, kutish paytida
+    ASGI event loop boshqa so‘rovlarga xizmat qiladi (standart WSGI serverda ham ishlaydi, lekin bu yutuqsiz).
+    """
+
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return json_response({'detail': MethodNotAllowed(request.method).detail}, status=405)
+            try:
+                request.user = await authenticate(request)
+            except AuthenticationFailed as exc:
+                return json_response({'detail': exc.detail}, status=401)
+            if authenticated and not request.user.is_authenticated:
+                return json_response({'detail': NotAuthenticated.default_detail}, status=401)
+            return await view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+async def paginate(request, queryset):
+    """`PatientPagination` bilan bir xil sahifalash (`page`, `page_size`; count/next/previous/results)"""
+    try:
+        page_size = _positive_int(request.GET[PatientPagination.page_size_query_param], strict=True,
+                                  cutoff=PatientPagination.max_page_size)
+    except (KeyError, ValueError):
+        page_size = PatientPagination.page_size
+
+    count = await queryset.acount()
+    page_count = max(1, ceil(count / page_size))
+    page = request.GET.get(PatientPagination.page_query_param, 1)
+    try:
+        page = page_count if page in PatientPagination.last_page_strings else int(page)
+    except ValueError:
+        page = 0
+    if not 1 <= page <= page_count:
+        raise NotFound(PatientPagination.invalid_page_message.format(page_number=page, message=''))
+
+    rows = [row async for row in queryset.values(*PATIENT_LIST_VALUES)[(page - 1) * page_size:page * page_size]]
+    url = request.build_absolute_uri()
+    previous = None
+    if page > 1:
+        previous = (remove_query_param(url, PatientPagination.page_query_param) if page == 2
+                    else replace_query_param(url, PatientPagination.page_query_param, page - 1))
+    return {
+        'count': count,
+        'next': replace_query_param(url, PatientPagination.page_query_param, page + 1) if page < page_count else None,
+        'previous': previous,
+        'results': serialize_patient_values(rows, request),
+    }
+
+
+@async_api_view(authenticated=False)
+async def patient_statistics(request):
+    status_counts = [row async for row in PatientStatusCounter.objects.values_list('status', 'count')]
+    return json_response(PatientStatisticsView.build_statistics(status_counts))
+
+
+@async_api_view(authenticated=False)
+async def tomorrow_appointments(request):
+    tomorrow = localdate() + timedelta(days=1)
+    appointments = [appointment async for appointment in calendar_appointments(tomorrow, tomorrow)]
+    day, = calendar_days(appointments, tomorrow, tomorrow, request)
+    return json_response(day['patients'])
+
+
+@async_api_view(authenticated=False)
+async def tomorrow_appointments_count(request):
+    tomorrow = localdate() + timedelta(days=1)
+    patient_count = await appointments_between(tomorrow, tomorrow).values_list(
+        'patient', flat=True).distinct().acount()
+    return json_response({"tomorrow_patient_count": patient_count})
+
+
+@async_api_view()
+async def patient_list(request, status=None):
+    """Bemorlar ro‘yxati (`status` berilsa filterlangan), `?search=` va `?ordering=full_name` bilan"""
+    patients = Patient.active_patients().order_by('-created_at')
+    if status:
+        patients = patients.filter(status=status)
+    # Sinxron view'dagi filter tartibi: avval qidiruv (o‘xshashlik bo‘yicha saralaydi), keyin `ordering`
+    patients = search_patients(patients, request.GET.get('search', ''))
+    if request.GET.get('ordering') in ('full_name', '-full_name'):
+        patients = patients.order_by(request.GET['ordering'])
+    try:
+        return json_response(await paginate(request, patients))
+    except NotFound as exc:
+        return json_response({'detail': exc.detail}, status=404)
@@ -0,0 +1,102 @@
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from math import ceil
+from statistics import median
+from time import perf_counter
+from urllib.request import Request, urlopen
+
+SERVER_TIMING_QUERIES_RE = re.compile(r'db;desc="(\d+) queries"')
+
+
+def percentile(values, percent):
+    """Saralangan qiymatlarning `percent` foizlik qiymati (nearest-rank)"""
+    if not values:
+        return None
+    index = max(0, min(len(values) - 1, ceil(percent / 100 * len(values)) - 1))
+    return values[index]
+
+
+def summarize(latencies, errors, elapsed, queries=()):
+    """Kechikishlar (sekund) bo‘yicha qisqa hisobot: millisekundlarda p50/p95/p99 va sekundiga so‘rovlar"""
+    latencies = sorted(latencies)
+    to_ms = lambda value: None if value is None else round(value * 1000, 2)  # noqa: E731
+    report = {
+        'requests': len(latencies) + errors,
+        'errors': errors,
+        'throughput': round(len(latencies) / elapsed, 2) if elapsed else None,
+        'p50_ms': to_ms(percentile(latencies, 50)),
+        'p95_ms': to_ms(percentile(latencies, 95)),
+        'p99_ms': to_ms(percentile(latencies, 99)),
+        'max_ms': to_ms(latencies[-1] if latencies else None),
+    }
+    if queries:
+        report['queries'] = median(queries)
+        report['max_queries'] = max(queries)
+    return report
+
+
+def query_count(server_timing):
+    """`Server-Timing` sarlavhasidagi SQL so‘rovlar soni (Dr.middleware), bo‘lmasa None"""
+    match = SERVER_TIMING_QUERIES_RE.search(server_timing or '')
+    return int(match.group(1)) if match else None
+
+
+def measure(send, concurrency=50, total=1000):
+    """
+    `send()` ni `concurrency` ta oqimda jami `total` marta chaqirish. `send` muvaffaqiyatli so‘rovda
+    SQL so‘rovlar sonini (noma’lum bo‘lsa None) qaytaradi, xatoda istisno ko‘taradi.
+    """
+    def hit(_):
+        started = perf_counter()
+        try:
+            queries = send()
+        except Exception:
+            return None
+        return perf_counter() - started, queries
+
+    started = perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(hit, range(total)))
+    elapsed = perf_counter() - started
+    succeeded = [result for result in results if result is not None]
+    return summarize([latency for latency, _ in succeeded], len(results) - len(succeeded), elapsed,
+                     [queries for _, queries in succeeded if queries is not None])
+
+
+def http_sender(url, method='GET', headers=None, body=None, timeout=30):
+    """Haqiqiy server uchun `send`: 4xx/5xx javoblar xato hisoblanadi"""
+    def send():
+        request = Request(url, data=body, method=method, headers=headers or {})
+        with urlopen(request, timeout=timeout) as response:
+            response.read()
+            return query_count(response.headers.get('Server-Timing'))
+    return send
+
+
+def client_sender(path, method='GET', headers=None, data=None):
+    """Jarayon ichidagi Django test klienti uchun `send` (har bir oqimga alohida klient va DB ulanishi)"""
+    from django.test import Client
+
+    local = threading.local()
+
+    def send():
+        if not hasattr(local, 'client'):
+            local.client = Client(raise_request_exception=True)
+        if method == 'GET':
+            response = local.client.get(path, data=data, headers=headers or {})
+        else:
+            response = local.client.generic(method, path, data=json.dumps(data or {}),
+                                            content_type='application/json', headers=headers or {})
+        if response.status_code >= 400:
+            raise ValueError(f'{method} {path}: {response.status_code}')
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return query_count(response.get('Server-Timing'))
+    return send
+
+
+def run_load(url, concurrency=50, total=1000, headers=None, timeout=30):
+    """`url` ga `concurrency` ta parallel klient bilan jami `total` ta GET so‘rov yuborish"""
+    return measure(http_sender(url, headers=headers, timeout=timeout), concurrency=concurrency, total=total)
@@ -0,0 +1,68 @@
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Region, TypeDisease
+from .serializers import RegionSerializer, TypeDiseaseSerializer
+
+# Kam o‘zgaradigan ma’lumotnomalar: nomi -> (model, serializer)
+REFERENCE_DATA = {
+    'regions': (Region, RegionSerializer),
+    'diseases': (TypeDisease, TypeDiseaseSerializer),
+}
+REFERENCE_CACHE_TIMEOUT = 60 * 60 * 24  # Versiya o‘zgarmasa ham bir kunda yangilanadi
+# Bemorlar ro‘yxati versiyasi (ma’lumotnomalar bilan bir xil saqlanadi): qattiq o‘chirish MAX(updated_at) ni
+# o‘zgartirmaydi, shuning uchun u shu versiyani oshiradi
+PATIENT_LIST = 'patients'
+
+
+def _version_key(name):
+    return f'refdata:{name}:version'
+
+
+def get_reference_version(name):
+    """
+    Ma’lumotnomaning joriy versiyasi. Kalit yo‘qolsa (Redis tozalangan bo‘lsa) vaqt asosidagi
+    yangi versiya olinadi, shuning uchun eski versiya ostidagi ma’lumot qayta ishlatilmaydi.
+    """
+    key = _version_key(name)
+    cache.add(key, int(time.time() * 1000), timeout=None)
+    return cache.get(key)
+
+
+def bump_reference_version(name):
+    """Model saqlanganda/o‘chirilganda keshni bekor qilish (versiyani oshirish)"""
+    try:
+        cache.incr(_version_key(name))
+    except ValueError:
+        get_reference_version(name)
+
+
+def get_reference_data(name):
+    """
+    Ma’lumotnoma ro‘yxati va uning kuchli ETag'i: `(etag, data)`.
+    Kesh bo‘sh bo‘lsagina bazaga so‘rov yuboriladi.
+    """
+    key = f'refdata:{name}:{get_reference_version(name)}'
+    cached = cache.get(key)
+    if cached is None:
+        model, serializer_class = REFERENCE_DATA[name]
+        data = [dict(item) for item in serializer_class(model.objects.order_by('id'), many=True).data]
+        payload = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True, ensure_ascii=False)
+        cached = ('"%s"' % hashlib.sha1(payload.encode()).hexdigest(), data)
+        cache.set(key, cached, REFERENCE_CACHE_TIMEOUT)
+    return cached
+
+
+def patient_etag(updated_at, *parts):
+    """
+    Bemor(lar) javobining ETag'i: oxirgi o‘zgarish vaqti, ma’lumotnoma versiyalari (hudud va kasallik
+    nomlari javobga kiradi), ro‘yxat versiyasi va javobga ta’sir qiluvchi qo‘shimcha qismlar.
+    Bazaga so‘rov yubormaydi.
+    """
+    versions = [get_reference_version(name) for name in (*REFERENCE_DATA, PATIENT_LIST)]
+    key = ':'.join(str(part) for part in (updated_at.isoformat() if updated_at else '', *versions, *parts))
+    return '"%s"' % hashlib.sha1(key.encode()).hexdigest()
@@ -0,0 +1,237 @@
+import csv
+import io
+import re
+import zipfile
+from datetime import datetime
+from decimal import Decimal
+from itertools import chain
+from xml.sax.saxutils import escape
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.utils import timezone
+
+from .appointments import day_range
+from .models import Appointment, Patient, PatientPayment
+
+CHUNK_SIZE = 2000  # Server tomonidagi cursor'dan bir marta olinadigan qatorlar soni
+FLUSH_SIZE = 64 * 1024  # Shuncha bayt yig‘ilganda klientga yuboriladi
+
+
+class _Echo:
+    """csv.writer uchun bufer: yozilgan qatorni saqlamasdan qaytaradi"""
+
+    def write(self, value):
+        return value
+
+
+class _StreamBuffer(io.RawIOBase):
+    """zipfile yozadigan, lekin seek qilib bo‘lmaydigan oqim: yig‘ilgan baytlar `drain()` bilan olinadi"""
+
+    def __init__(self):
+        self.chunks = []
+        self.size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def drain(self):
+        data, self.chunks, self.size = b''.join(self.chunks), [], 0
+        return data
+
+
+def format_value(value):
+    if isinstance(value, datetime):
+        return timezone.localtime(value).strftime('%Y-%m-%d %H:%M')
+    return value
+
+
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def csv_value(value):
+    """Excel/Sheets katakni formula deb bajarmasligi uchun xavfli belgi bilan boshlangan matnga ' qo‘shiladi"""
+    value = format_value(value)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def stream_csv(header, rows):
+    """CSV'ni ~64 KB bo‘laklar bilan generatsiya qilish (Excel UTF-8 ni tanishi uchun BOM bilan)"""
+    writer = csv.writer(_Echo())
+    chunk = ['﻿' + writer.writerow(header)]
+    size = 0
+    for row in rows:
+        line = writer.writerow([csv_value(value) for value in row])
+        chunk.append(line)
+        size += len(line)
+        if size >= FLUSH_SIZE:
+            yield ''.join(chunk)
+            chunk, size = [], 0
+    yield ''.join(chunk)
+
+
+XLSX_STATIC_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="{sheet}" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+XML_ILLEGAL_CHARS_RE = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def xlsx_cell(value):
+    value = format_value(value)
+    if value is None:
+        return '<c/>'
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return f'<c><v>{value}</v></c>'
+    text = escape(XML_ILLEGAL_CHARS_RE.sub('', str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def stream_xlsx(header, rows, sheet='Sheet1'):
+    """
+    XLSX faylini oqim bilan generatsiya qilish: zip arxiv seek qilinmaydigan buferga yoziladi va
+    har ~64 KB dan keyin klientga yuboriladi, shuning uchun butun fayl xotirada yig‘ilmaydi.
+    """
+    buffer = _StreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in XLSX_STATIC_PARTS.items():
+            archive.writestr(name, content.replace('{sheet}', escape(sheet)))
+        yield buffer.drain()
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as worksheet:
+            worksheet.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                            b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                            b'<sheetData>')
+            for row in chain([header], rows):
+                worksheet.write(('<row>' + ''.join(xlsx_cell(value) for value in row) + '</row>').encode())
+                if buffer.size >= FLUSH_SIZE:
+                    yield buffer.drain()
+            worksheet.write(b'</sheetData></worksheet>')
+    yield buffer.drain()
+
+
+def iterate(queryset):
+    """
+    Qatorlarni server tomonidagi cursor bilan bo‘laklab o‘qish. Cursor tranzaksiya ichida ochiladi (WITH HOLD emas):
+    oqim tugaganda yoki klient uzilib generator yopilganda tranzaksiya bilan birga yopiladi, ulanish esa
+    pool'ga toza holatda qaytadi. Eksport bitta snapshot'dan o‘qiladi.
+    """
+    with transaction.atomic(using=queryset.db):
+        yield from queryset.iterator(chunk_size=CHUNK_SIZE)
+
+
+async def aiterate(chunks):
+    """
+    Sync generatorni ASGI uchun async oqimga aylantirish (aks holda Django uni oxirigacha xotiraga o‘qiydi).
+    Bo‘laklar so‘rovning o‘z oqimida olinadi, shuning uchun tranzaksiya va cursor bitta ulanishda qoladi.
+    """
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    try:
+        while (chunk := await next_chunk(chunks, None)) is not None:
+            yield chunk
+    finally:
+        await sync_to_async(chunks.close, thread_sensitive=True)()
+
+
+def _date_filter(field, date_from, date_to):
+    """`date_from`/`date_to` kunlari (ikkalasi ham kiradi) uchun yarim ochiq vaqt oralig‘i sharti"""
+    filters = {}
+    if date_from:
+        filters[f'{field}__gte'] = day_range(date_from, date_from)[0]
+    if date_to:
+        filters[f'{field}__lt'] = day_range(date_to, date_to)[1]
+    return filters
+
+
+def patient_rows(status=None, region=None, date_from=None, date_to=None):
+    patients = Patient.active_patients().filter(**_date_filter('created_at', date_from, date_to))
+    if status:
+        patients = patients.filter(status=status)
+    if region:
+        patients = patients.filter(region_id=region)
+    header = ['ID', 'F.I.Sh', 'Telefon', 'Hudud', 'Kasallik turi', 'Status', 'To‘lanishi kerak',
+              'To‘langan', 'Qolgan qarz', 'Yaratilgan']
+    rows = patients.order_by('id').values_list(
+        'id', 'full_name', 'phone_number', 'region__name', 'type_disease__name', 'status',
+        'total_payment_due', 'total_paid', 'remaining_debt', 'created_at',
+    )
+    return header, iterate(rows)
+
+
+def payment_rows(status=None, region=None, date_from=None, date_to=None):
+    payments = PatientPayment.objects.filter(**_date_filter('payment_date', date_from, date_to))
+    if status:
+        payments = payments.filter(patient__status=status)
+    if region:
+        payments = payments.filter(patient__region_id=region)
+    header = ['ID', 'Bemor ID', 'F.I.Sh', 'Telefon', 'Hudud', 'Summa', 'To‘lov sanasi']
+    rows = payments.order_by('id').values_list(
+        'id', 'patient_id', 'patient__full_name', 'patient__phone_number', 'patient__region__name',
+        'amount', 'payment_date',
+    )
+    return header, iterate(rows)
+
+
+def appointment_rows(status=None, region=None, date_from=None, date_to=None):
+    appointments = Appointment.objects.filter(
+        patient__is_deleted=False, **_date_filter('appointment_time', date_from, date_to))
+    if status:
+        appointments = appointments.filter(patient__status=status)
+    if region:
+        appointments = appointments.filter(patient__region_id=region)
+    header = ['ID', 'Bemor ID', 'F.I.Sh', 'Telefon', 'Hudud', 'Kasallik turi', 'Uchrashuv vaqti']
+    rows = appointments.order_by('appointment_time', 'id').values_list(
+        'id', 'patient_id', 'patient__full_name', 'patient__phone_number', 'patient__region__name',
+        'patient__type_disease__name', 'appointment_time',
+    )
+    return header, iterate(rows)
+
+
+EXPORTS = {
+    'patients': patient_rows,
+    'payments': payment_rows,
+    'appointments': appointment_rows,
+}
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', stream_csv),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', stream_xlsx),
+}
@@ -0,0 +1,186 @@
+import csv
+import io
+import json
+from collections import Counter
+from decimal import Decimal
+
+from django.db import DatabaseError, transaction
+from rest_framework import serializers
+
+from .models import Appointment, Patient, PatientPayment, PatientStatusCounter, Region, TypeDisease
+from .search import normalize_name, normalize_phone
+
+BATCH_SIZE = 1000  # Bir tranzaksiyada tekshiriladigan va yoziladigan bemorlar soni
+LIST_SEPARATOR = ';'  # CSV ustunlaridagi bir nechta qiymat ajratgichi
+PAYMENT_DATE_SEPARATOR = '@'  # CSV'da to‘lov: `summa` yoki `summa@sana`
+
+
+class ReferenceField(serializers.Field):
+    """
+    Ma’lumotnoma (region, kasallik turi) yozuvi ID yoki nomi bo‘yicha.
+    Har bir qator uchun so‘rov yubormaslik uchun oldindan yuklangan lug‘atdan (`context['references']`) qidiriladi.
+    """
+
+    default_error_messages = {'not_found': "“{value}” topilmadi"}
+
+    def __init__(self, reference, **kwargs):
+        self.reference = reference
+        kwargs.setdefault('required', False)
+        kwargs.setdefault('allow_null', True)
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        key = str(data).strip().lower()
+        lookup = self.context['references'][self.reference]
+        if key not in lookup:
+            self.fail('not_found', value=data)
+        return lookup[key]
+
+    def to_representation(self, value):
+        return value
+
+
+class ImportPaymentSerializer(serializers.Serializer):
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'))
+    payment_date = serializers.DateTimeField(required=False)
+
+
+class ImportAppointmentSerializer(serializers.Serializer):
+    appointment_time = serializers.DateTimeField()
+
+
+class PatientImportSerializer(serializers.ModelSerializer):
+    """
+    Import qilinadigan bitta bemor qatori (ichida uchrashuvlar va to‘lovlar bilan).
+    `status` berilmasa to‘lovlarga qarab `debtor`/`paid` aniqlanadi.
+    """
+    region = ReferenceField('regions')
+    type_disease = ReferenceField('diseases')
+    created_at = serializers.DateTimeField(required=False)
+    appointments = ImportAppointmentSerializer(many=True, required=False)
+    payments = ImportPaymentSerializer(many=True, required=False)
+
+    class Meta:
+        model = Patient
+        fields = [
+            'full_name', 'phone_number', 'region', 'address', 'type_disease', 'face_condition',
+            'medications_taken', 'home_care_items', 'total_payment_due', 'status', 'created_at',
+            'appointments', 'payments',
+        ]
+        extra_kwargs = {'status': {'required': False}}
+
+
+def load_references():
+    """Region va kasallik turlarini ID va nom (kichik harf) bo‘yicha lug‘atga yuklash"""
+    references = {}
+    for name, model in (('regions', Region), ('diseases', TypeDisease)):
+        lookup = {}
+        for pk, title in model.objects.values_list('id', 'name'):
+            lookup.setdefault(title.strip().lower(), pk)
+            lookup[str(pk)] = pk
+        references[name] = lookup
+    return references
+
+
+def _split(value):
+    return [item.strip() for item in (value or '').split(LIST_SEPARATOR) if item.strip()]
+
+
+def csv_records(text):
+    """
+    CSV qatorlarini import yozuvlariga aylantirish. `appointments` ustunida vaqtlar `;` bilan,
+    `payments` ustunida esa `summa` yoki `summa@sana` ko‘rinishidagi to‘lovlar `;` bilan ajratiladi.
+    """
+    for row in csv.DictReader(io.StringIO(text.lstrip('﻿'))):
+        # Bo‘sh kataklar berilmagan deb hisoblanadi (model qiymati ishlatiladi)
+        record = {key.strip(): value.strip() for key, value in row.items() if key and value and value.strip()}
+        record['appointments'] = [{'appointment_time': value} for value in _split(record.get('appointments'))]
+        payments = []
+        for value in _split(record.get('payments')):
+            amount, _, payment_date = value.partition(PAYMENT_DATE_SEPARATOR)
+            payment = {'amount': amount.strip()}
+            if payment_date.strip():
+                payment['payment_date'] = payment_date.strip()
+            payments.append(payment)
+        record['payments'] = payments
+        yield record
+
+
+def parse_records(content, content_type=''):
+    """Fayl matnidan yozuvlar: JSON massiv yoki CSV (`ValueError` — format noto‘g‘ri bo‘lsa)"""
+    if isinstance(content, bytes):
+        content = content.decode('utf-8-sig')
+    if 'json' in content_type or content.lstrip().startswith('['):
+        records = json.loads(content)
+        if not isinstance(records, list):
+            raise ValueError("JSON massiv kutilgan edi")
+        return records
+    try:
+        return list(csv_records(content))
+    except csv.Error as error:  # Masalan, 131072 belgidan uzun maydon yoki yopilmagan qo‘shtirnoq
+        raise ValueError(str(error)) from error
+
+
+def build_patient(data):
+    """Tekshirilgan qatordan saqlanmagan bemor, uchrashuvlar va to‘lovlar obyektlari"""
+    appointments = data.pop('appointments', [])
+    payments = data.pop('payments', [])
+    region_id, type_disease_id = data.pop('region', None), data.pop('type_disease', None)
+
+    patient = Patient(region_id=region_id, type_disease_id=type_disease_id, **data)
+    # bulk_create save() ni chaqirmaydi: hosila maydonlar va balans shu yerda hisoblanadi
+    patient.search_name = normalize_name(patient.full_name)
+    patient.phone_digits = normalize_phone(patient.phone_number)
+    patient.phone_digits_reversed = patient.phone_digits[::-1]
+    patient.total_paid = sum((payment['amount'] for payment in payments), Decimal('0'))
+    if 'status' not in data:
+        patient.status = 'paid' if Decimal(patient.total_payment_due) <= patient.total_paid else 'debtor'
+    return patient, appointments, payments
+
+
+def write_patients(built):
+    """Bir paketni yozish (chaqiruvchi tranzaksiyasi ichida)"""
+    # Berilmagan sanalar modeldagi default (timezone.now) bilan to‘ldiriladi, tarixiy sanalar saqlanadi
+    patients = Patient.objects.bulk_create([patient for patient, _, _ in built])
+    appointments, payments = [], []
+    for patient, patient_appointments, patient_payments in built:
+        appointments += [Appointment(patient_id=patient.pk, **item) for item in patient_appointments]
+        payments += [PatientPayment(patient_id=patient.pk, **item) for item in patient_payments]
+    Appointment.objects.bulk_create(appointments)
+    # PatientPayment.save() chaqirilmaydi: balans bemor qatorida allaqachon hisoblangan
+    PatientPayment.objects.bulk_create(payments)
+
+    PatientStatusCounter.apply(Counter(patient.status for patient in patients))
+    return len(patients)
+
+
+def import_patients(records, batch_size=BATCH_SIZE, dry_run=False):
+    """
+    Bemorlarni paketlab import qilish. Har bir paket tekshiriladi va to‘g‘ri qatorlari alohida
+    tranzaksiyada `bulk_create` bilan yoziladi; xato qatorlar o‘tkazib yuboriladi.
+    Natija: {"created": n, "failed": m, "errors": [{"row": qator raqami (1 dan), "errors": {...}}]}
+    """
+    # Bitta serializer nusxasi qayta ishlatiladi: har qator uchun maydonlarni nusxalash qimmat
+    serializer = PatientImportSerializer(context={'references': load_references()})
+    created, errors = 0, []
+    records = list(records)
+    for start in range(0, len(records), batch_size):
+        built, rows = [], []
+        for row, record in enumerate(records[start:start + batch_size], start + 1):
+            try:
+                built.append(build_patient(dict(serializer.run_validation(record))))
+                rows.append(row)
+            except serializers.ValidationError as exc:
+                errors.append({'row': row, 'errors': exc.detail})
+        if dry_run or not built:
+            continue
+        try:
+            with transaction.atomic():
+                created += write_patients(built)
+        except DatabaseError as exc:
+            errors += [{'row': row, 'errors': {'non_field_errors': [str(exc)]}} for row in rows]
+    errors.sort(key=lambda error: error['row'])
+    result = {'created': created, 'failed': len(errors), 'errors': errors}
+    if dry_run:
+        result['valid'] = len(records) - len(errors)
+    return result
@@ -0,0 +1,144 @@
+import json
+import re
+import subprocess
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from django.urls import URLResolver, get_resolver
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from monitoring.benchmark import client_sender, http_sender, measure
+from monitoring.models import Appointment, Patient, PatientPayment
+
+URL_PREFIXES = ('employee/', 'monitoring/')
+ROUTE_ARGUMENT_RE = re.compile(r'<(?:\w+:)?(\w+)>')
+HTTP_METHODS = ('get', 'post', 'put', 'patch', 'delete')
+
+
+def discover_routes():
+    """`employee/` va `monitoring/` ostidagi barcha URL'lar: (yo‘l shabloni, ruxsat etilgan metodlar)"""
+    for resolver in get_resolver().url_patterns:
+        if not isinstance(resolver, URLResolver) or str(resolver.pattern) not in URL_PREFIXES:
+            continue
+        for pattern in resolver.url_patterns:
+            view_class = getattr(pattern.callback, 'view_class', None)
+            methods = [method.upper() for method in HTTP_METHODS if hasattr(view_class, method)] if view_class \
+                else ['GET']  # Async funksiya view'lari faqat GET
+            yield f'/{resolver.pattern}{pattern.pattern}', methods
+
+
+def default_queries():
+    """Parametr talab qiladigan endpointlar uchun so‘rov parametrlari va qo‘shimcha variantlar"""
+    today = timezone.localdate()
+    return {
+        '/monitoring/appointments/calendar/': [{'start': today.isoformat(), 'end': (today + timedelta(days=6)).isoformat()}],
+        '/monitoring/patients/lookup-phone/': [{'phone': '90'}],
+        '/monitoring/exports/<str:dataset>.<str:extension>': [{'date_from': today.isoformat()}],
+        '/monitoring/patients/all/': [{}, {'search': 'karimov'}, {'pagination': 'cursor'}, {'page': 50}],
+        '/monitoring/async/patients/all/': [{}, {'search': 'karimov'}],
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "monitoring/ va employee/ URL'lariga parallel yuklama berib, har bir endpoint uchun p50/p95/p99, "
+        "o‘tkazuvchanlik va SQL so‘rovlar sonini JSON hisobotga yozadi. Ma’lumotlarni o‘zgartiradigan "
+        "endpointlar o‘tkazib yuboriladi. Hisobotlarni commitlar orasida `--compare` bilan solishtirish mumkin."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='benchmark-report.json', help="Hisobot fayli")
+        parser.add_argument('--compare', help="Oldingi hisobot bilan solishtirish")
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument('--requests', type=int, default=200, help="Har bir endpointga so‘rovlar soni")
+        parser.add_argument('--base-url', help="Ishlab turgan server (berilmasa jarayon ichida Django klienti)")
+        parser.add_argument('--user', help="Token qaysi foydalanuvchi uchun (standart: birinchi superuser)")
+        parser.add_argument('--token', help="Tayyor JWT access token (--base-url bilan)")
+        parser.add_argument('--only', help="Faqat shu matnni o‘z ichiga olgan yo‘llar")
+
+    def handle(self, *args, **options):
+        headers = {'Authorization': f'Bearer {options["token"] or self.access_token(options["user"])}'}
+        patient = Patient.active_patients().order_by('id').first()
+        payment = PatientPayment.objects.filter(patient=patient).order_by('id').first()
+        if patient is None:
+            raise CommandError("Bemorlar yo‘q: avval `generate_dataset` ishga tushiring")
+        route_args = {'pk': patient.pk, 'payment_id': payment.pk if payment else 0,
+                      'dataset': 'patients', 'extension': 'csv'}
+
+        queries = default_queries()
+        report = {'meta': self.meta(options), 'endpoints': {}, 'skipped': []}
+        for route, methods in discover_routes():
+            path = ROUTE_ARGUMENT_RE.sub(lambda match: str(route_args[match.group(1)]), route)
+            if 'GET' not in methods:
+                report['skipped'].append(f'{",".join(methods)} {path}')
+                continue
+            for params in queries.get(route, [{}]):
+                query = '&'.join(f'{key}={value}' for key, value in params.items())
+                name = f'GET {path}' + (f'?{query}' if query else '')
+                if options['only'] and options['only'] not in name:
+                    continue
+                report['endpoints'][name] = self.run(path, query, headers, options)
+                result = report['endpoints'][name]
+                self.stdout.write(f"{name:<70} p95={result['p95_ms']} ms  "
+                                  f"q={result.get('queries')}  err={result['errors']}")
+
+        with open(options['output'], 'w') as file:
+            json.dump(report, file, indent=2, sort_keys=True, ensure_ascii=False)
+        self.stdout.write(self.style.SUCCESS(f"Hisobot: {options['output']}"))
+        if options['compare']:
+            self.compare(options['compare'], report)
+
+    def access_token(self, username):
+        users = get_user_model().objects.filter(is_active=True)
+        user = users.filter(username=username).first() if username else \
+            users.filter(is_superuser=True).order_by('id').first()
+        if user is None:
+            raise CommandError("Foydalanuvchi topilmadi: --user yoki --token bering")
+        return str(AccessToken.for_user(user))
+
+    def run(self, path, query, headers, options):
+        if options['base_url']:
+            send = http_sender(options['base_url'].rstrip('/') + path + (f'?{query}' if query else ''),
+                               headers=headers)
+            return measure(send, concurrency=options['concurrency'], total=options['requests'])
+
+        # Jarayon ichida: har bir so‘rovning SQL statistikasi olinadi, DEBUG so‘rovlar logini yig‘maydi
+        instrumentation = {**getattr(settings, 'SQL_INSTRUMENTATION', {}), 'SAMPLE_RATE': 1.0}
+        with override_settings(DEBUG=False, SQL_INSTRUMENTATION=instrumentation):
+            send = client_sender(path + (f'?{query}' if query else ''), headers=headers)
+            return measure(send, concurrency=options['concurrency'], total=options['requests'])
+
+    def meta(self, options):
+        try:
+            commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                    cwd=settings.BASE_DIR, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            'commit': commit,
+            'created': timezone.now().isoformat(timespec='seconds'),
+            'target': options['base_url'] or 'in-process',
+            'concurrency': options['concurrency'],
+            'requests': options['requests'],
+            'dataset': {
+                'patients': Patient.objects.count(),
+                'payments': PatientPayment.objects.count(),
+                'appointments': Appointment.objects.count(),
+            },
+        }
+
+    def compare(self, path, report):
+        with open(path) as file:
+            previous = json.load(file)['endpoints']
+        self.stdout.write(f"\n{'endpoint':<70}{'p95 oldin':>12}{'p95 hozir':>12}{'farq':>9}{'so‘rovlar':>14}")
+        for name, result in report['endpoints'].items():
+            old = previous.get(name)
+            if not old or not old['p95_ms'] or result['p95_ms'] is None:
+                continue
+            change = (result['p95_ms'] - old['p95_ms']) / old['p95_ms'] * 100
+            queries = f"{old.get('queries')}→{result.get('queries')}"
+            self.stdout.write(f"{name:<70}{old['p95_ms']:>12}{result['p95_ms']:>12}{change:>+8.0f}%{queries:>14}")
@@ -0,0 +1,48 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from monitoring.benchmark import run_load
+
+
+class Command(BaseCommand):
+    help = (
+        "Bir xil yuklamani bir nechta serverga (masalan WSGI va ASGI) yuborib, kechikish va o‘tkazuvchanlikni "
+        "solishtiradi. Misol:\n"
+        "  gunicorn Dr.wsgi:application -w 2 -b 0.0.0.0:8001\n"
+        "  uvicorn Dr.asgi:application --workers 2 --port 8002\n"
+        "  python manage.py benchmark_concurrency "
+        "--target wsgi=http://localhost:8001/monitoring/patients/statistics/ "
+        "--target asgi=http://localhost:8002/monitoring/async/patients/statistics/ --concurrency 100"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', action='append', required=True, metavar='NOM=URL',
+                            help="Solishtiriladigan manzil (bir necha marta berish mumkin)")
+        parser.add_argument('--concurrency', type=int, default=50, help="Parallel klientlar soni")
+        parser.add_argument('--requests', type=int, default=1000, help="Har bir manzilga jami so‘rovlar soni")
+        parser.add_argument('--token', help="JWT access token (Authorization: Bearer ...)")
+        parser.add_argument('--json', action='store_true', help="Natijani JSON ko‘rinishida chiqarish")
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options['target']:
+            name, separator, url = target.partition('=')
+            if not separator or not url:
+                raise CommandError(f"--target NOM=URL ko‘rinishida bo‘lishi kerak: {target}")
+            targets.append((name, url))
+        headers = {'Authorization': f"Bearer {options['token']}"} if options['token'] else {}
+
+        report = {}
+        for name, url in targets:
+            run_load(url, concurrency=options['concurrency'], total=options['concurrency'], headers=headers)  # Qizdirish
+            report[name] = {'url': url, **run_load(url, concurrency=options['concurrency'],
+                                                   total=options['requests'], headers=headers)}
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        columns = ('throughput', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'errors')
+        self.stdout.write(f"{'server':<12}" + ''.join(f'{column:>12}' for column in columns))
+        for name, result in report.items():
+            self.stdout.write(f'{name:<12}' + ''.join(f'{str(result[column]):>12}' for column in columns))
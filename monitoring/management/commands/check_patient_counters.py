@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from monitoring.models import PatientStatusCounter
+
+
+class Command(BaseCommand):
+    help = "Statistika hisoblagichlarini bemorlarni jonli sanash bilan solishtiradi (--fix bilan tuzatadi)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true',
+                            help="Farq bo‘lsa hisoblagichlarni jonli sanash bo‘yicha tuzatish (davriy ishga tushirish uchun)")
+
+    def handle(self, *args, **options):
+        if options['fix']:
+            fixed = PatientStatusCounter.reconcile()
+            for status, (stored, live) in sorted(fixed.items()):
+                self.stdout.write(f"{status}: {stored} -> {live}")
+            self.stdout.write(self.style.SUCCESS(f"Tuzatildi: {len(fixed)} ta status"))
+            return
+
+        mismatches = PatientStatusCounter.compare()
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS("Hisoblagichlar jonli sanash bilan mos"))
+            return
+        for status, (stored, live) in sorted(mismatches.items()):
+            self.stderr.write(f"{status}: hisoblagich={stored}, jonli={live}")
+        raise CommandError(f"{len(mismatches)} ta status mos emas")
@@ -0,0 +1,103 @@
+import random
+from datetime import timedelta
+from decimal import Decimal
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from monitoring.importers import build_patient, write_patients
+from monitoring.models import Region, TypeDisease
+
+REGIONS = [
+    'Toshkent shahri', 'Toshkent viloyati', 'Andijon', 'Buxoro', 'Farg‘ona', 'Jizzax', 'Xorazm', 'Namangan',
+    'Navoiy', 'Qashqadaryo', 'Qoraqalpog‘iston', 'Samarqand', 'Sirdaryo', 'Surxondaryo',
+]
+DISEASES = [
+    'Akne', 'Ekzema', 'Psoriaz', 'Dermatit', 'Rozatsea', 'Vitiligo', 'Melazma', 'Allergiya', 'Seboreya',
+    'Pigmentatsiya', 'Chandiq', 'Giperhidroz', 'Alopetsiya', 'Zamburug‘ infeksiyasi', 'So‘gal',
+]
+FIRST_NAMES = [
+    'Aziz', 'Bekzod', 'Dilshod', 'Jasur', 'Otabek', 'Sardor', 'Sherzod', 'Ulug‘bek', 'Nodir', 'Rustam',
+    'Dilnoza', 'Gulnora', 'Malika', 'Nigora', 'Shahnoza', 'Zarina', 'Madina', 'Kamola', 'Feruza', 'O‘g‘iloy',
+]
+LAST_NAMES = [
+    'Karimov', 'Rahimov', 'Toshmatov', 'Yusupov', 'Aliyev', 'Qodirov', 'Ergashev', 'Nazarov', 'Sobirov',
+    'Xolmatov', 'Mirzayev', 'Abdullayev', 'Hasanov', 'Ismoilov', 'Jo‘rayev', 'Olimov',
+]
+PHONE_PREFIXES = ['90', '91', '93', '94', '95', '97', '98', '99', '33', '88']
+
+
+def spread(total, count, rng):
+    """`total` ta elementni `count` ta bemorga tasodifiy (lekin jami aniq) taqsimlash"""
+    counts = [0] * count
+    for index in rng.choices(range(count), k=total):
+        counts[index] += 1
+    return counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Yuklama sinovlari uchun realistik sintetik ma’lumotlar yaratadi (bemorlar, to‘lovlar, uchrashuvlar). "
+        "Misol: generate_dataset --patients 200000 --payments 2000000 --appointments 1000000"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--patients', type=int, default=1000)
+        parser.add_argument('--payments', type=int, default=None, help="Standart: bemorlar soni × 10")
+        parser.add_argument('--appointments', type=int, default=None, help="Standart: bemorlar soni × 5")
+        parser.add_argument('--batch-size', type=int, default=2000, help="Bir tranzaksiyadagi bemorlar soni")
+        parser.add_argument('--seed', type=int, default=42, help="Bir xil seed — bir xil ma’lumotlar")
+        parser.add_argument('--years', type=int, default=3, help="Necha yillik tarix yaratiladi")
+
+    def handle(self, *args, **options):
+        patients = options['patients']
+        if patients <= 0 or options['batch_size'] <= 0:
+            raise CommandError("--patients va --batch-size musbat bo‘lishi kerak")
+        payments = patients * 10 if options['payments'] is None else options['payments']
+        appointments = patients * 5 if options['appointments'] is None else options['appointments']
+        rng = random.Random(options['seed'])
+
+        regions = [Region.objects.get_or_create(name=name)[0].pk for name in REGIONS]
+        diseases = [TypeDisease.objects.get_or_create(name=name)[0].pk for name in DISEASES]
+        now = timezone.now()
+        history = timedelta(days=365 * options['years'])
+
+        payment_counts = spread(payments, patients, rng)
+        appointment_counts = spread(appointments, patients, rng)
+        started = perf_counter()
+        for start in range(0, patients, options['batch_size']):
+            built = []
+            for index in range(start, min(start + options['batch_size'], patients)):
+                created_at = now - history * rng.random() ** 2  # Yangi bemorlar ko‘proq
+                due = Decimal(rng.randrange(200, 20000) * 1000)
+                record = {
+                    'full_name': f'{rng.choice(LAST_NAMES)} {rng.choice(FIRST_NAMES)}',
+                    'phone_number': f'+998 {rng.choice(PHONE_PREFIXES)} {rng.randrange(10 ** 7):07d}',
+                    'region': rng.choice(regions),
+                    'type_disease': rng.choice(diseases),
+                    'address': f'{rng.choice(REGIONS)}, {rng.randrange(1, 200)}-uy',
+                    'total_payment_due': due,
+                    'created_at': created_at,
+                    'appointments': [
+                        {'appointment_time': created_at + timedelta(days=rng.randrange(-30, 400),
+                                                                    hours=rng.randrange(8, 18))}
+                        for _ in range(appointment_counts[index])
+                    ],
+                    'payments': [
+                        {'amount': (due / payment_counts[index] * Decimal(rng.uniform(0.3, 1.3))).quantize(Decimal('1')),
+                         'payment_date': min(now, created_at + timedelta(days=rng.randrange(0, 365)))}
+                        for _ in range(payment_counts[index])
+                    ],
+                }
+                if rng.random() < 0.2:
+                    record['status'] = 'treated'
+                built.append(build_patient(record))
+            with transaction.atomic():
+                write_patients(built)
+            self.stdout.write(f"{min(start + options['batch_size'], patients)}/{patients} bemor")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{patients} bemor, {payments} to‘lov, {appointments} uchrashuv yaratildi "
+            f"({perf_counter() - started:.1f} s)"))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from monitoring.models import Patient
+from monitoring.thumbnails import make_thumbnails
+
+
+class Command(BaseCommand):
+    help = "Rasmi bor, lekin kichik nusxasi yo‘q bemorlar uchun thumbnail'larni yaratadi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="Mavjud thumbnail'larni ham qayta yaratish")
+
+    def handle(self, *args, **options):
+        patients = Patient.objects.exclude(Q(photo__isnull=True) | Q(photo=''))
+        if not options['all']:
+            patients = patients.filter(Q(photo_small__isnull=True) | Q(photo_small=''))
+
+        count = 0
+        for patient_id in patients.values_list('id', flat=True).iterator():
+            make_thumbnails(patient_id)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"{count} ta bemor uchun thumbnail yaratildi"))
@@ -0,0 +1,30 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from monitoring.importers import BATCH_SIZE, import_patients, parse_records
+
+
+class Command(BaseCommand):
+    help = "Bemorlarni CSV yoki JSON fayldan (uchrashuvlar va to‘lovlari bilan) ommaviy import qiladi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV yoki JSON (massiv) fayl yo‘li")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="Bir tranzaksiyadagi qatorlar soni")
+        parser.add_argument('--dry-run', action='store_true', help="Faqat tekshirish, bazaga yozmaslik")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], 'rb') as file:
+                records = parse_records(file.read(), 'json' if options['path'].endswith('.json') else '')
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Faylni o‘qib bo‘lmadi: {exc}")
+
+        result = import_patients(records, batch_size=options['batch_size'], dry_run=options['dry_run'])
+        for error in result['errors']:
+            self.stderr.write(f"{error['row']}-qator: {json.dumps(error['errors'], ensure_ascii=False)}")
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f"{result['valid']} ta qator to‘g‘ri, {result['failed']} ta xato"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{result['created']} ta bemor import qilindi, "
+                                                 f"{result['failed']} ta qator xato"))
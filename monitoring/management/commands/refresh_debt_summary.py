@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from monitoring.models import PatientDebtSummary
+
+
+class Command(BaseCommand):
+    help = "Qarz yoshi hisoboti yig‘masini (materialized view) darhol yangilaydi"
+
+    def handle(self, *args, **options):
+        PatientDebtSummary.refresh()
+        self.stdout.write(self.style.SUCCESS(f"Yangilandi: {PatientDebtSummary.objects.count()} ta qarzdor bemor"))
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.7 on 2026-10-17 22:37
+
+import django.db.models.expressions
+from django.db import migrations, models
+from django.db.models import DecimalField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_total_paid(apps, schema_editor):
+    Patient = apps.get_model('monitoring', 'Patient')
+    PatientPayment = apps.get_model('monitoring', 'PatientPayment')
+    paid = PatientPayment.objects.filter(patient=OuterRef('pk')).values('patient').annotate(
+        total=Sum('amount')).values('total')
+    Patient.objects.update(total_paid=Coalesce(
+        Subquery(paid, output_field=DecimalField(max_digits=50, decimal_places=2)),
+        Value(0, output_field=DecimalField(max_digits=50, decimal_places=2)),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0008_alter_patient_total_payment_due'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='patient',
+            name='total_paid',
+            field=models.DecimalField(decimal_places=2, default=0.0, editable=False, max_digits=50),
+        ),
+        migrations.RunPython(backfill_total_paid, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='patient',
+            name='remaining_debt',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(models.F('total_payment_due'), '-', models.F('total_paid')), output_field=models.DecimalField(decimal_places=2, max_digits=50)),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.7 on 2026-10-17 22:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0009_patient_total_paid_remaining_debt'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['-created_at', 'id'], name='patient_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['status', '-created_at', 'id'], name='patient_status_created_idx'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.1.7 on 2026-10-17 22:39
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+from monitoring.search import normalize_name
+
+
+class AddPostgresIndex(migrations.AddIndex):
+    """GIN/pg_trgm indeksi faqat PostgreSQL'da yaratiladi (TrigramExtension kabi boshqa bazalarda no-op)"""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+BATCH_SIZE = 1000
+
+
+def fill_search_name(apps, schema_editor):
+    # Jadval xotiraga to‘liq o‘qilmaydi: bo‘laklab o‘qiladi va har bo‘lak alohida yoziladi
+    Patient = apps.get_model('monitoring', 'Patient')
+    batch = []
+    for patient in Patient.objects.only('id', 'full_name').order_by('pk').iterator(chunk_size=BATCH_SIZE):
+        patient.search_name = normalize_name(patient.full_name)
+        batch.append(patient)
+        if len(batch) >= BATCH_SIZE:
+            Patient.objects.bulk_update(batch, ['search_name'])
+            batch = []
+    Patient.objects.bulk_update(batch, ['search_name'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0010_patient_keyset_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='patient',
+            name='search_name',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(fill_search_name, migrations.RunPython.noop),
+        AddPostgresIndex(
+            model_name='patient',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_name'], name='patient_search_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.1.7 on 2026-10-17 22:40
+
+from django.db import migrations, models
+
+from monitoring.search import normalize_phone
+
+
+BATCH_SIZE = 1000
+
+
+def fill_phone_digits(apps, schema_editor):
+    # Jadval xotiraga to‘liq o‘qilmaydi: bo‘laklab o‘qiladi va har bo‘lak alohida yoziladi
+    Patient = apps.get_model('monitoring', 'Patient')
+    fields = ['phone_digits', 'phone_digits_reversed']
+    batch = []
+    for patient in Patient.objects.only('id', 'phone_number').order_by('pk').iterator(chunk_size=BATCH_SIZE):
+        patient.phone_digits = normalize_phone(patient.phone_number)
+        patient.phone_digits_reversed = patient.phone_digits[::-1]
+        batch.append(patient)
+        if len(batch) >= BATCH_SIZE:
+            Patient.objects.bulk_update(batch, fields)
+            batch = []
+    Patient.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0011_patient_search_name_trigram'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='patient',
+            name='phone_digits',
+            field=models.CharField(blank=True, default='', editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='patient',
+            name='phone_digits_reversed',
+            field=models.CharField(blank=True, default='', editable=False, max_length=20),
+        ),
+        migrations.RunPython(fill_phone_digits, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['phone_digits'], include=('full_name', 'phone_number', 'status'), name='patient_phone_digits_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['phone_digits_reversed'], name='patient_phone_reversed_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
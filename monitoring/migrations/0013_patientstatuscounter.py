@@ -0,0 +1,31 @@
+# Generated by Django 5.1.7 on 2026-10-17 22:42
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def seed_counters(apps, schema_editor):
+    Patient = apps.get_model('monitoring', 'Patient')
+    PatientStatusCounter = apps.get_model('monitoring', 'PatientStatusCounter')
+    counts = dict(Patient.objects.filter(is_deleted=False).order_by().values_list('status').annotate(Count('id')))
+    for status in {'treated', 'debtor', 'paid'} | counts.keys():
+        PatientStatusCounter.objects.create(status=status, count=counts.get(status, 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0012_patient_phone_digits'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PatientStatusCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(max_length=20, unique=True)),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
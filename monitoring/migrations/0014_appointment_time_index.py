@@ -0,0 +1,17 @@
+# Generated by Django 5.1.7 on 2026-10-17 22:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0013_patientstatuscounter'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['appointment_time', 'patient'], name='appointment_time_patient_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7 on 2026-10-17 22:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0014_appointment_time_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='patient',
+            name='photo_medium',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='patients/photos/thumbs/'),
+        ),
+        migrations.AddField(
+            model_name='patient',
+            name='photo_small',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='patients/photos/thumbs/'),
+        ),
+    ]
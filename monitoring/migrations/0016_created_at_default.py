@@ -0,0 +1,24 @@
+# Generated by Django 5.1.7 on 2026-10-17 22:59
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0015_patient_photo_thumbnails'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='patient',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='patientpayment',
+            name='payment_date',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.7 on 2026-10-17 23:16
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0016_created_at_default'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='patient',
+            name='updated_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.1.7 on 2026-10-17 23:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Qarzdor faol bemorlar: oxirgi to‘lov (payment_patient_date_idx orqali) va qarz qaysi sanadan beri turgani
+DEBT_SUMMARY_QUERY = """
+    SELECT patient_id, region_id, type_disease_id, remaining_debt, last_payment_at,
+           COALESCE(last_payment_at, created_at) AS debt_since, {now} AS refreshed_at
+    FROM (
+        SELECT p.id AS patient_id, p.region_id, p.type_disease_id, p.remaining_debt, p.created_at,
+               (SELECT MAX(pp.payment_date) FROM monitoring_patientpayment pp
+                WHERE pp.patient_id = p.id) AS last_payment_at
+        FROM monitoring_patient p
+        WHERE NOT p.is_deleted AND p.remaining_debt > 0
+    ) AS debts
+"""
+
+
+def create_debt_summary(apps, schema_editor):
+    """PostgreSQL'da materialized view (CONCURRENTLY yangilash uchun unique indeks bilan), boshqa bazalarda view"""
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('CREATE MATERIALIZED VIEW monitoring_patient_debt_summary AS '
+                              + DEBT_SUMMARY_QUERY.format(now='now()'))
+        schema_editor.execute('CREATE UNIQUE INDEX monitoring_patient_debt_summary_pk '
+                              'ON monitoring_patient_debt_summary (patient_id)')
+    else:
+        schema_editor.execute('CREATE VIEW monitoring_patient_debt_summary AS '
+                              + DEBT_SUMMARY_QUERY.format(now='CURRENT_TIMESTAMP'))
+
+
+def drop_debt_summary(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP MATERIALIZED VIEW IF EXISTS monitoring_patient_debt_summary')
+    else:
+        schema_editor.execute('DROP VIEW IF EXISTS monitoring_patient_debt_summary')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0017_patient_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PatientDebtSummary',
+            fields=[
+                ('patient', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='debt_summary', serialize=False, to='monitoring.patient')),
+                ('region', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='monitoring.region')),
+                ('type_disease', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='monitoring.typedisease')),
+                ('remaining_debt', models.DecimalField(decimal_places=2, max_digits=50)),
+                ('last_payment_at', models.DateTimeField(null=True)),
+                ('debt_since', models.DateTimeField()),
+                ('refreshed_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'monitoring_patient_debt_summary',
+                'managed': False,
+            },
+        ),
+        migrations.AddIndex(
+            model_name='patientpayment',
+            index=models.Index(fields=['patient', '-payment_date'], name='payment_patient_date_idx'),
+        ),
+        migrations.RunPython(create_debt_summary, drop_debt_summary),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.7 on 2026-10-17 23:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0018_patient_debt_summary'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='patient',
+            name='patient_phone_digits_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='patient',
+            name='patient_phone_reversed_idx',
+        ),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['phone_digits'], include=('id', 'full_name', 'phone_number', 'status'), name='patient_phone_digits_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['phone_digits_reversed'], include=('id', 'full_name', 'phone_number', 'status'), name='patient_phone_reversed_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
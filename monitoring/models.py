@@ -1,7 +1,13 @@
-from django.db import models
-from django.db.models import Sum
+from django.contrib.postgres.indexes import GinIndex
+from django.db import connection, models, transaction
+from django.db.models import Count, F, Max, Q, Sum
+from django.utils import timezone
+from datetime import timedelta
 from decimal import Decimal
 
+from .search import normalize_name, normalize_phone
+from .thumbnails import schedule_thumbnails
+
 
 class Region(models.Model):
     name = models.CharField(max_length=100)
@@ -25,10 +31,18 @@ class Patient(models.Model):
     ]
 
     full_name = models.CharField(max_length=255)
+    # Qidiruv uchun normallashtirilgan ism (kichik harf, lotin, apostrofsiz), save() da to‘ldiriladi
+    search_name = models.CharField(max_length=255, blank=True, default='', editable=False)
     phone_number = models.CharField(max_length=20)
+    # Faqat raqamlar (milliy 9 xonali qism) va uning teskarisi: qo‘ng‘iroq qilgan raqamni indeks orqali topish uchun
+    phone_digits = models.CharField(max_length=20, blank=True, default='', editable=False)
+    phone_digits_reversed = models.CharField(max_length=20, blank=True, default='', editable=False)
     region = models.ForeignKey(Region, on_delete=models.SET_NULL, null=True)
     address = models.TextField(blank=True, null=True)
     photo = models.ImageField(upload_to='patients/photos/', blank=True, null=True)
+    # Ro‘yxatlar uchun kichik nusxalar: rasm o‘zgarganda fon oqimida yaratiladi (monitoring.thumbnails)
+    photo_small = models.ImageField(upload_to='patients/photos/thumbs/', blank=True, null=True, editable=False)
+    photo_medium = models.ImageField(upload_to='patients/photos/thumbs/', blank=True, null=True, editable=False)
     type_disease = models.ForeignKey(TypeDisease, on_delete=models.SET_NULL, null=True, related_name='appointments')
     face_condition = models.TextField(blank=True, null=True)
     medications_taken = models.TextField(blank=True, null=True)
@@ -36,32 +50,141 @@ class Patient(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='debtor')
     total_payment_due = models.DecimalField(max_digits=50, decimal_places=2,
                                             default=0.00)  # Umumiy to‘lanishi kerak bo‘lgan summa
-    created_at = models.DateTimeField(auto_now_add=True)
+    # To‘langan jami summa: faqat to‘lovlar orqali atomar (F() bilan) yangilanadi
+    total_paid = models.DecimalField(max_digits=50, decimal_places=2, default=0.00, editable=False)
+    # Qolgan qarz: bazaning o‘zida hisoblanadi, hech qachon eskirmaydi
+    remaining_debt = models.GeneratedField(
+        expression=F('total_payment_due') - F('total_paid'),
+        output_field=models.DecimalField(max_digits=50, decimal_places=2),
+        db_persist=True,
+    )
+    # auto_now_add emas: import va bulk_create'da tarixiy sana berilsa saqlanadi
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    # Oxirgi o‘zgarish: save(), to‘lovlar, uchrashuvlar va thumbnail'lar yangilaydi (ETag/Last-Modified uchun)
+    updated_at = models.DateTimeField(default=timezone.now, editable=False, db_index=True)
 
     # Soft delete maydoni
     is_deleted = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination: (-created_at, id) tartibidagi faol bemorlar ro‘yxatlari uchun
+            models.Index(fields=['-created_at', 'id'], condition=Q(is_deleted=False),
+                         name='patient_active_created_idx'),
+            models.Index(fields=['status', '-created_at', 'id'], condition=Q(is_deleted=False),
+                         name='patient_status_created_idx'),
+            # Telefon bo‘yicha aniq/prefiks (va teskari ustun orqali suffiks) qidiruv; INCLUDE'dagi ustunlar
+            # qidiruv javobidagi maydonlar, shuning uchun ikkala indeks ham jadvalga murojaat qilmaydi
+            models.Index(fields=['phone_digits'], opclasses=['varchar_pattern_ops'],
+                         include=['id', 'full_name', 'phone_number', 'status'], condition=Q(is_deleted=False),
+                         name='patient_phone_digits_idx'),
+            models.Index(fields=['phone_digits_reversed'], opclasses=['varchar_pattern_ops'],
+                         include=['id', 'full_name', 'phone_number', 'status'], condition=Q(is_deleted=False),
+                         name='patient_phone_reversed_idx'),
+            # Ism bo‘yicha fuzzy qidiruv (pg_trgm)
+            GinIndex(fields=['search_name'], opclasses=['gin_trgm_ops'], name='patient_search_name_trgm'),
+        ]
+
+    # Oddiy save() qayta yozmaydigan balans maydonlari (ular faqat apply_payment orqali o‘zgaradi)
+    BALANCE_FIELDS = ('total_paid',)
+    # Oddiy save() qayta yozmaydigan thumbnail maydonlari (ular faqat fon vazifasida yoziladi)
+    THUMBNAIL_FIELDS = ('photo_small', 'photo_medium')
+    # Statistika hisoblagichlariga ta’sir qiluvchi maydonlar
+    COUNTED_FIELDS = ('status', 'is_deleted')
+
     def __str__(self):
         return self.full_name if self.full_name else "Nomalum"
 
-    @property
-    def total_paid(self):
-        """Bemor tomonidan to‘langan jami summa"""
-        total = self.payments.aggregate(total=Sum('amount'))['total']
-        return Decimal(str(total)) if total is not None else Decimal('0.00')
-
-    @property
-    def remaining_debt(self):
-        """Bemorning qolgan qarzi (manfiy bo‘lsa ham xato chiqarmaydi)"""
-        return self.total_payment_due - self.total_paid  # ✅ TypeError chiqmaydi
-
-    def update_status(self):
-        """Agar qarz <= 0 bo‘lsa, statusni `paid`ga o‘zgartirish"""
-        if self.remaining_debt <= Decimal('0.00'):
-            self.status = 'paid'
-        else:
-            self.status = 'debtor'
-        self.save()
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._counted_status = instance._active_status()
+        instance._loaded_photo = instance._photo_name()
+        return instance
+
+    def _photo_name(self):
+        photo = self.__dict__.get('photo')
+        return getattr(photo, 'name', photo) or ''
+
+    def _active_status(self):
+        """Hisoblagichlarda qaysi status ostida sanaladi (o‘chirilgan bo‘lsa None, noma’lum bo‘lsa ...)"""
+        if not all(name in self.__dict__ for name in self.COUNTED_FIELDS):
+            return Ellipsis  # Maydonlar yuklanmagan (only/defer): hisoblagich tegilmaydi
+        return None if self.is_deleted else self.status
+
+    def save(self, *args, **kwargs):
+        """
+        Mavjud bemorni saqlashda eskirgan `total_paid` qiymati parallel
+        to‘lovlar natijasini ustidan yozib yubormasligi uchun balans maydonlari tashlab ketiladi
+        """
+        self.search_name = normalize_name(self.full_name)
+        self.phone_digits = normalize_phone(self.phone_number)
+        self.phone_digits_reversed = self.phone_digits[::-1]
+        self.updated_at = timezone.now()
+        update_fields = kwargs.get('update_fields')
+        if not self._state.adding and update_fields is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and not field.generated
+                and field.name not in self.BALANCE_FIELDS + self.THUMBNAIL_FIELDS
+            ]
+        elif update_fields is not None:
+            update_fields = set(update_fields) | {'updated_at'}
+            if 'full_name' in update_fields:
+                update_fields.add('search_name')
+            if 'phone_number' in update_fields:
+                update_fields.update(('phone_digits', 'phone_digits_reversed'))
+            kwargs['update_fields'] = update_fields
+
+        counted_status = None if self._state.adding else getattr(self, '_counted_status', Ellipsis)
+        saved_fields = kwargs.get('update_fields')
+        counts_changed = saved_fields is None or not set(self.COUNTED_FIELDS).isdisjoint(saved_fields)
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+            if counts_changed:
+                active_status = self._active_status()
+                if Ellipsis not in (counted_status, active_status):
+                    PatientStatusCounter.shift(counted_status, active_status)
+                self._counted_status = active_status
+            if saved_fields is None or 'photo' in saved_fields:
+                photo_name = self._photo_name()
+                if photo_name != getattr(self, '_loaded_photo', ''):
+                    schedule_thumbnails(self.pk)
+                self._loaded_photo = photo_name
+
+    @classmethod
+    def apply_payment(cls, patient_id, amount, active_only=False):
+        """
+        To‘langan summani (va kerak bo‘lsa statusni) o‘zgartirish. Yangilangan qatorlar sonini qaytaradi.
+
+        Ko‘p uchraydigan holatda status o‘zgarmaydi: bu bitta shartli UPDATE bilan, qulfsiz bajariladi
+        (shart qatorning joriy qiymatlari bo‘yicha tekshiriladi, parallel to‘lovlar yo‘qolmaydi).
+        Status o‘zgaradigan bo‘lsagina qator qulflanadi, chunki statistika hisoblagichlari eski statusni bilishi kerak.
+        """
+        patients = cls.active_patients() if active_only else cls.objects.all()
+        total_paid = F('total_paid') + amount
+        updated_at = timezone.now()
+        with transaction.atomic(savepoint=False):
+            unchanged_status = (Q(status='debtor', total_payment_due__gt=total_paid) |
+                                Q(status='paid', total_payment_due__lte=total_paid))
+            if patients.filter(unchanged_status, pk=patient_id).update(total_paid=total_paid,
+                                                                        updated_at=updated_at):
+                return 1
+
+            current = patients.select_for_update().filter(pk=patient_id).values(
+                'status', 'is_deleted', 'total_paid', 'total_payment_due').first()
+            if current is None:
+                return 0
+            new_status = 'paid' if current['total_payment_due'] <= current['total_paid'] + amount else 'debtor'
+            patients.filter(pk=patient_id).update(total_paid=total_paid, status=new_status, updated_at=updated_at)
+            if not current['is_deleted']:
+                PatientStatusCounter.shift(current['status'], new_status)
+        return 1
+
+    @classmethod
+    def touch(cls, *patient_ids):
+        """Bemor bilan bog‘liq ma’lumot (masalan, uchrashuv) o‘zgarganda `updated_at` ni yangilash"""
+        cls.objects.filter(pk__in=[pk for pk in patient_ids if pk]).update(updated_at=timezone.now())
 
     def delete(self, *args, **kwargs):
         """Soft delete: faqat `is_deleted` ni True qilish"""
@@ -74,15 +197,107 @@ class Patient(models.Model):
         return cls.objects.filter(is_deleted=False)
 
 
+class PatientStatusCounter(models.Model):
+    """
+    Faol bemorlarning status bo‘yicha soni. Bemor yaratilganda, o‘chirilganda yoki statusi
+    o‘zgarganda shu tranzaksiyada oshiriladi/kamaytiriladi, shuning uchun statistika COUNT talab qilmaydi.
+    Farqlar `check_patient_counters --fix` bilan tuzatiladi.
+
+    Qatorlar har doim status nomi tartibida yangilanadi (`apply`), shuning uchun qarama-qarshi o‘tishlar
+    (debtor→paid va paid→debtor) bir-birini deadlock qilmaydi. Har bir status bitta qator: yangi bemorlar
+    `debtor` qatorining qulfida commit'gacha navbat kutadi. Yaratish oqimi bunga yetadigan darajada o‘ssa,
+    hisoblagichni (status, shard) qatorlarga bo‘lib, o‘qishda SUM qilish kerak bo‘ladi.
+    """
+    status = models.CharField(max_length=20, unique=True)
+    count = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.status}: {self.count}"
+
+    @classmethod
+    def shift(cls, old_status, new_status):
+        """Bemorni `old_status` hisobidan `new_status` hisobiga o‘tkazish (None — sanalmaydi)"""
+        if old_status == new_status:
+            return
+        deltas = {}
+        if old_status:
+            deltas[old_status] = -1
+        if new_status:
+            deltas[new_status] = 1
+        cls.apply(deltas)
+
+    @classmethod
+    def apply(cls, deltas):
+        """`{status: farq}` ni qo‘llash; qatorlar deadlock bo‘lmasligi uchun status tartibida qulflanadi"""
+        for status in sorted(deltas):
+            if deltas[status]:
+                cls._add(status, deltas[status])
+
+    @classmethod
+    def _add(cls, status, delta):
+        if not cls.objects.filter(status=status).update(count=F('count') + delta):
+            cls.objects.get_or_create(status=status)
+            cls.objects.filter(status=status).update(count=F('count') + delta)
+
+    @classmethod
+    def live_counts(cls):
+        """Faol bemorlarni jonli sanash (GROUP BY status)"""
+        counts = dict(Patient.active_patients().order_by().values_list('status').annotate(Count('id')))
+        return {status: counts.get(status, 0) for status, _ in Patient.STATUS_CHOICES} | counts
+
+    @classmethod
+    def compare(cls):
+        """Saqlangan va jonli sonlar farqi: {status: (saqlangan, jonli)}"""
+        stored = dict(cls.objects.values_list('status', 'count'))
+        live = cls.live_counts()
+        return {status: (stored.get(status, 0), live.get(status, 0))
+                for status in stored.keys() | live.keys() if stored.get(status, 0) != live.get(status, 0)}
+
+    @classmethod
+    def reconcile(cls):
+        """
+        Hisoblagichlarni jonli sanash bilan tenglashtirish. Qatorlar qulflanadi: parallel o‘zgarishlar
+        yoki sanashga kiradi, yoki qulf bo‘shagach ustiga qo‘shiladi. Tuzatilgan farqlarni qaytaradi.
+        """
+        with transaction.atomic():
+            stored = dict(cls.objects.select_for_update().order_by('status').values_list('status', 'count'))
+            live = cls.live_counts()
+            for status, count in live.items():
+                if status not in stored:
+                    cls.objects.create(status=status, count=count)
+                elif stored[status] != count:
+                    cls.objects.filter(status=status).update(count=count)
+            cls.objects.exclude(status__in=live.keys()).update(count=0)
+        return {status: (stored.get(status, 0), count) for status, count in live.items()
+                if stored.get(status, 0) != count}
+
+
 class Appointment(models.Model):
     patient = models.ForeignKey(Patient, on_delete=models.SET_NULL, null=True, related_name='appointments')
     appointment_time = models.DateTimeField()
 
+    class Meta:
+        indexes = [
+            # Sana oralig‘i bo‘yicha taqvim va "ertangi" so‘rovlar uchun
+            models.Index(fields=['appointment_time', 'patient'], name='appointment_time_patient_idx'),
+        ]
+
     def __str__(self):
         full_name = self.patient.full_name if self.patient and self.patient.full_name else "Nomalum"
         appointment_time = self.appointment_time if self.appointment_time else "Nomalum"
         return f"{full_name} - {appointment_time}"
 
+    # bulk_create/queryset.delete() bu metodlarni chetlab o‘tadi: u yerlarda bemorning o‘zi saqlanadi
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        Patient.touch(self.patient_id)
+
+    def delete(self, *args, **kwargs):
+        patient_id = self.patient_id
+        result = super().delete(*args, **kwargs)
+        Patient.touch(patient_id)
+        return result
+
 
 class PatientPayment(models.Model):
     """
@@ -91,7 +306,13 @@ class PatientPayment(models.Model):
     # patient = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name='payments')
     patient = models.ForeignKey(Patient, on_delete=models.SET_NULL, null=True, related_name='payments')
     amount = models.DecimalField(max_digits=10, decimal_places=2)  # To‘lov summasi
-    payment_date = models.DateTimeField(auto_now_add=True)  # To‘lov sanasi
+    payment_date = models.DateTimeField(default=timezone.now, editable=False)  # To‘lov sanasi
+
+    class Meta:
+        indexes = [
+            # Bemorning oxirgi to‘lovi (qarz yoshi hisobotida MAX(payment_date) indeksdan olinadi)
+            models.Index(fields=['patient', '-payment_date'], name='payment_patient_date_idx'),
+        ]
 
     def __str__(self):
         full_name = self.patient.full_name if self.patient and self.patient.full_name else "Nomalum"
@@ -100,6 +321,83 @@ class PatientPayment(models.Model):
         return f"{full_name} - {amount} ({payment_date})"
 
     def save(self, *args, **kwargs):
-        """To‘lov kiritilganda bemorning qarzini va statusini yangilash"""
-        super().save(*args, **kwargs)
-        self.patient.update_status()
+        """To‘lov kiritilganda (yoki o‘zgartirilganda) bemorning qarzini va statusini yangilash"""
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding:
+                previous = PatientPayment.objects.select_for_update().filter(pk=self.pk).values(
+                    'patient_id', 'amount').first()
+            super().save(*args, **kwargs)
+
+            if previous and previous['patient_id']:
+                Patient.apply_payment(previous['patient_id'], -previous['amount'])
+            if self.patient_id:
+                Patient.apply_payment(self.patient_id, self.amount)
+
+
+class PatientDebtSummary(models.Model):
+    """
+    Qarzdor bemorlar bo‘yicha yig‘ma: qolgan qarz va qarz qaysi sanadan beri turgani (oxirgi to‘lov,
+    to‘lov bo‘lmasa bemor yaratilgan sana). PostgreSQL'da materialized view (`refresh()` bilan davriy
+    yangilanadi), boshqa bazalarda oddiy view. Jadval migratsiyada yaratiladi, Django uni boshqarmaydi.
+    """
+    # (kalit, kamida kun, ko‘pi bilan kun)
+    AGING_BUCKETS = (
+        ('days_0_30', 0, 30),
+        ('days_31_60', 31, 60),
+        ('days_61_90', 61, 90),
+        ('days_90_plus', 91, None),
+    )
+    GROUP_FIELDS = ('region', 'type_disease')
+
+    patient = models.OneToOneField(Patient, on_delete=models.DO_NOTHING, primary_key=True, db_constraint=False,
+                                   related_name='debt_summary')
+    region = models.ForeignKey(Region, on_delete=models.DO_NOTHING, null=True, db_constraint=False,
+                               related_name='+')
+    type_disease = models.ForeignKey(TypeDisease, on_delete=models.DO_NOTHING, null=True, db_constraint=False,
+                                     related_name='+')
+    remaining_debt = models.DecimalField(max_digits=50, decimal_places=2)
+    last_payment_at = models.DateTimeField(null=True)
+    debt_since = models.DateTimeField()
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        managed = False
+        db_table = 'monitoring_patient_debt_summary'
+
+    @classmethod
+    def refresh(cls):
+        """Materialized view'ni qayta hisoblash (CONCURRENTLY: hisobot yangilanish paytida ham o‘qiladi)"""
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(f'REFRESH MATERIALIZED VIEW CONCURRENTLY {cls._meta.db_table}')
+
+    @classmethod
+    def aging(cls, group_by=None, now=None):
+        """
+        Qarzning yoshi bo‘yicha taqsimoti bitta SQL so‘rovda (shartli SUM). Oraliqlar so‘rov vaqtiga
+        nisbatan hisoblanadi, shuning uchun yangilanishlar orasida ham qarz eskirib boradi.
+        `group_by` — `region` yoki `type_disease`; berilsa har bir guruh va jami qaytadi.
+        """
+        now = now or timezone.now()
+        aggregates = {'patients': Count('pk'), 'total': Sum('remaining_debt', default=Decimal('0.00'))}
+        for key, low, high in cls.AGING_BUCKETS:
+            condition = Q()
+            if low:
+                condition &= Q(debt_since__lte=now - timedelta(days=low))
+            if high is not None:
+                condition &= Q(debt_since__gt=now - timedelta(days=high + 1))
+            aggregates[key] = Sum('remaining_debt', filter=condition, default=Decimal('0.00'))
+        refreshed = Max('refreshed_at')
+
+        summaries = cls.objects.order_by()
+        if not group_by:
+            totals = summaries.aggregate(**aggregates, refreshed_at=refreshed)
+            return {'refreshed_at': totals.pop('refreshed_at'), 'groups': [], 'total': totals}
+
+        groups = list(summaries.values(id=F(f'{group_by}_id'), name=F(f'{group_by}__name'))
+                      .annotate(**aggregates, refreshed_at=refreshed).order_by('-total', 'id'))
+        totals = {key: sum((group[key] for group in groups), 0 if key == 'patients' else Decimal('0.00'))
+                  for key in aggregates}
+        refreshed_at = max((group.pop('refreshed_at') for group in groups), default=None)
+        return {'refreshed_at': refreshed_at, 'groups': groups, 'total': totals}
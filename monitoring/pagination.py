@@ -0,0 +1,141 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class PatientPagination(PageNumberPagination):
+    """
+    Bemorlar ro‘yxati uchun pagination
+    """
+    page_size = 10  # Har bir sahifada 10 ta bemor chiqadi
+    page_size_query_param = 'page_size'  # Foydalanuvchi o‘zi sonni belgilashi mumkin
+    max_page_size = 100  # Maksimal 100 ta bemor
+
+
+class PatientKeysetPagination(BasePagination):
+    """
+    Bemorlar ro‘yxati uchun keyset (cursor) pagination.
+    Tartib `(-created_at, id)`; keyingi sahifa OFFSET emas, oxirgi qator kaliti bo‘yicha
+    indeks orqali topiladi, shuning uchun chuqur sahifalar ham birinchi sahifa kabi tez.
+    COUNT(*) faqat `?with_count=1` so‘ralganda bajariladi.
+
+    Tartib har doim `(-created_at, id)`: `?ordering=` bu rejimda 400 qaytaradi, `?search=` esa faqat
+    filterlaydi (PostgreSQL'dagi o‘xshashlik bo‘yicha saralash cursor tartibi bilan almashtiriladi).
+    """
+    page_size = PatientPagination.page_size
+    page_size_query_param = PatientPagination.page_size_query_param
+    max_page_size = PatientPagination.max_page_size
+    cursor_query_param = 'cursor'
+    count_query_param = 'with_count'
+    invalid_cursor_message = 'Noto‘g‘ri cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get(api_settings.ORDERING_PARAM):
+            raise ValidationError({api_settings.ORDERING_PARAM: "Cursor pagination bilan tartiblab bo‘lmaydi"})
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.count = queryset.count() if self.wants_count(request) else None
+
+        position = self.decode_cursor(request)
+        reverse = bool(position and position[2])
+        if position:
+            created_at, pk = position[0], position[1]
+            # Chegaralovchi shart (`created_at <= c`) indeksda diapazon beradi: OR yolg‘iz bo‘lsa PostgreSQL
+            # indeksni boshidan o‘qib, cursor'gacha bo‘lgan qatorlarni tashlab ketadi
+            if reverse:
+                queryset = queryset.filter(Q(created_at__gte=created_at),
+                                           Q(created_at__gt=created_at) | Q(id__lt=pk))
+            else:
+                queryset = queryset.filter(Q(created_at__lte=created_at),
+                                           Q(created_at__lt=created_at) | Q(id__gt=pk))
+        ordering = ('created_at', '-id') if reverse else ('-created_at', 'id')
+
+        rows = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.page = rows
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(request.query_params[self.page_size_query_param], strict=True,
+                                 cutoff=self.max_page_size)
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def wants_count(self, request):
+        return request.query_params.get(self.count_query_param, '').lower() in ('1', 'true', 'yes')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode('ascii') + b'=' * (-len(encoded) % 4)))
+            created_at = parse_datetime(payload['c'])
+            pk = int(payload['i'])
+            reverse = bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, pk, reverse
+
+    def encode_cursor(self, instance, reverse):
+        if isinstance(instance, dict):  # values() qatori
+            payload = {'c': instance['created_at'].isoformat(), 'i': instance['id']}
+        else:
+            payload = {'c': instance.created_at.isoformat(), 'i': instance.pk}
+        if reverse:
+            payload['r'] = 1
+        encoded = urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode('ascii').rstrip('=')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        response = OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ])
+        if self.count is not None:
+            response['count'] = self.count
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'count': {'type': 'integer', 'description': '`?with_count=1` bo‘lganda'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,103 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+
+def _join(prefix, name):
+    return f'{prefix}__{name}' if prefix else name
+
+
+def _model_field(model, name):
+    try:
+        return model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return next((field for field in model._meta.concrete_fields if field.attname == name), None)
+
+
+def collect_plan(serializer, model, prefix=''):
+    """
+    Serializer maydonlaridan so‘rov rejasi: `(select_related, prefetches, only)`.
+    Ichma-ich serializer — select_related, `many=True` bog‘lanish — Prefetch (o‘z rejasi bilan),
+    oddiy maydonlar — only(). Maydon model ustuni bo‘lmasa (property, metod) bu darajadagi ustunlarni
+    aniqlab bo‘lmaydi: `only` None bo‘ladi va bu darajada ustunlar cheklanmaydi.
+    `source='*'` maydonlari kerakli ustunlarni `source_fields` atributida ko‘rsatadi.
+    """
+    select_related, prefetches, only = set(), [], set()
+    for field in serializer.fields.values():
+        if field.write_only or isinstance(field, serializers.SerializerMethodField):
+            continue  # Metod maydonlari obyekt ustunlariga tayanmasligi kerak
+        if field.source == '*':
+            source_fields = getattr(field, 'source_fields', None)
+            if source_fields is None:
+                only = None
+            elif only is not None:
+                only.update(_join(prefix, name) for name in source_fields)
+            continue
+
+        current_model, path = model, prefix
+        for position, attr in enumerate(field.source_attrs):
+            model_field = _model_field(current_model, attr) if current_model is not None else None
+            if model_field is None:
+                if current_model is model:
+                    only = None
+                break
+            path = _join(path, attr)
+            last = position == len(field.source_attrs) - 1
+
+            if model_field.many_to_many or model_field.one_to_many:
+                child = field.child if isinstance(field, serializers.ListSerializer) and last else None
+                related_queryset = model_field.related_model._default_manager.all()
+                if isinstance(child, serializers.BaseSerializer):
+                    # Ota obyektga bog‘lash uchun FK ustuni ham kerak
+                    remote = (model_field.field.name,) if model_field.one_to_many else ()
+                    related_queryset = plan_queryset(related_queryset, child, fields=remote)
+                prefetches.append(Prefetch(path, queryset=related_queryset))
+                break
+            if not model_field.is_relation:
+                if only is not None and current_model is model:
+                    only.add(path)
+                break
+
+            # Oldinga FK/one-to-one: JOIN bilan
+            if only is not None and current_model is model:
+                only.add(path)
+            if last and not isinstance(field, serializers.BaseSerializer):
+                break  # PrimaryKeyRelatedField kabi: faqat FK ustuni
+            select_related.add(path)
+            if last:
+                nested = collect_plan(field, model_field.related_model, path)
+                select_related |= nested[0]
+                prefetches += nested[1]
+                if only is not None and nested[2] is not None:
+                    only |= nested[2]
+                break
+            current_model = model_field.related_model
+            if only is not None:
+                # Nuqtali `source` (masalan, `region.name`): oxirgi ustun o‘zi yetadi
+                target = _model_field(current_model, field.source_attrs[position + 1])
+                if target is not None and not target.is_relation:
+                    only.add(_join(path, field.source_attrs[position + 1]))
+                    break
+    return select_related, prefetches, only
+
+
+def plan_queryset(queryset, serializer, prefix='', fields=()):
+    """
+    Queryset'ga serializer uchun minimal select_related/prefetch_related/only rejasini qo‘llash.
+    `prefix` — serializer modeli queryset modelidan qaysi bog‘lanish orqali olinishi (masalan, `patient`),
+    `fields` — serializerdan tashqari kerak bo‘ladigan ustunlar (masalan, ETag uchun `updated_at`).
+    Reja serializer maydonlaridan har safar qayta olinadi, shuning uchun serializer o‘zgarsa o‘zi yangilanadi.
+    """
+    if isinstance(serializer, type):
+        serializer = serializer()
+    model = serializer.Meta.model
+    select_related, prefetches, only = collect_plan(serializer, model, prefix)
+    if prefix:
+        select_related.add(prefix)
+    if select_related:
+        queryset = queryset.select_related(*sorted(select_related))
+    if prefetches:
+        queryset = queryset.prefetch_related(*prefetches)
+    if only is not None:
+        queryset = queryset.only(*sorted(only | set(fields) | ({prefix} if prefix else set())))
+    return queryset
@@ -0,0 +1,93 @@
+import re
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connections
+from django.db.models import Q
+from rest_framework.filters import SearchFilter
+
+# O‘zbek kirill harflarining lotin yozuvidagi mosligi (apostroflar keyin olib tashlanadi)
+CYRILLIC_TO_LATIN = str.maketrans({
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'ғ': "g'", 'д': 'd', 'е': 'e', 'ё': 'yo', 'ж': 'j',
+    'з': 'z', 'и': 'i', 'й': 'y', 'к': 'k', 'қ': 'q', 'л': 'l', 'м': 'm', 'н': 'n', 'о': 'o',
+    'ў': "o'", 'п': 'p', 'р': 'r', 'с': 's', 'т': 't', 'у': 'u', 'ф': 'f', 'х': 'x', 'ҳ': 'h',
+    'ц': 'ts', 'ч': 'ch', 'ш': 'sh', 'щ': 'sh', 'ъ': "'", 'ь': '', 'ы': 'i', 'э': 'e', 'ю': 'yu',
+    'я': 'ya',
+})
+# "o‘", "oʻ", "o'", "o`" kabi barcha variantlar bir xil ko‘rinishga keladi
+APOSTROPHES_RE = re.compile(r"['‘’ʻʼ`´]")
+SPACES_RE = re.compile(r'\s+')
+PHONE_LIKE_RE = re.compile(r'^[\d\s()+\-.]+$')
+NON_DIGITS_RE = re.compile(r'\D')
+# O‘zbekiston raqamlari: +998 XX XXX XX XX -> milliy qism 9 ta raqam
+COUNTRY_CODE = '998'
+NATIONAL_NUMBER_LENGTH = 9
+
+
+def normalize_name(value):
+    """
+    Ismni qidiruv uchun normallashtirish: kichik harf, kirill -> lotin, apostrofsiz.
+    "Oʻktam", "O'ktam" va "Ўктам" bir xil `oktam` ga aylanadi.
+    """
+    value = (value or '').lower().translate(CYRILLIC_TO_LATIN)
+    value = APOSTROPHES_RE.sub('', value)
+    return SPACES_RE.sub(' ', value).strip()
+
+
+def normalize_phone(value):
+    """
+    Telefon raqamidan faqat raqamlarni qoldirish; "+998 90 123-45-67", "998901234567" va
+    "90 123 45 67" hammasi `901234567` ga aylanadi.
+    """
+    digits = NON_DIGITS_RE.sub('', value or '')
+    if len(digits) == len(COUNTRY_CODE) + NATIONAL_NUMBER_LENGTH and digits.startswith(COUNTRY_CODE):
+        digits = digits[len(COUNTRY_CODE):]
+    return digits
+
+
+def phone_lookup_filter(value):
+    """
+    Raqam (yoki uning oxirgi qismi) bo‘yicha indeksli filter: to‘liq raqam `phone_digits` ga teng,
+    qisman raqam esa `phone_digits` boshiga yoki teskari ustun orqali oxiriga mos keladi.
+    """
+    digits = normalize_phone(value)
+    if not digits:
+        return None
+    if len(digits) >= NATIONAL_NUMBER_LENGTH:
+        return Q(phone_digits=digits[-NATIONAL_NUMBER_LENGTH:])
+    return Q(phone_digits__startswith=digits) | Q(phone_digits_reversed__startswith=digits[::-1])
+
+
+def search_patients(queryset, term):
+    """
+    Bemorlarni ism (trigram, xatolarga chidamli) yoki telefon raqami bo‘yicha qidirish.
+    PostgreSQL'da `search_name` ustunidagi pg_trgm GIN indeksi ishlatiladi va natija o‘xshashlik
+    bo‘yicha saralanadi.
+    """
+    term = (term or '').strip()
+    if not term:
+        return queryset
+
+    if PHONE_LIKE_RE.match(term):
+        phone_filter = phone_lookup_filter(term)
+        return queryset.filter(phone_filter) if phone_filter else queryset.none()
+
+    name = normalize_name(term)
+    name_filter = Q(search_name__contains=name)
+
+    if connections[queryset.db].vendor != 'postgresql':
+        return queryset.filter(name_filter)
+
+    return queryset.filter(
+        name_filter | Q(search_name__trigram_word_similar=name)
+    ).annotate(
+        search_rank=TrigramWordSimilarity(name, 'search_name')
+    ).order_by('-search_rank', '-created_at', 'id')
+
+
+class PatientSearchFilter(SearchFilter):
+    """
+    `?search=` parametri uchun bemor qidiruvi (DRF SearchFilter'ning icontains skanerlash o‘rniga)
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        return search_patients(queryset, request.query_params.get(self.search_param, ''))
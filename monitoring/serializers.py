@@ -1,3 +1,4 @@
+from django.db import transaction
 from rest_framework import serializers
 from .models import Patient, Appointment, Region, TypeDisease, PatientPayment
 from drf_extra_fields.fields import Base64ImageField
@@ -24,15 +25,66 @@ class AppointmentSerializer(serializers.ModelSerializer):
         fields = ['id', 'appointment_time']
 
 
+class ThumbnailImageField(serializers.ImageField):
+    """
+    Rasmning kichik nusxasi URL'i; nusxa hali tayyor bo‘lmasa asl rasm URL'i qaytadi
+    """
+
+    def __init__(self, thumbnail, **kwargs):
+        self.thumbnail = thumbnail
+        self.source_fields = (thumbnail, 'photo')  # So‘rov rejasi uchun (monitoring.planner)
+        kwargs.update(source='*', read_only=True)
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        return super().to_representation(getattr(instance, self.thumbnail) or instance.photo)
+
+
 # USer malumotlarini listda chiqarish
 class PatientSerializer(serializers.ModelSerializer):
     region = RegionSerializer()
     type_disease = TypeDiseaseSerializer()
+    photo = ThumbnailImageField('photo_small')  # Ro‘yxatda asl rasm emas, kichik nusxa
+    photo_medium = ThumbnailImageField('photo_medium')
 
     class Meta:
         model = Patient
         fields = [
-            'id', 'photo', 'full_name', 'type_disease', 'phone_number', 'region', 'status', 'created_at']
+            'id', 'photo', 'photo_medium', 'full_name', 'type_disease', 'phone_number', 'region', 'status',
+            'created_at']
+
+
+# PatientSerializer uchun kerakli ustunlar: ro‘yxatlar model obyektlarisiz values() bilan o‘qiydi
+PATIENT_LIST_VALUES = ('id', 'photo', 'photo_small', 'photo_medium', 'full_name', 'type_disease_id',
+                       'type_disease__name', 'phone_number', 'region_id', 'region__name', 'status', 'created_at')
+
+
+def serialize_patient_values(rows, request=None):
+    """
+    `values(*PATIENT_LIST_VALUES)` qatorlaridan PatientSerializer bilan bir xil natija yig‘ish:
+    model obyektlari va ichma-ich serializerlar yaratilmaydi
+    """
+    storage = Patient._meta.get_field('photo').storage
+    created_at = serializers.DateTimeField()
+
+    def photo_url(name):
+        if not name:
+            return None
+        url = storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+
+    return [{
+        'id': row['id'],
+        'photo': photo_url(row['photo_small'] or row['photo']),
+        'photo_medium': photo_url(row['photo_medium'] or row['photo']),
+        'full_name': row['full_name'],
+        'type_disease': (None if row['type_disease_id'] is None
+                         else {'id': row['type_disease_id'], 'name': row['type_disease__name']}),
+        'phone_number': row['phone_number'],
+        'region': None if row['region_id'] is None else {'id': row['region_id'], 'name': row['region__name']},
+        'status': row['status'],
+        'created_at': created_at.to_representation(row['created_at']),
+    } for row in rows]
 
 
 # User malumotlarini yaratish
@@ -61,8 +113,8 @@ class PatientCreateSerializer(serializers.ModelSerializer):
         if created_appointments:
             Appointment.objects.bulk_create(created_appointments)
 
-        # 🔥 Appointment'larni qaytadan olib, ularni response uchun serializatsiya qilish
-        patient.refresh_from_db()
+        # Response uchun qayta so‘rov yubormaslik: yaratilgan appointment'lar shu yerda saqlanadi
+        patient.created_appointments = created_appointments
         return patient
 
     def to_representation(self, instance):
@@ -70,54 +122,116 @@ class PatientCreateSerializer(serializers.ModelSerializer):
         Ma'lumotlarni qayta formatlash, appointment'larni qo‘shish
         """
         data = super().to_representation(instance)
-        data['appointments'] = AppointmentSerializer(instance.appointments.all(), many=True).data
+        appointments = getattr(instance, 'created_appointments', None)
+        if appointments is None:
+            appointments = instance.appointments.all()
+        data['appointments'] = AppointmentSerializer(appointments, many=True).data
         return data
 
 
+class AppointmentWriteSerializer(serializers.Serializer):
+    """Tahrirlashdagi uchrashuv: `id` bo‘lsa mavjud uchrashuv (vaqti o‘zgarishi mumkin), bo‘lmasa yangi"""
+    id = serializers.IntegerField(required=False)
+    appointment_time = serializers.DateTimeField()
+
+
 # User malumotlarini tahrirlash
 class PatientUpdateSerializer(serializers.ModelSerializer):
+    """
+    Uchrashuvlar ikki usulda yangilanadi:
+    - `appointment_set` — kerakli to‘liq ro‘yxat: `id` li elementlar saqlanadi (vaqti ko‘chiriladi),
+      `id` siz elementlar qo‘shiladi, ro‘yxatda yo‘qlari o‘chiriladi;
+    - patch: `remove` (o‘chiriladigan ID'lar), `move` (`id` + yangi vaqt), `new_appointments` (yangi vaqtlar).
+    """
     photo = Base64ImageField(required=False)
-    appointments = AppointmentSerializer(many=True, required=False, read_only=True)  # Faqat o‘qish uchun
+    appointments = serializers.SerializerMethodField()  # Faqat o‘qish uchun
+    appointment_set = AppointmentWriteSerializer(many=True, required=False, write_only=True)
     remove = serializers.ListField(child=serializers.IntegerField(), required=False,
                                    write_only=True)  # O‘chiriladiganlar
-    new_appointments = serializers.ListField(child=serializers.DictField(), required=False,
-                                             write_only=True)  # Yangi qo‘shiladiganlar
+    move = AppointmentWriteSerializer(many=True, required=False, write_only=True)  # Vaqti o‘zgaradiganlar
+    new_appointments = AppointmentWriteSerializer(many=True, required=False,
+                                                  write_only=True)  # Yangi qo‘shiladiganlar
 
     class Meta:
         model = Patient
         fields = [
             'full_name', 'phone_number', 'region', 'address', 'photo',
-            'type_disease', 'face_condition', 'medications_taken',
-            'home_care_items', 'status', 'appointments', 'remove', 'new_appointments', 'total_payment_due'
+            'type_disease', 'face_condition', 'medications_taken', 'home_care_items', 'status', 'appointments',
+            'appointment_set', 'remove', 'move', 'new_appointments', 'total_payment_due'
         ]
 
-    def update(self, instance, validated_data):
-        # ❌ O‘chirilishi kerak bo‘lgan appointment ID-lari
-        remove_ids = validated_data.pop('remove', [])
-        if remove_ids:
-            instance.appointments.filter(id__in=remove_ids).delete()
-
-        # ➕ Yangi appointmentlar yaratish
-        new_appointments_data = validated_data.pop('new_appointments', [])
-        if new_appointments_data:
-            Appointment.objects.bulk_create([
-                Appointment(patient=instance, **appointment) for appointment in new_appointments_data
-            ])
-
-        # 🔄 Boshqa maydonlarni yangilash
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
+    def validate(self, attrs):
+        if 'appointment_set' in attrs and not {'remove', 'move', 'new_appointments'}.isdisjoint(attrs):
+            raise serializers.ValidationError(
+                "appointment_set bilan remove/move/new_appointments birga yuborilmaydi")
+        if any('id' not in item for item in attrs.get('move', [])):
+            raise serializers.ValidationError({'move': "Har bir elementda id bo‘lishi kerak"})
+        return attrs
 
+    def update(self, instance, validated_data):
+        """
+        Bemor va uchrashuvlarini bitta tranzaksiyada yangilash. Uchrashuvlar bo‘yicha minimal farq hisoblanadi
+        (bitta SELECT, keyin kerak bo‘lsa bittadan DELETE, bulk UPDATE va bulk INSERT), bemorning esa faqat
+        o‘zgargan ustunlari yoziladi. Natijadagi uchrashuvlar qayta so‘ralmaydi.
+        """
+        desired = validated_data.pop('appointment_set', None)
+        remove_ids = set(validated_data.pop('remove', []))
+        moves = validated_data.pop('move', [])
+        additions = validated_data.pop('new_appointments', [])
+
+        with transaction.atomic(savepoint=False):
+            appointments = {appointment.pk: appointment for appointment in
+                            instance.appointments.only('id', 'patient_id', 'appointment_time').order_by('id')}
+            if desired is not None:
+                moves = [item for item in desired if 'id' in item]
+                additions = [item for item in desired if 'id' not in item]
+                remove_ids = appointments.keys() - {item['id'] for item in moves}
+            unknown = sorted({item['id'] for item in moves} - appointments.keys())
+            if unknown:
+                raise serializers.ValidationError(
+                    {'appointment_set' if desired is not None else 'move':
+                     f"Bemorga tegishli bo‘lmagan uchrashuvlar: {', '.join(map(str, unknown))}"})
+
+            removed = remove_ids & appointments.keys()  # Boshqa bemorning ID'lari e’tiborsiz qoladi
+            moved = []
+            for item in moves:
+                appointment = appointments[item['id']]
+                if item['id'] not in removed and appointment.appointment_time != item['appointment_time']:
+                    appointment.appointment_time = item['appointment_time']
+                    moved.append(appointment)
+            created = [Appointment(patient=instance, appointment_time=item['appointment_time'])
+                       for item in additions]
+
+            if removed:
+                Appointment.objects.filter(pk__in=removed).delete()
+            if moved:
+                Appointment.objects.bulk_update(moved, ['appointment_time'])
+            if created:
+                Appointment.objects.bulk_create(created)
+
+            changed = []
+            for attr, value in validated_data.items():
+                field = instance._meta.get_field(attr)
+                if field.is_relation:  # Bog‘langan obyektni yuklamasdan ID bo‘yicha solishtirish
+                    attr, value = field.attname, value.pk if value is not None else None
+                if getattr(instance, attr) != value:
+                    setattr(instance, attr, value)
+                    changed.append(field.name)
+            if changed or removed or moved or created:
+                instance.save(update_fields=changed)  # updated_at ham yangilanadi
+
+        instance.synced_appointments = [appointment for pk, appointment in appointments.items()
+                                        if pk not in removed] + created
         return instance
 
-    def to_representation(self, instance):
+    def get_appointments(self, instance):
         """
-        🔄 Ma'lumotlarni frontend uchun formatlash (appointments qo‘shiladi)
+        🔄 Uchrashuvlar (update'dan keyin bazadan qayta so‘ralmaydi)
         """
-        data = super().to_representation(instance)
-        data['appointments'] = AppointmentSerializer(instance.appointments.all(), many=True).data
-        return data
+        appointments = getattr(instance, 'synced_appointments', None)
+        if appointments is None:
+            appointments = instance.appointments.all()
+        return AppointmentSerializer(appointments, many=True).data
 
 
 class PatientPaymentSerializer(serializers.ModelSerializer):
@@ -139,6 +253,8 @@ class PatientDetailSerializer(serializers.ModelSerializer):
     appointments = AppointmentSerializer(many=True, required=False)  # Bemor uchrashuvlari
     payments = PatientPaymentSerializer(many=True, read_only=True)  # To‘lovlar tarixi
     is_superuser = serializers.SerializerMethodField()  # Admin huquqini tekshirish
+    total_paid = serializers.ReadOnlyField()  # Saqlangan ustun, aggregate so‘rovisiz
+    remaining_debt = serializers.ReadOnlyField()  # Bazada hisoblanadigan ustun
 
     class Meta:
         model = Patient
@@ -147,6 +263,12 @@ class PatientDetailSerializer(serializers.ModelSerializer):
                   'total_payment_due', 'total_paid', 'remaining_debt', 'appointments', 'payments', 'is_superuser']
 
     def get_is_superuser(self, obj):
-        """Foydalanuvchi admin ekanligini tekshirish"""
+        """
+        Foydalanuvchi admin ekanligini tekshirish. Token claim'i emas, foydalanuvchining o‘zi o‘qiladi:
+        claim huquq olib tashlangandan keyin ham token muddati tugaguncha eski qiymatda qoladi.
+        `request.user` keshdan keladi (CachedJWTAuthentication), qo‘shimcha so‘rov yo‘q.
+        """
         request = self.context.get('request', None)
-        return request.user.is_superuser if request else False
+        if request is None:
+            return False
+        return request.user.is_superuser
@@ -0,0 +1,29 @@
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+from django.http import Http404
+
+from .models import Patient, PatientPayment
+
+
+def create_payment(patient_id, **data):
+    """
+    Yangi to‘lovni kiritish: INSERT va bemor balansi/statusining bitta shartli UPDATE'i
+    bitta qisqa tranzaksiyada bajariladi (aggregate va to‘liq Patient.save() yo‘q).
+    """
+    with transaction.atomic():
+        # UPDATE avval bajariladi: u bemor qatorini qulflaydi va bemor faolligini ham tekshiradi
+        if not Patient.apply_payment(patient_id, data['amount'], active_only=True):
+            raise Http404("Bemor topilmadi")
+        # bulk_create PatientPayment.save() ni chetlab o‘tadi, balans yuqorida allaqachon yangilangan
+        payment, = PatientPayment.objects.bulk_create([PatientPayment(patient_id=patient_id, **data)])
+    return payment
+
+
+def delete_payment(patient_id, payment_id):
+    """
+    Bemor to‘lovini o‘chirish: DELETE va balansni qaytaruvchi UPDATE (post_delete signali) bitta tranzaksiyada.
+    To‘lov qatori qulflanadi, shunda parallel ikki o‘chirish qarzni ikki marta qaytarmaydi.
+    """
+    with transaction.atomic():
+        payment = get_object_or_404(PatientPayment.objects.select_for_update(), pk=payment_id, patient_id=patient_id)
+        payment.delete()
@@ -0,0 +1,30 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import PATIENT_LIST, bump_reference_version
+from .models import Patient, PatientPayment, Region, TypeDisease
+
+
+@receiver(post_delete, sender=PatientPayment)
+def revert_payment_balance(sender, instance, **kwargs):
+    """To‘lov o‘chirilganda (admin bulk delete ham) bemor balansini qaytarish"""
+    if instance.patient_id:
+        Patient.apply_payment(instance.patient_id, -instance.amount)
+
+
+# Versiya commit'dan keyin oshiriladi: aks holda parallel o‘quvchi yangi versiya ostida eski qatorlarni keshlaydi
+@receiver([post_save, post_delete], sender=Region)
+def invalidate_regions(sender, **kwargs):
+    transaction.on_commit(lambda: bump_reference_version('regions'))
+
+
+@receiver([post_save, post_delete], sender=TypeDisease)
+def invalidate_diseases(sender, **kwargs):
+    transaction.on_commit(lambda: bump_reference_version('diseases'))
+
+
+@receiver(post_delete, sender=Patient)
+def invalidate_patient_lists(sender, **kwargs):
+    """Qattiq o‘chirish (admin, queryset.delete()) ro‘yxat validatori MAX(updated_at) ni o‘zgartirmaydi"""
+    transaction.on_commit(lambda: bump_reference_version(PATIENT_LIST))
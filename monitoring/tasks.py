@@ -0,0 +1,16 @@
+from jobs.queue import job
+
+from .models import PatientDebtSummary, PatientStatusCounter
+from .thumbnails import make_thumbnails  # noqa: F401  (worker'da vazifa ro‘yxatga olinishi uchun)
+
+
+@job(name='monitoring.reconcile_patient_counters', interval=60 * 60)
+def reconcile_patient_counters():
+    """Har soatda statistika hisoblagichlarini jonli sanash bilan tenglashtirish"""
+    PatientStatusCounter.reconcile()
+
+
+@job(name='monitoring.refresh_debt_summary', interval=15 * 60)
+def refresh_debt_summary():
+    """Har 15 daqiqada qarz yoshi hisoboti yig‘masini yangilash"""
+    PatientDebtSummary.refresh()
@@ -1,3 +1,1149 @@
-from django.test import TestCase
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+import csv
+import gzip
+import json
+import tempfile
+import uuid
+import zipfile
+import zoneinfo
+from datetime import timezone as dt_timezone
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.http import Http404, HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import parse_http_date
+from django.utils.translation import gettext_lazy
+from PIL import Image
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from Dr.middleware import CompressionMiddleware, fingerprint, negotiate_encoding
+from Dr.renderers import ORJSONParser, ORJSONRenderer
+
+from .benchmark import percentile
+from .exports import patient_rows
+from .models import Appointment, Patient, PatientDebtSummary, PatientPayment, PatientStatusCounter, Region, \
+    TypeDisease
+from .search import normalize_name, normalize_phone
+from .planner import collect_plan, plan_queryset
+from .serializers import PATIENT_LIST_VALUES, PatientDetailSerializer, PatientSerializer
+from .services import create_payment, delete_payment
+
+
+class PaymentPostingTests(TestCase):
+    def setUp(self):
+        self.patient = Patient.objects.create(full_name='Ali Valiyev', phone_number='+998901234567',
+                                              total_payment_due=Decimal('100.00'))
+
+    def test_payment_updates_balance_and_status(self):
+        create_payment(self.patient.pk, amount=Decimal('60.00'))
+        self.patient.refresh_from_db()
+        self.assertEqual(self.patient.total_paid, Decimal('60.00'))
+        self.assertEqual(self.patient.remaining_debt, Decimal('40.00'))
+        self.assertEqual(self.patient.status, 'debtor')
+
+        create_payment(self.patient.pk, amount=Decimal('40.00'))
+        self.patient.refresh_from_db()
+        self.assertEqual(self.patient.remaining_debt, Decimal('0.00'))
+        self.assertEqual(self.patient.status, 'paid')
+
+    def test_payment_is_one_insert_and_one_update(self):
+        with CaptureQueriesContext(connection) as captured:
+            create_payment(self.patient.pk, amount=Decimal('10.00'))
+        statements = [q['sql'].split()[0] for q in captured.captured_queries
+                      if not q['sql'].startswith(('SAVEPOINT', 'RELEASE SAVEPOINT'))]
+        self.assertEqual(statements, ['UPDATE', 'INSERT'])
+
+    def test_delete_payment_reverts_balance(self):
+        payment = create_payment(self.patient.pk, amount=Decimal('100.00'))
+        delete_payment(self.patient.pk, payment.pk)
+        self.patient.refresh_from_db()
+        self.assertEqual(self.patient.total_paid, Decimal('0.00'))
+        self.assertEqual(self.patient.status, 'debtor')
+        self.assertFalse(PatientPayment.objects.exists())
+
+    def test_deleted_patient_rejects_payment(self):
+        self.patient.delete()
+        with self.assertRaises(Http404):
+            create_payment(self.patient.pk, amount=Decimal('10.00'))
+        self.assertFalse(PatientPayment.objects.exists())
+
+    def test_stale_patient_save_keeps_balance(self):
+        stale = Patient.objects.get(pk=self.patient.pk)
+        create_payment(self.patient.pk, amount=Decimal('25.00'))
+        stale.full_name = 'Ali Valiev'
+        stale.save()
+        self.patient.refresh_from_db()
+        self.assertEqual(self.patient.total_paid, Decimal('25.00'))
+
+
+@skipUnlessDBFeature('has_select_for_update')  # SQLite butun bazani qulflaydi: parallel yozuvlar xato beradi
+class ConcurrentPaymentPostingTests(TransactionTestCase):
+    def test_parallel_postings_keep_balance_correct(self):
+        patient = Patient.objects.create(full_name='Parallel', phone_number='901112233',
+                                         total_payment_due=Decimal('100.00'))
+
+        def post(_):
+            try:
+                create_payment(patient.pk, amount=Decimal('5.00'))
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(post, range(20)))
+
+        patient.refresh_from_db()
+        self.assertEqual(PatientPayment.objects.filter(patient=patient).count(), 20)
+        self.assertEqual(patient.total_paid, Decimal('100.00'))
+        self.assertEqual(patient.remaining_debt, Decimal('0.00'))
+        self.assertEqual(patient.status, 'paid')
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='reception', password='x', role='doctor')
+        created_at = timezone.now()
+        patients = [Patient.objects.create(full_name=f'Bemor {i}', phone_number=str(i)) for i in range(25)]
+        # Bir xil created_at: tartibni faqat id hal qiladi
+        Patient.objects.filter(pk__in=[p.pk for p in patients[:5]]).update(created_at=created_at)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def walk(self, url):
+        ids, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(row['id'] for row in response.data['results'])
+            url, pages = response.data['next'], pages + 1
+        return ids, pages
+
+    def test_cursor_pages_follow_created_at_then_id(self):
+        ids, pages = self.walk(reverse('all-patients') + '?pagination=cursor&page_size=7')
+        expected = list(Patient.objects.order_by('-created_at', 'id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 4)
+
+    def test_previous_link_returns_previous_page(self):
+        first = self.client.get(reverse('all-patients') + '?pagination=cursor&page_size=10').data
+        second = self.client.get(first['next']).data
+        back = self.client.get(second['previous']).data
+        self.assertEqual([r['id'] for r in back['results']], [r['id'] for r in first['results']])
+
+    def test_count_only_on_request(self):
+        url = reverse('all-patients') + '?pagination=cursor'
+        self.assertNotIn('count', self.client.get(url).data)
+        self.assertEqual(self.client.get(url + '&with_count=1').data['count'], 25)
+
+    def test_page_number_mode_is_default(self):
+        data = self.client.get(reverse('all-patients')).data
+        self.assertEqual(data['count'], 25)
+        self.assertEqual(len(data['results']), 10)
+
+    def test_invalid_cursor_is_404(self):
+        self.assertEqual(self.client.get(reverse('all-patients') + '?cursor=bogus').status_code, 404)
+
+    def test_seek_predicate_is_bounded(self):
+        next_url = self.client.get(reverse('all-patients') + '?pagination=cursor&page_size=7').data['next']
+        previous_url = self.client.get(next_url).data['previous']
+        for url, bound, tie in ((next_url, '<=', ' > '), (previous_url, '>=', ' < ')):
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(url)
+            sql = queries[-1]['sql']
+            # `created_at <= c AND (created_at < c OR id > pk)`: indeks bo‘yicha diapazon
+            self.assertIn(f'"monitoring_patient"."created_at" {bound} ', sql)
+            self.assertIn(f'"monitoring_patient"."id"{tie}', sql)
+            self.assertIn(' AND (', sql)
+
+    def test_ordering_is_rejected_in_cursor_mode(self):
+        url = reverse('all-patients') + '?pagination=cursor&ordering=full_name'
+        self.assertEqual(self.client.get(url).status_code, 400)
+
+
+class PatientListValuesTests(TestCase):
+    """Ro‘yxatlarning values() yo‘li PatientSerializer bilan bir xil natija berishi kerak"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='values', password='x', role='doctor')
+        region = Region.objects.create(name='Namangan')
+        disease = TypeDisease.objects.create(name='Akne')
+        Patient.objects.create(full_name='To‘liq', phone_number='1', region=region, type_disease=disease,
+                               status='paid')
+        Patient.objects.create(full_name='Faqat rasm', phone_number='2')
+        Patient.objects.create(full_name='Bo‘sh', phone_number='3', region=region, status='treated')
+        # update(): kichik nusxa yaratish vazifasi ishga tushmasin
+        Patient.objects.filter(phone_number='1').update(photo='patients/photos/a.jpg',
+                                                        photo_small='patients/photos/thumbs/a_small.jpg')
+        Patient.objects.filter(phone_number='2').update(photo='patients/photos/b.jpg')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assertMatchesSerializer(self, response, queryset):
+        expected = PatientSerializer(queryset, many=True, context={'request': response.wsgi_request}).data
+        self.assertEqual(json.loads(response.content)['results'], json.loads(json.dumps(expected)))
+
+    def test_list_views_match_patient_serializer(self):
+        for name, status in [('all-patients', None), ('under-treatment-patients', 'paid'),
+                             ('treated-patients', 'treated')]:
+            queryset = Patient.active_patients().order_by('-created_at')
+            if status:
+                queryset = queryset.filter(status=status)
+            self.assertMatchesSerializer(self.client.get(reverse(name)), queryset)
+
+    def test_cursor_and_search_modes_match_patient_serializer(self):
+        response = self.client.get(reverse('all-patients'), {'pagination': 'cursor', 'page_size': 2})
+        self.assertMatchesSerializer(response, Patient.objects.order_by('-created_at', 'id')[:2])
+        self.assertIsNotNone(response.data['next'])
+        response = self.client.get(reverse('all-patients'), {'search': 'rasm'})
+        self.assertMatchesSerializer(response, Patient.objects.filter(phone_number='2'))
+
+    def test_async_list_matches_patient_serializer(self):
+        from rest_framework_simplejwt.tokens import AccessToken
+        response = async_to_sync(self.async_client.get)(
+            reverse('async-all-patients'), AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        expected = PatientSerializer(Patient.objects.order_by('-created_at'), many=True,
+                                     context={'request': response.asgi_request}).data
+        self.assertEqual(json.loads(response.content)['results'], json.loads(json.dumps(expected)))
+
+
+class QueryPlannerTests(TestCase):
+    def test_list_plan_is_covered_by_values_fast_path(self):
+        select_related, prefetches, only = collect_plan(PatientSerializer(), Patient)
+        self.assertEqual(select_related, {'region', 'type_disease'})
+        self.assertEqual(prefetches, [])  # Ro‘yxatda uchrashuvlar chiqmaydi
+        # PatientSerializer'ga maydon qo‘shilsa, PATIENT_LIST_VALUES ham yangilanishi kerak
+        covered = {name.split('__')[0].removesuffix('_id') for name in PATIENT_LIST_VALUES}
+        self.assertLessEqual({name.split('__')[0] for name in only}, covered)
+
+    def test_detail_plan_loads_everything_in_three_queries(self):
+        patient = Patient.objects.create(full_name='Ali', phone_number='1',
+                                         region=Region.objects.create(name='Qo‘qon'),
+                                         type_disease=TypeDisease.objects.create(name='Akne'))
+        Appointment.objects.create(patient=patient, appointment_time=timezone.now())
+        create_payment(patient.pk, amount=Decimal('5'))
+        expected = PatientDetailSerializer(Patient.objects.get(pk=patient.pk)).data
+        # Bemor (JOIN bilan), uchrashuvlar, to‘lovlar; kechiktirilgan ustunlar o‘qilmaydi
+        with self.assertNumQueries(3):
+            planned = plan_queryset(Patient.objects.all(), PatientDetailSerializer).get(pk=patient.pk)
+            self.assertEqual(PatientDetailSerializer(planned).data, expected)
+        self.assertNotIn('search_name', planned.__dict__)
+
+    def test_plan_follows_serializer_changes(self):
+        class WithAddress(PatientSerializer):
+            region_name = serializers.CharField(source='region.name')
+
+            class Meta(PatientSerializer.Meta):
+                fields = PatientSerializer.Meta.fields + ['address', 'region_name']
+
+        only = collect_plan(WithAddress(), Patient)[2]
+        self.assertLessEqual({'address', 'region__name'}, only)
+
+        class WithProperty(PatientSerializer):
+            label = serializers.CharField(source='__str__')
+
+            class Meta(PatientSerializer.Meta):
+                fields = PatientSerializer.Meta.fields + ['label']
+
+        self.assertIsNone(collect_plan(WithProperty(), Patient)[2])  # Property: ustunlar cheklanmaydi
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='tablet', password='x', role='doctor')
+        cls.region = Region.objects.create(name='Jizzax')
+        cls.patient = Patient.objects.create(full_name='Ali', phone_number='1', region=cls.region,
+                                             total_payment_due=Decimal('100'))
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.detail_url = f'/monitoring/patients/{self.patient.pk}/'
+
+    def assertRevalidates(self, url, change):
+        """`change()` dan oldin 304, keyin esa yangi ETag bilan 200 qaytishi kerak"""
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):  # Ma’lumotnoma versiyasi commit'dan keyin oshadi
+            change()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_detail_is_revalidated_after_related_changes(self):
+        self.assertRevalidates(self.detail_url, lambda: create_payment(self.patient.pk, amount=Decimal('10')))
+        self.assertRevalidates(self.detail_url, lambda: Appointment.objects.create(
+            patient=self.patient, appointment_time=timezone.now()))
+        self.assertRevalidates(self.detail_url, lambda: Region.objects.filter(pk=self.region.pk).first().save())
+
+    def test_detail_if_modified_since_is_not_trusted(self):
+        response = self.client.get(self.detail_url)
+        updated_at = Patient.objects.get(pk=self.patient.pk).updated_at
+        self.assertGreaterEqual(parse_http_date(response['Last-Modified']), updated_at.timestamp())  # Yuqoriga
+        # Shu soniya ichidagi tahrirni Last-Modified ajrata olmaydi: faqat ETag bo‘yicha 304 beriladi
+        Patient.objects.filter(pk=self.patient.pk).update(updated_at=updated_at + timedelta(microseconds=1))
+        self.assertEqual(self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+                         .status_code, 200)
+        self.assertEqual(self.client.get('/monitoring/patients/0/', HTTP_IF_NONE_MATCH='"x"').status_code, 404)
+
+    def test_lists_are_revalidated_after_patient_changes(self):
+        url = reverse('all-patients')
+        self.assertRevalidates(url, lambda: Patient.objects.create(full_name='Vali', phone_number='2'))
+        self.assertRevalidates(url, lambda: self.patient.delete())
+        self.assertRevalidates(url, lambda: Patient.objects.filter(full_name='Vali').delete())  # Qattiq o‘chirish
+
+
+class PatientUpdateSyncTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='sync', password='x', role='doctor')
+        cls.patient = Patient.objects.create(full_name='Ali', phone_number='1', address='Eski manzil')
+        cls.times = [timezone.make_aware(datetime(2030, 1, day, 10)) for day in range(1, 6)]
+        cls.appointments = Appointment.objects.bulk_create(
+            [Appointment(patient=cls.patient, appointment_time=moment) for moment in cls.times[:3]])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f'/monitoring/patients/update/{self.patient.pk}/'
+
+    def test_appointment_set_applies_minimal_diff(self):
+        keep, move, drop = self.appointments
+        payload = {'appointment_set': [
+            {'id': keep.pk, 'appointment_time': self.times[0].isoformat()},
+            {'id': move.pk, 'appointment_time': self.times[3].isoformat()},
+            {'appointment_time': self.times[4].isoformat()},
+        ]}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.put(self.url, payload, format='json')
+        self.assertEqual(response.status_code, 200)
+        statements = [query['sql'].split()[0] for query in queries if 'SAVEPOINT' not in query['sql']]
+        # Bemor, uchrashuvlar, DELETE, bulk UPDATE, bulk INSERT, faqat updated_at yangilanadi
+        self.assertEqual(statements, ['SELECT', 'SELECT', 'DELETE', 'UPDATE', 'INSERT', 'UPDATE'])
+
+        stored = list(Appointment.objects.filter(patient=self.patient)
+                      .order_by('id').values_list('id', 'appointment_time'))
+        self.assertEqual(stored[:2], [(keep.pk, self.times[0]), (move.pk, self.times[3])])
+        self.assertEqual(stored[2][1], self.times[4])
+        self.assertEqual([row['id'] for row in response.data['appointments']], [row[0] for row in stored])
+
+    def test_only_changed_columns_are_written(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.put(self.url, {'address': 'Yangi manzil', 'full_name': 'Ali'}, format='json')
+        update, = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+        self.assertIn('"address"', update)
+        self.assertNotIn('"full_name"', update)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.put(self.url, {'address': 'Yangi manzil'}, format='json')
+        statements = [query['sql'].split()[0] for query in queries if 'SAVEPOINT' not in query['sql']]
+        self.assertEqual(statements, ['SELECT', 'SELECT'])  # Hech narsa o‘zgarmasa yozilmaydi
+
+    def test_patch_mode_and_foreign_ids(self):
+        other = Appointment.objects.create(patient=Patient.objects.create(full_name='Boshqa', phone_number='2'),
+                                           appointment_time=self.times[0])
+        response = self.client.put(self.url, {'move': [{'id': other.pk, 'appointment_time': self.times[1]}],
+                                              'address': 'X'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Patient.objects.get(pk=self.patient.pk).address, 'Eski manzil')  # Tranzaksiya qaytarildi
+
+        response = self.client.put(self.url, {
+            'remove': [self.appointments[0].pk, other.pk],
+            'move': [{'id': self.appointments[1].pk, 'appointment_time': self.times[4]}],
+            'new_appointments': [{'appointment_time': self.times[3]}],
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(Appointment.objects.filter(pk=other.pk).exists())
+        self.assertEqual(sorted(row['appointment_time'] for row in response.data['appointments']),
+                         sorted(PatientDetailSerializer().fields['appointments'].child.fields['appointment_time']
+                                .to_representation(moment) for moment in self.times[2:]))
+
+        response = self.client.put(self.url, {'appointment_set': [], 'remove': [1]}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class PatientSearchTests(TestCase):
+    def test_normalize_name_unifies_spellings(self):
+        self.assertEqual(normalize_name("Oʻktam  G‘ulomov"), 'oktam gulomov')
+        self.assertEqual(normalize_name("O'ktam G'ulomov"), 'oktam gulomov')
+        self.assertEqual(normalize_name('Ўктам Ғуломов'), 'oktam gulomov')
+
+    def test_search_matches_apostrophe_variants(self):
+        user = get_user_model().objects.create_user(username='doctor', password='x', role='doctor')
+        patient = Patient.objects.create(full_name='Oʻktam Gʻulomov', phone_number='901234567')
+        Patient.objects.create(full_name='Boshqa bemor', phone_number='907654321')
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get(reverse('all-patients'), {'search': "o'ktam"})
+        self.assertEqual([row['id'] for row in response.data['results']], [patient.pk])
+
+
+class PhoneLookupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='operator', password='x', role='doctor')
+        cls.patient = Patient.objects.create(full_name='Qo‘ng‘iroq', phone_number='+998 (90) 123-45-67')
+        Patient.objects.create(full_name='Boshqa', phone_number='91 765 43 21')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_normalize_phone(self):
+        for value in ('+998 90 123-45-67', '998901234567', '90 123 45 67', '(90)1234567'):
+            self.assertEqual(normalize_phone(value), '901234567')
+
+    def test_lookup_by_full_number_and_suffix(self):
+        url = reverse('patient-lookup-phone')
+        for phone in ('998901234567', '+998 90 123 45 67', '4567'):
+            response = self.client.get(url, {'phone': phone})
+            self.assertEqual([row['id'] for row in response.data], [self.patient.pk], phone)
+
+    def test_lookup_without_digits_is_400(self):
+        self.assertEqual(self.client.get(reverse('patient-lookup-phone'), {'phone': 'abc'}).status_code, 400)
+
+
+class ReferenceDataCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user(username='u', password='x', role='doctor'))
+        Region.objects.create(name='Toshkent')
+
+    def test_cached_response_and_not_modified(self):
+        url = reverse('region-list')
+        first = self.client.get(url)
+        self.assertEqual(first.data, [{'id': Region.objects.get().pk, 'name': 'Toshkent'}])
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+    def test_save_invalidates_cache(self):
+        url = reverse('region-list')
+        etag = self.client.get(url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            Region.objects.create(name='Samarqand')
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)  # Commit'gacha eski
+        self.assertEqual(len(callbacks), 1)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 2)
+
+
+class PatientStatusCounterTests(TestCase):
+    def counts(self):
+        return dict(PatientStatusCounter.objects.values_list('status', 'count'))
+
+    def test_counters_follow_create_status_change_and_delete(self):
+        patient = Patient.objects.create(full_name='A', phone_number='1', total_payment_due=Decimal('50.00'))
+        Patient.objects.create(full_name='B', phone_number='2', total_payment_due=Decimal('50.00'))
+        self.assertEqual(self.counts(), {'treated': 0, 'debtor': 2, 'paid': 0})
+
+        create_payment(patient.pk, amount=Decimal('50.00'))
+        self.assertEqual(self.counts(), {'treated': 0, 'debtor': 1, 'paid': 1})
+
+        patient = Patient.objects.get(pk=patient.pk)
+        patient.status = 'treated'
+        patient.save()
+        self.assertEqual(self.counts(), {'treated': 1, 'debtor': 1, 'paid': 0})
+
+        patient.delete()
+        self.assertEqual(self.counts(), {'treated': 0, 'debtor': 1, 'paid': 0})
+        self.assertEqual(PatientStatusCounter.compare(), {})
+
+    def test_rows_are_locked_in_status_order(self):
+        for old_status, new_status in (('debtor', 'paid'), ('paid', 'debtor')):
+            with CaptureQueriesContext(connection) as queries:
+                PatientStatusCounter.shift(old_status, new_status)
+            updated = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+            self.assertEqual(len(updated), 2)
+            self.assertIn("'debtor'", updated[0])  # Yo‘nalishdan qat’i nazar debtor < paid
+        self.assertEqual(self.counts(), {'treated': 0, 'debtor': 0, 'paid': 0})
+
+    def test_statistics_endpoint_reads_counters(self):
+        Patient.objects.create(full_name='A', phone_number='1')
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('patient-statistics'))
+        self.assertEqual(response.json(), {'total_patients': 1, 'treated': 0, 'debtor': 1, 'paid': 0})
+
+    def test_check_command_reports_and_fixes_drift(self):
+        Patient.objects.create(full_name='A', phone_number='1')
+        PatientStatusCounter.objects.filter(status='debtor').update(count=7)
+        with self.assertRaises(CommandError):
+            call_command('check_patient_counters', stdout=StringIO(), stderr=StringIO())
+        call_command('check_patient_counters', fix=True, stdout=StringIO())
+        self.assertEqual(self.counts()['debtor'], 1)
+
+
+class DebtAgingReportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='hisobot', password='x', role='doctor')
+        cls.north, cls.south = Region.objects.bulk_create([Region(name='Shimol'), Region(name='Janub')])
+        now = timezone.now()
+
+        def patient(days, due, region=None, **extra):
+            return Patient.objects.create(full_name='Bemor', phone_number='1', region=region,
+                                          total_payment_due=Decimal(due), created_at=now - timedelta(days=days),
+                                          **extra)
+
+        patient(10, '1000', cls.north)  # 0–30
+        paid_recently = patient(200, '500', cls.north)  # Oxirgi to‘lovdan 45 kun: 31–60
+        for days, amount in ((120, '50'), (45, '50')):
+            payment = PatientPayment.objects.create(patient=paid_recently, amount=Decimal(amount))
+            PatientPayment.objects.filter(pk=payment.pk).update(payment_date=now - timedelta(days=days))
+        patient(75, '50')  # Hududsiz, 61–90
+        patient(100, '300', cls.south)  # 90+
+        PatientPayment.objects.create(patient=patient(100, '80', cls.south), amount=Decimal('80'))  # Qarzi yo‘q
+        patient(5, '999', cls.south, is_deleted=True)  # O‘chirilgan
+        PatientDebtSummary.refresh()  # PostgreSQL'da materialized view migratsiyada bo‘sh holda yaratilgan
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('debt-aging-report')
+
+    @skipUnless(connection.vendor == 'postgresql', "Materialized view faqat PostgreSQL'da")
+    def test_report_is_stale_until_refresh(self):
+        before = self.client.get(self.url).data
+        Patient.objects.create(full_name='Yangi', phone_number='2', total_payment_due=Decimal('25'))
+        self.assertEqual(self.client.get(self.url).data['total'], before['total'])
+
+        PatientDebtSummary.refresh()
+        after = self.client.get(self.url).data
+        self.assertEqual(after['total']['patients'], before['total']['patients'] + 1)
+        self.assertEqual(after['total']['days_0_30'], before['total']['days_0_30'] + Decimal('25'))
+        self.assertGreaterEqual(after['refreshed_at'], before['refreshed_at'])
+
+    def test_totals_by_age_bucket(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['groups'], [])
+        self.assertIsNotNone(response.data['refreshed_at'])
+        self.assertEqual(response.data['total'], {
+            'patients': 4, 'total': Decimal('1750.00'), 'days_0_30': Decimal('1000.00'),
+            'days_31_60': Decimal('400.00'), 'days_61_90': Decimal('50.00'), 'days_90_plus': Decimal('300.00'),
+        })
+
+    def test_grouped_by_region(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {'group_by': 'region'})
+        groups = {group['name']: group for group in response.data['groups']}
+        self.assertEqual(list(groups), ['Shimol', 'Janub', None])  # Qarz bo‘yicha kamayish tartibida
+        self.assertEqual((groups['Shimol']['patients'], groups['Shimol']['total']), (2, Decimal('1400.00')))
+        self.assertEqual(groups['Janub']['days_90_plus'], Decimal('300.00'))
+        self.assertEqual(response.data['total']['total'], Decimal('1750.00'))
+
+        self.assertEqual(self.client.get(self.url, {'group_by': 'status'}).status_code, 400)
+
+    def test_refresh_command(self):
+        # SQLite'da view jonli, buyruq faqat yig‘madagi qatorlar sonini ko‘rsatadi
+        out = StringIO()
+        call_command('refresh_debt_summary', stdout=out)
+        self.assertIn('4 ta', out.getvalue())
+        self.assertEqual(PatientDebtSummary.objects.get(patient__region=self.north, last_payment_at=None).debt_since,
+                         Patient.objects.get(region=self.north, total_paid=0).created_at)
+
+
+class AppointmentCalendarTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='calendar', password='x', role='doctor')
+        cls.tomorrow = timezone.localdate() + timedelta(days=1)
+        region, disease = Region.objects.create(name='Toshkent'), TypeDisease.objects.create(name='Akne')
+        for i in range(5):
+            patient = Patient.objects.create(full_name=f'Bemor {i}', phone_number=str(i), region=region,
+                                             type_disease=disease)
+            # Mahalliy kun chegaralari: 00:00 va 23:59 ertangi kunga, keyingi kunning 00:00 si esa unga kirmaydi
+            for moment in (time(0, 0), time(23, 59)):
+                Appointment.objects.create(patient=patient, appointment_time=timezone.make_aware(
+                    datetime.combine(cls.tomorrow, moment)))
+        Appointment.objects.create(patient=patient, appointment_time=timezone.make_aware(
+            datetime.combine(cls.tomorrow + timedelta(days=1), time.min)))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_calendar_buckets_by_local_day_in_one_query(self):
+        end = self.tomorrow + timedelta(days=2)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('appointment-calendar'),
+                                       {'start': self.tomorrow.isoformat(), 'end': end.isoformat()})
+        days = response.data['days']
+        self.assertEqual([(d['appointment_count'], d['patient_count']) for d in days], [(10, 5), (1, 1), (0, 0)])
+        self.assertEqual(days[0]['patients'][0]['region']['name'], 'Toshkent')
+
+    def test_tomorrow_wrappers(self):
+        self.assertEqual(len(self.client.get('/monitoring/tomorrow-appointments/').data), 5)
+        self.assertEqual(self.client.get('/monitoring/tomorrow-appointments-count/').data['tomorrow_patient_count'], 5)
+
+    def test_invalid_range_is_400(self):
+        url = reverse('appointment-calendar')
+        self.assertEqual(self.client.get(url, {'start': '2025-02-30'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'start': '2025-03-02', 'end': '2025-03-01'}).status_code, 400)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), JOBS={'EAGER': True})
+class ThumbnailTests(TestCase):
+    def photo(self):
+        buffer = BytesIO()
+        Image.new('RGB', (2000, 1500), 'red').save(buffer, 'JPEG')
+        return SimpleUploadedFile('face.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+    def test_photo_change_generates_thumbnails_and_list_uses_them(self):
+        with self.captureOnCommitCallbacks(execute=True):  # EAGER rejim: commit'dan keyin
+            patient = Patient.objects.create(full_name='Rasm', phone_number='1', photo=self.photo())
+        patient.refresh_from_db()
+        with Image.open(patient.photo_small) as small:
+            self.assertEqual(max(small.size), 160)
+        self.assertTrue(patient.photo_small.name.startswith('patients/photos/thumbs/'))
+
+        data = PatientSerializer(patient).data
+        self.assertEqual(data['photo'], patient.photo_small.url)
+        self.assertEqual(data['photo_medium'], patient.photo_medium.url)
+
+    @override_settings(JOBS={'EAGER': False})
+    def test_thumbnails_are_queued_after_commit_only_when_photo_changes(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            patient = Patient.objects.create(full_name='Rasm', phone_number='1', photo=self.photo())
+        self.assertEqual(len(callbacks), 1)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            patient.full_name = 'Rasm 2'
+            patient.save()
+        self.assertEqual(callbacks, [])
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), JOBS={'EAGER': True})
+class PhotoUploadTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user(username='u', password='x', role='doctor'))
+        self.patient = Patient.objects.create(full_name='Rasm', phone_number='1')
+        self.url = reverse('patient-photo-upload', args=[self.patient.pk])
+
+    def jpeg(self):
+        buffer = BytesIO()
+        Image.new('RGB', (640, 480), 'blue').save(buffer, 'JPEG')
+        return SimpleUploadedFile('face.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+    def test_multipart_upload_stores_photo(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, {'photo': self.jpeg()}, format='multipart')
+        self.assertEqual(response.status_code, 200)
+        self.patient.refresh_from_db()
+        self.assertTrue(self.patient.photo.name.startswith('patients/photos/patient_'))
+        self.assertTrue(self.patient.photo_small)  # Thumbnail vazifasi (EAGER rejimda commit'dan keyin)
+
+    def test_rejects_non_image(self):
+        fake = SimpleUploadedFile('face.jpg', b'not an image at all', content_type='image/jpeg')
+        response = self.client.post(self.url, {'photo': fake}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(PATIENT_PHOTO_MAX_UPLOAD_SIZE=1024)
+    def test_rejects_oversized_upload(self):
+        response = self.client.post(self.url, {'photo': self.jpeg()}, format='multipart')
+        self.assertEqual(response.status_code, 413)
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='export', password='x', role='doctor')
+        region = Region.objects.create(name='Samarqand')
+        cls.patient = Patient.objects.create(full_name='Ali, "Vali"', phone_number='901234567', region=region,
+                                             total_payment_due=Decimal('100'))
+        Patient.objects.create(full_name='Boshqa', phone_number='1', status='treated')
+        PatientPayment.objects.create(patient=cls.patient, amount=Decimal('40'))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_csv_streams_filtered_rows(self):
+        response = self.client.get('/monitoring/exports/patients.csv', {'status': 'debtor'},
+                                   HTTP_ACCEPT='text/csv')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn('"Ali, ""Vali"""', lines[1])
+        self.assertIn('Samarqand', lines[1])
+        self.assertIn('60', lines[1])
+
+    def test_csv_neutralizes_formulas(self):
+        Patient.objects.create(full_name='=HYPERLINK("http://x")', phone_number='+998901234567')
+        response = self.client.get('/monitoring/exports/patients.csv', {'status': 'debtor'})
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        self.assertIn('"\'=HYPERLINK(""http://x"")"', content)
+        self.assertIn("'+998901234567", content)
+        self.assertIn(',60.00,', content)  # Sonlar o‘zgarmaydi
+
+    def test_xlsx_is_valid_zip(self):
+        response = self.client.get('/monitoring/exports/payments.xlsx')
+        archive = zipfile.ZipFile(BytesIO(b''.join(response.streaming_content)))
+        self.assertIsNone(archive.testzip())
+        sheet = archive.read('xl/worksheets/sheet1.xml').decode()
+        self.assertEqual(sheet.count('<row>'), 2)
+        self.assertIn('<t xml:space="preserve">Ali, "Vali"</t>', sheet)
+
+    def test_asgi_response_streams_asynchronously(self):
+        from rest_framework_simplejwt.tokens import AccessToken
+        response = async_to_sync(self.async_client.get)(
+            '/monitoring/exports/patients.csv', AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        self.assertTrue(response.is_async)
+
+        async def read():
+            return b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(async_to_sync(read)().decode('utf-8-sig').splitlines()), 3)
+
+    def test_closing_stream_ends_transaction(self):
+        # Klient uzilganda cursor ochiq qolmasligi kerak: atomic blok generator bilan birga yopiladi
+        depth = len(connection.savepoint_ids)
+        header, rows = patient_rows()
+        next(rows)
+        self.assertEqual(len(connection.savepoint_ids), depth + 1)
+        rows.close()
+        self.assertEqual(len(connection.savepoint_ids), depth)
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.client.get('/monitoring/exports/users.csv').status_code, 404)
+        self.assertEqual(self.client.get('/monitoring/exports/patients.pdf').status_code, 404)
+        self.assertEqual(self.client.get('/monitoring/exports/patients.csv', {'date_from': 'x'}).status_code, 400)
+
+
+class PatientImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = get_user_model().objects.create_user(username='admin', password='x', role='admin', is_staff=True)
+        cls.region = Region.objects.create(name='Buxoro')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_json_import_with_nested_rows_and_errors(self):
+        records = [
+            {'full_name': 'Ali Valiyev', 'phone_number': '+998 90 123-45-67', 'region': 'buxoro',
+             'total_payment_due': '100', 'created_at': '2020-01-05T10:00:00Z',
+             'appointments': [{'appointment_time': '2020-01-06T10:00:00Z'}],
+             'payments': [{'amount': '60', 'payment_date': '2020-01-05T11:00:00Z'}, {'amount': '40'}]},
+            {'full_name': 'Xato', 'phone_number': '1', 'region': 'Yo‘q viloyat'},
+            {'full_name': 'Qarzdor', 'phone_number': '2', 'region': self.region.pk, 'total_payment_due': '50'},
+        ]
+        with self.assertNumQueries(9):  # Qatorlar sonidan qat’i nazar o‘zgarmas
+            response = self.client.post(reverse('patient-import'), records, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['created'], response.data['failed']), (2, 1))
+        self.assertEqual(response.data['errors'][0]['row'], 2)
+        self.assertIn('region', response.data['errors'][0]['errors'])
+
+        patient = Patient.objects.get(full_name='Ali Valiyev')
+        self.assertEqual((patient.status, patient.total_paid, patient.remaining_debt), ('paid', 100, 0))
+        self.assertEqual((patient.phone_digits, patient.search_name), ('901234567', 'ali valiyev'))
+        self.assertEqual(patient.created_at.year, 2020)
+        self.assertEqual(patient.appointments.count(), 1)
+        self.assertEqual(sorted(p.payment_date.year == 2020 for p in patient.payments.all()), [False, True])
+        self.assertEqual(Patient.objects.get(full_name='Qarzdor').status, 'debtor')
+        self.assertEqual(PatientStatusCounter.compare(), {})
+
+    def test_csv_file_and_command(self):
+        content = ('full_name,phone_number,region,total_payment_due,appointments,payments\n'
+                   'Vali,901112233,Buxoro,10,2024-01-01 10:00;2024-02-01 10:00,5@2024-01-01 10:00;5\n'
+                   ',1,,,,\n')
+        response = self.client.post(reverse('patient-import'), {
+            'file': SimpleUploadedFile('patients.csv', content.encode(), content_type='text/csv')})
+        self.assertEqual((response.data['created'], response.data['failed']), (1, 1))
+        self.assertIn('full_name', response.data['errors'][0]['errors'])
+        patient = Patient.objects.get(full_name='Vali')
+        self.assertEqual((patient.status, patient.appointments.count(), patient.payments.count()), ('paid', 2, 2))
+
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as file:
+            file.write(content)
+        out = StringIO()
+        call_command('import_patients', file.name, '--dry-run', stdout=out, stderr=StringIO())
+        self.assertIn('1 ta qator to‘g‘ri', out.getvalue())
+        self.assertEqual(Patient.objects.filter(full_name='Vali').count(), 1)
+
+    def test_malformed_csv_is_rejected(self):
+        content = 'full_name,phone_number\n"' + 'x' * (csv.field_size_limit() + 1) + '",1\n'
+        response = self.client.post(reverse('patient-import'), {
+            'file': SimpleUploadedFile('patients.csv', content.encode(), content_type='text/csv')})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Patient.objects.exists())
+
+    def test_admin_only(self):
+        self.client.force_authenticate(get_user_model().objects.create_user(username='d', password='x', role='doctor'))
+        self.assertEqual(self.client.post(reverse('patient-import'), [], format='json').status_code, 403)
+
+
+class AsyncViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='async', password='x', role='doctor')
+        region = Region.objects.create(name='Xorazm')
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        for i in range(3):
+            patient = Patient.objects.create(full_name=f'Bemor {i}', phone_number=f'90000000{i}', region=region,
+                                             total_payment_due=Decimal('10'))
+            Appointment.objects.create(patient=patient, appointment_time=timezone.make_aware(
+                datetime.combine(tomorrow, time(10, i))))
+        Patient.objects.create(full_name='Davolangan', phone_number='1', status='treated')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def auth_headers(self):
+        from rest_framework_simplejwt.tokens import AccessToken
+        return {'AUTHORIZATION': f'Bearer {AccessToken.for_user(self.user)}'}
+
+    async def test_responses_match_sync_views(self):
+        for sync_path, async_path in [
+            ('/monitoring/patients/statistics/', '/monitoring/async/patients/statistics/'),
+            ('/monitoring/tomorrow-appointments/', '/monitoring/async/tomorrow-appointments/'),
+            ('/monitoring/tomorrow-appointments-count/', '/monitoring/async/tomorrow-appointments-count/'),
+            ('/monitoring/patients/all/?page_size=2&page=2', '/monitoring/async/patients/all/?page_size=2&page=2'),
+            ('/monitoring/patients/debtor/?search=bemor', '/monitoring/async/patients/debtor/?search=bemor'),
+            ('/monitoring/patients/all/?search=bemor&ordering=-full_name',
+             '/monitoring/async/patients/all/?search=bemor&ordering=-full_name'),
+            ('/monitoring/patients/treated/', '/monitoring/async/patients/treated/'),
+        ]:
+            expected = (await sync_to_async(self.client.get)(sync_path)).json()
+            response = await self.async_client.get(async_path, headers=self.auth_headers())
+            self.assertEqual(response.status_code, 200, async_path)
+            # Sahifa havolalari faqat yo‘l prefiksi bilan farq qiladi
+            self.assertEqual(json.loads(response.content.decode().replace('/async/', '/')), expected, async_path)
+
+    async def test_authentication_and_errors(self):
+        self.assertEqual((await self.async_client.get('/monitoring/async/patients/all/')).status_code, 401)
+        response = await self.async_client.get('/monitoring/async/patients/all/',
+                                               headers={'AUTHORIZATION': 'Bearer invalid'})
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.get('/monitoring/async/patients/all/?page=9', headers=self.auth_headers())
+        self.assertEqual(response.status_code, 404)
+        response = await self.async_client.post('/monitoring/async/patients/all/', headers=self.auth_headers())
+        self.assertEqual(response.status_code, 405)
+
+
+@override_settings(SQL_INSTRUMENTATION={'SAMPLE_RATE': 1.0, 'N_PLUS_ONE_THRESHOLD': 3})
+class SQLInstrumentationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='sql', password='x', role='admin', is_staff=True)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_fingerprint_ignores_values(self):
+        self.assertEqual(fingerprint("SELECT * FROM t WHERE id = 5 AND name = 'a''b' AND x IN (%s, %s, %s)"),
+                         fingerprint("SELECT * FROM t WHERE id = 7 AND name = 'c' AND x IN (%s)"))
+
+    def test_server_timing_and_n_plus_one_log(self):
+        response = self.client.get(reverse('patient-statistics'))
+        self.assertRegex(response['Server-Timing'], r'^db;desc="1 queries";dur=[\d.]+, total;dur=[\d.]+$')
+
+        with self.assertLogs('Dr.sql', 'WARNING') as logs:
+            self.client.post(reverse('patient-import'), [
+                {'full_name': 'A', 'phone_number': '1', 'status': status} for status in ('paid', 'debtor', 'treated')
+            ], format='json')
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['path'], reverse('patient-import'))
+        self.assertIn('monitoring_patientstatuscounter', record['n_plus_one'][0]['sql'])
+
+    @override_settings(SQL_INSTRUMENTATION={'SAMPLE_RATE': 0})
+    def test_unsampled_requests_are_untouched(self):
+        self.assertNotIn('Server-Timing', self.client.get(reverse('patient-statistics')))
+
+    async def test_async_view_queries_are_counted(self):
+        response = await self.async_client.get('/monitoring/async/patients/statistics/')
+        self.assertIn('db;desc="1 queries"', response['Server-Timing'])
+
+
+class JSONRenderingTests(TestCase):
+    def test_orjson_renderer_matches_drf_output(self):
+        tashkent = zoneinfo.ZoneInfo('Asia/Tashkent')
+        data = ReturnDict({
+            'amount': Decimal('12.50'), 'utc': datetime(2025, 3, 1, 9, 30, tzinfo=dt_timezone.utc),
+            'local': datetime(2025, 3, 1, 14, 30, 0, 123456, tzinfo=tashkent), 'naive': datetime(2025, 3, 1),
+            'day': datetime(2025, 3, 1).date(), 'time': time(10, 15), 'uuid': uuid.UUID(int=1),
+            'lazy': gettext_lazy('Bemor'), 'rows': (1, 'Oʻktam', None, True), 'ids': {1: 'a'},
+            'separators': 'a\u2028b\u2029', 'empty': [],
+        }, serializer=None)
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_indent_falls_back_to_drf_renderer(self):
+        self.assertEqual(ORJSONRenderer().render({'a': [1]}, 'application/json; indent=2'),
+                         JSONRenderer().render({'a': [1]}, 'application/json; indent=2'))
+
+    def test_parser(self):
+        parser = ORJSONParser()
+        self.assertEqual(parser.parse(BytesIO('{"ism": "Oʻktam", "n": 1.5}'.encode())), {'ism': 'Oʻktam', 'n': 1.5})
+        with self.assertRaises(ParseError):
+            parser.parse(BytesIO(b'{"a": NaN}'))
+
+
+class CompressionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='gzip', password='x', role='doctor')
+        for i in range(30):
+            Patient.objects.create(full_name=f'Bemor {i}', phone_number=f'90{i:07}')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('all-patients') + '?page_size=30'
+
+    def test_negotiated_encoding(self):
+        plain = self.client.get(self.url)
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertEqual(plain['Vary'].split(', ')[-1], 'Accept-Encoding')
+
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+
+        self.assertTrue(response.content[3] & gzip.FNAME)  # BREACH: tasodifiy uzunlikdagi fayl nomi to‘ldirmasi
+
+        # Brotli ishlatilmaydi (to‘ldirma qo‘shib bo‘lmaydi)
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip;q=0.5, br')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertNotIn('Content-Encoding', self.client.get(self.url, HTTP_ACCEPT_ENCODING='br'))
+
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip;q=0, br;q=0')
+        self.assertNotIn('Content-Encoding', response)
+
+    def test_encoded_response_has_own_strong_etag(self):
+        plain = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['ETag'], plain[:-1] + '-gzip"')
+
+        revalidated = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated['ETag'], response['ETag'])
+        revalidated = self.client.get(self.url, HTTP_IF_NONE_MATCH=plain)
+        self.assertEqual((revalidated.status_code, revalidated['ETag']), (304, plain))
+
+    def test_gzip_without_credentials(self):
+        body = json.dumps([{'id': i, 'full_name': f'Bemor {i}'} for i in range(100)]).encode()
+        middleware = CompressionMiddleware(lambda request: HttpResponse(body, content_type='application/json'))
+        response = middleware(RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip;q=0.5, br'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), body)
+
+    def test_negotiate_encoding(self):
+        self.assertEqual(negotiate_encoding('br, gzip;q=0.1'), 'gzip')
+        self.assertEqual(negotiate_encoding('*'), 'gzip')
+        self.assertIsNone(negotiate_encoding('br'))
+        self.assertIsNone(negotiate_encoding('identity'))
+        self.assertIsNone(negotiate_encoding('*, gzip;q=0'))
+
+    def test_threshold_and_opt_out(self):
+        url = reverse('all-patients') + '?page_size=2'
+        small = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertLess(len(small.content), 1024)
+        self.assertNotIn('Content-Encoding', small)
+        with override_settings(RESPONSE_COMPRESSION={'MIN_SIZE': 100}):
+            small = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(small['Content-Encoding'], 'gzip')
+
+        export = self.client.get('/monitoring/exports/patients.csv', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', export)
+
+
+class DatasetGeneratorTests(TestCase):
+    def test_generated_data_is_consistent(self):
+        call_command('generate_dataset', patients=30, payments=100, appointments=50, batch_size=7, stdout=StringIO())
+        self.assertEqual((Patient.objects.count(), PatientPayment.objects.count(), Appointment.objects.count()),
+                         (30, 100, 50))
+        self.assertEqual(PatientStatusCounter.compare(), {})
+        for patient in Patient.objects.exclude(status='treated'):
+            paid = sum(payment.amount for payment in patient.payments.all())
+            self.assertEqual(patient.total_paid, paid)
+            self.assertEqual(patient.status, 'paid' if patient.total_payment_due <= paid else 'debtor')
+        self.assertTrue(Patient.objects.filter(created_at__lt=timezone.now() - timedelta(days=1)).exists())
+
+    def test_percentiles(self):
+        values = list(range(1, 101))
+        self.assertEqual([percentile(values, p) for p in (50, 95, 99)], [50, 95, 99])
+        self.assertIsNone(percentile([], 50))
+
+
+class QueryBudgetMixin:
+    """
+    So‘rovlar soni byudjeti: blok ichida bajarilgan SQL so‘rovlar `budget` dan oshsa, test barcha
+    so‘rovlar ro‘yxati va takrorlangan ko‘rinishlar (N+1 belgisi) bilan yiqiladi.
+    """
+    IGNORED_QUERY_PREFIXES = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT')
+
+    @contextmanager
+    def assertMaxQueries(self, budget, label=''):
+        with CaptureQueriesContext(connection) as context:
+            yield context
+        queries = [query['sql'] for query in context.captured_queries
+                   if not query['sql'].startswith(self.IGNORED_QUERY_PREFIXES)]
+        if len(queries) <= budget:
+            return
+        lines = [f'{label}: {len(queries)} ta so‘rov, byudjet {budget}']
+        lines += [f'{number:>3}. {sql}' for number, sql in enumerate(queries, 1)]
+        repeated = [(shape, count) for shape, count in Counter(map(fingerprint, queries)).most_common() if count > 1]
+        if repeated:
+            lines.append('Takrorlangan so‘rovlar:')
+            lines += [f'  ×{count} {shape}' for shape, count in repeated]
+        self.fail('\n'.join(lines))
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    """
+    Har bir endpoint uchun so‘rovlar soni byudjeti. Byudjet natija hajmiga bog‘liq emas:
+    xuddi shu testlar `QueryBudget100RowsTests` da 100 qatorli ma’lumot bilan qayta ishlaydi.
+    """
+    rows = 1
+    BUDGETS = {
+        'regions': 1, 'diseases': 1,  # Kesh bo‘sh bo‘lganda
+        'patient-list': 3, 'patient-list-cursor': 2, 'patient-search': 3, 'lookup-phone': 1,
+        'patient-list-304': 1, 'patient-detail-304': 1,  # Faqat updated_at
+        'patient-create': 4, 'patient-update': 5, 'patient-photo': 4, 'patient-delete': 3,
+        'patient-detail': 3, 'payment-create': 2, 'payment-delete': 3, 'update-status': 4,
+        'statistics': 1, 'calendar': 1, 'tomorrow': 1, 'tomorrow-count': 1, 'export': 1,
+        'import': 8,  # SQLite'da 100 bemorli INSERT parametrlar chegarasi sababli uchga bo‘linadi (PostgreSQL'da 6)
+        # Async view'lar: +1 JWT bo‘yicha foydalanuvchi
+        'async-statistics': 2, 'async-list': 3, 'async-tomorrow': 2, 'async-tomorrow-count': 2,
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='budget', password='x', role='admin',
+                                                        is_staff=True, is_superuser=True)
+        region, disease = Region.objects.create(name='Navoiy'), TypeDisease.objects.create(name='Akne')
+        cls.tomorrow = timezone.localdate() + timedelta(days=1)
+        tomorrow_at = timezone.make_aware(datetime.combine(cls.tomorrow, time(10)))
+        for i in range(cls.rows):
+            patient = Patient.objects.create(full_name=f'Bemor {i}', phone_number=f'90{i:07d}', region=region,
+                                             type_disease=disease, total_payment_due=Decimal('1000'))
+            Appointment.objects.create(patient=patient, appointment_time=tomorrow_at)
+            PatientPayment.objects.create(patient=patient, amount=Decimal('10'))
+        cls.patient = patient
+        Appointment.objects.bulk_create([Appointment(patient=patient, appointment_time=tomorrow_at)] * cls.rows)
+        PatientPayment.objects.bulk_create([PatientPayment(patient=patient, amount=Decimal('1'))] * cls.rows)
+        cls.payment = PatientPayment.objects.filter(patient=patient).first()
+        cls.paid = Patient.objects.create(full_name='To‘lagan', phone_number='1', region=region)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def check(self, name, method, path, data=None, **kwargs):
+        with self.assertMaxQueries(self.BUDGETS[name], f'{name} ({self.rows} qator)'):
+            response = getattr(self.client, method)(path, data, **kwargs)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertLess(response.status_code, 400, name)
+        return response
+
+    def appointments(self):
+        tomorrow_at = timezone.make_aware(datetime.combine(self.tomorrow, time(9))).isoformat()
+        return [{'appointment_time': tomorrow_at}] * self.rows
+
+    def test_reference_data(self):
+        self.check('regions', 'get', '/monitoring/regions/')
+        self.check('diseases', 'get', '/monitoring/diseases/')
+
+    def test_patient_lists(self):
+        for path in ('all', 'debtor', 'under-treatment', 'treated'):
+            self.check('patient-list', 'get', f'/monitoring/patients/{path}/', {'page_size': 100})
+        self.check('patient-list-cursor', 'get', '/monitoring/patients/all/', {'pagination': 'cursor', 'page_size': 100})
+        self.check('patient-search', 'get', '/monitoring/patients/all/', {'search': 'bemor', 'page_size': 100})
+        etag = self.client.get('/monitoring/patients/all/', {'page_size': 100})['ETag']
+        response = self.check('patient-list-304', 'get', '/monitoring/patients/all/', {'page_size': 100},
+                              HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.check('lookup-phone', 'get', '/monitoring/patients/lookup-phone/', {'phone': '90'})
+
+    def test_patient_writes(self):
+        response = self.check('patient-create', 'post', '/monitoring/patients/create/', {
+            'full_name': 'Yangi', 'phone_number': '5', 'appointments': self.appointments()}, format='json')
+        patient_id = response.data['id']
+        removed = list(Appointment.objects.filter(patient_id=patient_id).values_list('id', flat=True))
+        self.check('patient-update', 'put', f'/monitoring/patients/update/{patient_id}/', {
+            'full_name': 'Yangilangan', 'remove': removed, 'new_appointments': self.appointments()}, format='json')
+        image = BytesIO()
+        Image.new('RGB', (50, 50)).save(image, 'PNG')
+        self.check('patient-photo', 'post', f'/monitoring/patients/{patient_id}/photo/',
+                   {'photo': SimpleUploadedFile('a.png', image.getvalue(), content_type='image/png')},
+                   format='multipart')
+        self.check('patient-delete', 'delete', f'/monitoring/patients/{patient_id}/delete/')
+
+    def test_patient_detail_and_payments(self):
+        etag = self.check('patient-detail', 'get', f'/monitoring/patients/{self.patient.pk}/')['ETag']
+        response = self.check('patient-detail-304', 'get', f'/monitoring/patients/{self.patient.pk}/',
+                              HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.check('payment-create', 'post', f'/monitoring/patients/{self.patient.pk}/payments/', {'amount': '5'})
+        self.check('payment-delete', 'delete', f'/monitoring/patients/{self.patient.pk}/payments/{self.payment.pk}/')
+        Patient.objects.filter(pk=self.paid.pk).update(status='paid')
+        self.check('update-status', 'patch', f'/monitoring/patients/{self.paid.pk}/update-status/')
+
+    def test_dashboard(self):
+        self.check('statistics', 'get', '/monitoring/patients/statistics/')
+        self.check('calendar', 'get', '/monitoring/appointments/calendar/', {'start': self.tomorrow.isoformat()})
+        self.check('tomorrow', 'get', '/monitoring/tomorrow-appointments/')
+        self.check('tomorrow-count', 'get', '/monitoring/tomorrow-appointments-count/')
+
+    def test_export_and_import(self):
+        for dataset in ('patients', 'payments', 'appointments'):
+            self.check('export', 'get', f'/monitoring/exports/{dataset}.csv')
+        self.check('import', 'post', '/monitoring/patients/import/', [
+            {'full_name': f'Import {i}', 'phone_number': str(i), 'region': 'Navoiy',
+             'appointments': self.appointments()[:1], 'payments': [{'amount': '1'}]}
+            for i in range(self.rows)
+        ], format='json')
+
+    def test_async_views(self):
+        from rest_framework_simplejwt.tokens import AccessToken
+        headers = {'AUTHORIZATION': f'Bearer {AccessToken.for_user(self.user)}'}
+        for name, path in [
+            ('async-statistics', '/monitoring/async/patients/statistics/'),
+            ('async-list', '/monitoring/async/patients/all/?page_size=100'),
+            ('async-tomorrow', '/monitoring/async/tomorrow-appointments/'),
+            ('async-tomorrow-count', '/monitoring/async/tomorrow-appointments-count/'),
+        ]:
+            with self.assertMaxQueries(self.BUDGETS[name], f'{name} ({self.rows} qator)'):
+                # Sync testdan chaqiriladi: async ORM so‘rovlari shu oqimning ulanishida bajariladi
+                response = async_to_sync(self.async_client.get)(path, headers=headers)
+            self.assertEqual(response.status_code, 200)
+
+
+class QueryBudget100RowsTests(QueryBudgetTests):
+    rows = 100
@@ -0,0 +1,66 @@
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image, ImageOps, features
+
+from jobs.queue import job
+
+# Ro‘yxatlar uchun kichik va planshet kartochkalari uchun o‘rtacha nusxa (eng katta tomon, px)
+THUMBNAIL_SIZES = {
+    'photo_small': 160,
+    'photo_medium': 480,
+}
+THUMBNAIL_FORMAT, THUMBNAIL_EXTENSION = ('WEBP', 'webp') if features.check('webp') else ('JPEG', 'jpg')
+THUMBNAIL_QUALITY = 80
+
+
+def render_thumbnail(image, size):
+    """Rasmni `size` ichiga sig‘adigan qilib kichraytirish va WebP (yoki JPEG) baytlarini qaytarish"""
+    thumbnail = ImageOps.exif_transpose(image)
+    thumbnail = thumbnail.convert('RGB')
+    thumbnail.thumbnail((size, size), Image.LANCZOS)
+    buffer = BytesIO()
+    thumbnail.save(buffer, THUMBNAIL_FORMAT, quality=THUMBNAIL_QUALITY)
+    return buffer.getvalue()
+
+
+@job(name='monitoring.make_thumbnails')
+def make_thumbnails(patient_id):
+    """
+    Fon vazifasi: bemor rasmining kichik nusxalarini yaratish va saqlash (`patients/photos/thumbs/`).
+    Ish davomida rasm almashtirilgan bo‘lsa, natija yozilmaydi (yangi rasm uchun alohida vazifa bor).
+    """
+    from .models import Patient
+
+    patient = Patient.objects.filter(pk=patient_id).only('id', 'photo', *THUMBNAIL_SIZES).first()
+    if patient is None:
+        return
+    old_files = [getattr(patient, name) for name in THUMBNAIL_SIZES if getattr(patient, name)]
+
+    thumbnails = {name: None for name in THUMBNAIL_SIZES}
+    if patient.photo:
+        base_name = os.path.splitext(os.path.basename(patient.photo.name))[0]
+        with patient.photo.open('rb') as source, Image.open(source) as image:
+            image.load()
+            for name, size in THUMBNAIL_SIZES.items():
+                field_file = getattr(patient, name)
+                field_file.save(f'{base_name}_{size}.{THUMBNAIL_EXTENSION}',
+                                ContentFile(render_thumbnail(image, size)), save=False)
+                thumbnails[name] = field_file.name
+
+    same_photo = Q(photo=patient.photo.name) if patient.photo else Q(photo__isnull=True) | Q(photo='')
+    updated = Patient.objects.filter(same_photo, pk=patient_id).update(**thumbnails, updated_at=timezone.now())
+    if updated:
+        for field_file in old_files:
+            field_file.storage.delete(field_file.name)
+    else:
+        for name in filter(None, thumbnails.values()):
+            patient.photo.storage.delete(name)
+
+
+def schedule_thumbnails(patient_id):
+    """Thumbnail'larni so‘rov oqimidan tashqarida (fon vazifalari navbatida) yaratish"""
+    make_thumbnails.delay(patient_id)
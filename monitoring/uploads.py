@@ -0,0 +1,59 @@
+import os
+
+import filetype
+from django.conf import settings
+from django.core.files.uploadhandler import StopUpload, TemporaryFileUploadHandler
+from PIL import Image, UnidentifiedImageError
+from rest_framework.exceptions import ValidationError
+
+ALLOWED_PHOTO_TYPES = ('jpg', 'png', 'webp')
+MAX_PHOTO_PIXELS = 50_000_000  # ~50 MP: telefon kameralari uchun yetarli, "decompression bomb" emas
+
+
+def max_photo_upload_size():
+    return getattr(settings, 'PATIENT_PHOTO_MAX_UPLOAD_SIZE', 10 * 1024 * 1024)
+
+
+class LimitedTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """
+    Faylni bo‘laklab (64 KB) to‘g‘ridan-to‘g‘ri diskka yozadi va hajm chegarasidan oshsa yuklashni to‘xtatadi,
+    shuning uchun worker xotirasi fayl hajmiga bog‘liq bo‘lmaydi.
+    """
+
+    def __init__(self, request=None, max_size=None):
+        super().__init__(request)
+        self.max_size = max_size or max_photo_upload_size()
+        self.received = 0
+        self.exceeded = False
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.max_size:
+            self.exceeded = True
+            raise StopUpload(connection_reset=True)
+        return super().receive_data_chunk(raw_data, start)
+
+
+def validate_photo(uploaded):
+    """
+    Rasm turini faylning boshidagi baytlar (magic number) bo‘yicha, o‘lchamini esa faqat sarlavhani
+    o‘qib tekshirish (rasm to‘liq decode qilinmaydi). Saqlash uchun fayl kengaytmasini qaytaradi.
+    """
+    kind = filetype.guess(uploaded)
+    if kind is None or kind.extension not in ALLOWED_PHOTO_TYPES:
+        raise ValidationError({"photo": "Faqat JPEG, PNG yoki WebP rasm yuklash mumkin"})
+
+    uploaded.seek(0)
+    try:
+        with Image.open(uploaded) as image:  # Faqat sarlavha o‘qiladi, piksellar decode qilinmaydi
+            width, height = image.size
+    except (UnidentifiedImageError, OSError):
+        raise ValidationError({"photo": "Rasm fayli buzilgan"})
+    if width * height > MAX_PHOTO_PIXELS:
+        raise ValidationError({"photo": "Rasm o‘lchami juda katta"})
+    uploaded.seek(0)
+    return kind.extension
+
+
+def photo_filename(patient, extension):
+    return f'patient_{patient.pk}_{os.urandom(4).hex()}.{extension}'
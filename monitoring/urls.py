@@ -1,11 +1,16 @@
 from django.urls import path
+
+from . import async_views
 from .views import PatientCreateView, PatientDetailView, TreatedPatientsListView, UnderTreatmentPatientsListView, \
     PatientDeleteView, PatientUpdateView, DebtorPatientsListView, AllPatientsListView, \
     PatientPaymentCreateView, PatientPaymentDeleteView, UpdatePatientStatusView, PatientStatisticsView, \
-    RegionListAPIView, TypeDiseaseListAPIView, TomorrowAppointmentsView, TomorrowAppointmentsCountView
+    RegionListAPIView, TypeDiseaseListAPIView, TomorrowAppointmentsView, TomorrowAppointmentsCountView, \
+    PatientPhoneLookupView, AppointmentCalendarView, PatientPhotoUploadView, ExportView, \
+    PatientImportView, DebtAgingReportView
 
 urlpatterns = [
     path('patients/statistics/', PatientStatisticsView.as_view(), name='patient-statistics'),
+    path('reports/debt-aging/', DebtAgingReportView.as_view(), name='debt-aging-report'),
 
     path('regions/', RegionListAPIView.as_view(), name='region-list'),
     path('diseases/', TypeDiseaseListAPIView.as_view(), name='disease-list'),
@@ -16,11 +21,14 @@ urlpatterns = [
     path('patients/under-treatment/', UnderTreatmentPatientsListView.as_view(), name='under-treatment-patients'),
     path('patients/debtor/', DebtorPatientsListView.as_view(), name='debtor-patients'),
     path('patients/all/', AllPatientsListView.as_view(), name='all-patients'),  # Barcha bemorlar API
+    path('patients/lookup-phone/', PatientPhoneLookupView.as_view(), name='patient-lookup-phone'),
 
     path('patients/<int:pk>/', PatientDetailView.as_view(), name='patient-detail'),
 
     path('patients/update/<int:pk>/', PatientUpdateView.as_view(), name='patient-detail'),
 
+    path('patients/<int:pk>/photo/', PatientPhotoUploadView.as_view(), name='patient-photo-upload'),
+
     path('patients/<int:pk>/delete/', PatientDeleteView.as_view(), name='patient-delete'),
 
     path('patients/<int:pk>/payments/', PatientPaymentCreateView.as_view(), name='patient-payment-create'),
@@ -28,7 +36,21 @@ urlpatterns = [
 
     path('patients/<int:pk>/update-status/', UpdatePatientStatusView.as_view(), name='update-patient-status'),
 
+    path('appointments/calendar/', AppointmentCalendarView.as_view(), name='appointment-calendar'),
     path('tomorrow-appointments/', TomorrowAppointmentsView.as_view(), name='tomorrow-appointments'),
     path('tomorrow-appointments-count/', TomorrowAppointmentsCountView.as_view(), name='tomorrow-appointments'),
 
+    path('patients/import/', PatientImportView.as_view(), name='patient-import'),
+    path('exports/<str:dataset>.<str:extension>', ExportView.as_view(), name='export'),
+
+    # Dashboard'ni tez-tez so‘raydigan klientlar uchun async (ASGI) nusxalar, javoblari yuqoridagilar bilan bir xil
+    path('async/patients/statistics/', async_views.patient_statistics, name='async-patient-statistics'),
+    path('async/patients/all/', async_views.patient_list, name='async-all-patients'),
+    path('async/patients/debtor/', async_views.patient_list, {'status': 'debtor'}, name='async-debtor-patients'),
+    path('async/patients/under-treatment/', async_views.patient_list, {'status': 'paid'},
+         name='async-under-treatment-patients'),
+    path('async/patients/treated/', async_views.patient_list, {'status': 'treated'}, name='async-treated-patients'),
+    path('async/tomorrow-appointments/', async_views.tomorrow_appointments, name='async-tomorrow-appointments'),
+    path('async/tomorrow-appointments-count/', async_views.tomorrow_appointments_count,
+         name='async-tomorrow-appointments-count'),
 ]
@@ -1,50 +1,90 @@
+import math
 from collections import defaultdict
 
-from django.utils.timezone import now, timedelta
-from django.db.models import Q, Count
+from django.utils.dateparse import parse_date
+from django.utils.timezone import localdate, timedelta
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models import Max
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 from django_filters.rest_framework import DjangoFilterBackend
 
 from rest_framework.views import APIView
 from rest_framework.generics import ListAPIView, RetrieveAPIView, CreateAPIView, DestroyAPIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
-from rest_framework.filters import SearchFilter, OrderingFilter
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.filters import OrderingFilter
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 
-from .models import Patient, PatientPayment, TypeDisease, Region, Appointment
+from Dr.renderers import ORJSONParser
+
+from .appointments import appointment_calendar, appointments_between
+from .cache import get_reference_data, patient_etag
+from .exports import EXPORTS, EXPORT_FORMATS, aiterate
+from .importers import BATCH_SIZE, import_patients, parse_records
+from .models import Patient, PatientDebtSummary, PatientPayment, PatientStatusCounter
+from .pagination import PatientPagination, PatientKeysetPagination
+from .planner import plan_queryset
+from .search import PatientSearchFilter, phone_lookup_filter
+from .services import create_payment, delete_payment
+from .uploads import LimitedTemporaryFileUploadHandler, max_photo_upload_size, photo_filename, validate_photo
 from .serializers import PatientSerializer, PatientCreateSerializer, PatientDetailSerializer, PatientUpdateSerializer, \
-    PatientPaymentSerializer, RegionSerializer, TypeDiseaseSerializer
+    PatientPaymentSerializer, PATIENT_LIST_VALUES, serialize_patient_values
 
 
-class PatientPagination(PageNumberPagination):
+def set_validators(response, etag, updated_at):
     """
-    Bemorlar ro‘yxati uchun pagination
+    ETag va Last-Modified sarlavhalari; klient har safar ular bilan tekshirib oladi.
+    Last-Modified faqat ma’lumot uchun (keyingi butun soniyaga yaxlitlanadi): `If-Modified-Since` bo‘yicha
+    304 berilmaydi, qayta tekshirish faqat ETag bilan.
     """
-    page_size = 10  # Har bir sahifada 10 ta bemor chiqadi
-    page_size_query_param = 'page_size'  # Foydalanuvchi o‘zi sonni belgilashi mumkin
-    max_page_size = 100  # Maksimal 100 ta bemor
+    response['ETag'] = etag
+    if updated_at:
+        response['Last-Modified'] = http_date(math.ceil(updated_at.timestamp()))
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
 
 
-# Regionlar ro‘yxatini olish uchun API
-class RegionListAPIView(APIView):
+def not_modified(request, etag, updated_at):
+    """
+    `If-None-Match` bo‘yicha klientdagi nusxa eskirmagan bo‘lsa 304 javob, aks holda None.
+    `If-Modified-Since` ataylab e’tiborga olinmaydi: u soniya aniqligida (o‘sha soniyadagi keyingi tahrir
+    ko‘rinmay qoladi), ma’lumotnoma nomi o‘zgarishi va qattiq o‘chirishni ham sezmaydi.
+    ETag bularning hammasini hisobga oladi.
+    """
+    response = get_conditional_response(request, etag=etag)
+    return response and set_validators(response, etag, updated_at)
+
+
+class ReferenceDataView(APIView):
+    """
+    Keshlangan ma’lumotnoma (region, kasallik turi) ro‘yxati.
+    Kuchli ETag qaytaradi (siqilgan javobda CompressionMiddleware unga `-gzip` qo‘shadi, u ham kuchli),
+    `If-None-Match` mos kelsa `304 Not Modified` beriladi.
+    """
     permission_classes = [IsAuthenticated]
+    reference_name = None
 
     def get(self, request):
-        regions = Region.objects.all()
-        serializer = RegionSerializer(regions, many=True)
-        return Response(serializer.data)
+        etag, data = get_reference_data(self.reference_name)
+        response = get_conditional_response(request, etag=etag) or Response(data)
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)  # Har safar ETag bilan tekshirilsin
+        return response
 
 
-# Kasallik turlari ro‘yxatini olish uchun API
-class TypeDiseaseListAPIView(APIView):
-    permission_classes = [IsAuthenticated]
+# Regionlar ro‘yxatini olish uchun API
+class RegionListAPIView(ReferenceDataView):
+    reference_name = 'regions'
 
-    def get(self, request):
-        diseases = TypeDisease.objects.all()
-        serializer = TypeDiseaseSerializer(diseases, many=True)
-        return Response(serializer.data)
+
+# Kasallik turlari ro‘yxatini olish uchun API
+class TypeDiseaseListAPIView(ReferenceDataView):
+    reference_name = 'diseases'
 
 
 class BasePatientListView(ListAPIView):
@@ -54,25 +94,48 @@ class BasePatientListView(ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = PatientSerializer
     pagination_class = PatientPagination  # Pagination qo‘shildi
-    filter_backends = [SearchFilter, OrderingFilter, DjangoFilterBackend]
-    search_fields = ['full_name', 'phone_number']
+    filter_backends = [PatientSearchFilter, OrderingFilter, DjangoFilterBackend]  # `?search=` ism/telefon
     ordering_fields = ['full_name']
+    keyset_pagination_class = PatientKeysetPagination  # `?pagination=cursor` yoki `?cursor=...` bo‘lganda
+
+    @property
+    def paginator(self):
+        """
+        Eski klientlar uchun sahifa raqamli pagination saqlanadi, cursor rejimi so‘rov bo‘yicha yoqiladi
+        """
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params
+            use_keyset = 'cursor' in params or params.get('pagination') == 'cursor'
+            self._paginator = (self.keyset_pagination_class if use_keyset else self.pagination_class)()
+        return self._paginator
 
     def get_status_queryset(self, status):
         """
         Statusga qarab filterlaydigan umumiy metod
         """
-        queryset = Patient.active_patients().filter(status=status).select_related('region',
-                                                                                  'type_disease').prefetch_related(
-            'appointments')
-        search_query = self.request.query_params.get("search", None)
-
-        if search_query:
-            queryset = queryset.filter(
-                Q(full_name__icontains=search_query) | Q(phone_number__icontains=search_query)
-            )
+        return Patient.active_patients().filter(status=status)
 
-        return queryset
+    def list(self, request, *args, **kwargs):
+        """
+        Tezkor yo‘l: faqat PatientSerializer kerak qiladigan ustunlar (hudud va kasallik nomlari JOIN bilan)
+        values() orqali o‘qiladi, javob esa to‘g‘ridan-to‘g‘ri lug‘atlardan yig‘iladi.
+        Ro‘yxatga kiradigan har qanday o‘zgarish (yangi bemor, status, soft delete, to‘lov, rasm) biror bemorning
+        `updated_at` ini oshiradi, shuning uchun validator — indeks bo‘yicha bitta MAX(updated_at). Qattiq
+        o‘chirish uni o‘zgartirmaydi: buni ETag'dagi ro‘yxat versiyasi (post_delete signalida oshadi) qoplaydi.
+        """
+        updated_at = Patient.objects.aggregate(updated_at=Max('updated_at'))['updated_at']
+        etag = patient_etag(updated_at)
+        response = not_modified(request, etag, updated_at)
+        if response is not None:
+            return response
+
+        queryset = self.filter_queryset(self.get_queryset()).values(*PATIENT_LIST_VALUES)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            response = self.get_paginated_response(serialize_patient_values(page, request))
+        else:
+            response = Response(serialize_patient_values(queryset, request))
+        return set_validators(response, etag, updated_at)
 
 
 class AllPatientsListView(BasePatientListView):
@@ -80,8 +143,7 @@ class AllPatientsListView(BasePatientListView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Patient.active_patients().select_related('region', 'type_disease').prefetch_related(
-            'appointments').order_by('-created_at')
+        return Patient.active_patients().order_by('-created_at')
 
 
 class DebtorPatientsListView(BasePatientListView):
@@ -108,6 +170,24 @@ class TreatedPatientsListView(BasePatientListView):
         return self.get_status_queryset('treated').order_by('-created_at')
 
 
+class PatientPhoneLookupView(APIView):
+    """
+    Qo‘ng‘iroq qilgan raqam (yoki uning oxirgi raqamlari) bo‘yicha bemorni tezkor topish API.
+    Faqat telefon indeksidagi ustunlar o‘qiladi.
+    """
+    permission_classes = [IsAuthenticated]
+    max_results = 20
+
+    def get(self, request):
+        phone_filter = phone_lookup_filter(request.query_params.get('phone', ''))
+        if phone_filter is None:
+            return Response({"error": "phone parametri kerak"}, status=status.HTTP_400_BAD_REQUEST)
+
+        patients = Patient.active_patients().filter(phone_filter).values(
+            'id', 'full_name', 'phone_number', 'status')[:self.max_results]
+        return Response(list(patients))
+
+
 class PatientCreateView(APIView):
     """
     Bemor yaratish API
@@ -124,19 +204,59 @@ class PatientCreateView(APIView):
 
 class PatientUpdateView(APIView):
     """
-    Bemorni yangilash API
+    Bemorni yangilash API (uchrashuvlar `appointment_set` yoki remove/move/new_appointments bilan).
+    Bemor qatori tranzaksiya oxirigacha qulflanadi: parallel tahrirlar bir-birining farqini buzmaydi.
     """
     permission_classes = [IsAuthenticated]
 
     def put(self, request, pk):
-        patient = get_object_or_404(Patient.active_patients(), pk=pk)
-        serializer = PatientUpdateSerializer(patient, data=request.data, partial=True)
-        if serializer.is_valid():
-            patient = serializer.save()
-            return Response(serializer.data, status=status.HTTP_200_OK)
+        with transaction.atomic():
+            patient = get_object_or_404(Patient.active_patients().select_for_update(), pk=pk)
+            serializer = PatientUpdateSerializer(patient, data=request.data, partial=True)
+            if serializer.is_valid():
+                patient = serializer.save()
+                return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class PatientPhotoUploadView(APIView):
+    """
+    Bemor rasmini multipart/form-data (`photo` maydoni) orqali yuklash API.
+    Fayl diskka oqim bilan yoziladi (base64 JSON'dagidek xotirada bir necha nusxa saqlanmaydi).
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, pk):
+        patient = get_object_or_404(Patient.active_patients(), pk=pk)
+
+        max_size = max_photo_upload_size()
+        try:
+            content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            content_length = 0
+        if content_length > max_size:
+            return Response({"error": f"Fayl hajmi {max_size // (1024 * 1024)} MB dan oshmasligi kerak"},
+                            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+        # request.data o‘qilishidan oldin: fayl faqat diskka, hajm chegarasi bilan yoziladi
+        handler = LimitedTemporaryFileUploadHandler(request._request, max_size=max_size)
+        request.upload_handlers = [handler]
+        uploaded = request.FILES.get('photo')
+        if handler.exceeded:
+            return Response({"error": f"Fayl hajmi {max_size // (1024 * 1024)} MB dan oshmasligi kerak"},
+                            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        if uploaded is None:
+            return Response({"photo": "Rasm fayli yuborilmadi"}, status=status.HTTP_400_BAD_REQUEST)
+
+        extension = validate_photo(uploaded)
+        patient.photo.save(photo_filename(patient, extension), uploaded, save=False)
+        patient.save(update_fields=['photo'])  # Thumbnail'lar fon oqimida yaratiladi
+
+        photo_url = request.build_absolute_uri(patient.photo.url)
+        return Response({"id": patient.pk, "photo": photo_url}, status=status.HTTP_200_OK)
+
+
 class PatientDeleteView(APIView):
     """
     Faqat superuser uchun bemorni o‘chirish
@@ -151,18 +271,30 @@ class PatientDeleteView(APIView):
 
 class PatientDetailView(APIView):
     """
-    Bemorning batafsil ma’lumotlarini qaytaruvchi API
+    Bemorning batafsil ma’lumotlarini qaytaruvchi API.
+    ETag/Last-Modified qaytaradi; ETag mos kelsa bitta `updated_at` so‘rovi bilan 304 beriladi.
     """
 
     # permission_classes = [IsAuthenticated]
 
     def get(self, request, pk):
+        context = {'request': request}
+        # `is_superuser` maydoni foydalanuvchiga bog‘liq, shuning uchun ETag'ga kiradi
+        etag_parts = (PatientDetailSerializer(context=context).get_is_superuser(None),)
+        if 'HTTP_IF_NONE_MATCH' in request.META:
+            updated_at = Patient.active_patients().filter(pk=pk).values_list('updated_at', flat=True).first()
+            if updated_at is None:
+                raise Http404
+            response = not_modified(request, patient_etag(updated_at, *etag_parts), updated_at)
+            if response is not None:
+                return response
+
+        # JOIN/prefetch va ustunlar serializer maydonlaridan olinadi
         patient = get_object_or_404(
-            Patient.active_patients().prefetch_related('appointments', 'payments').select_related('region',
-                                                                                                  'type_disease'), pk=pk
-        )
-        serializer = PatientDetailSerializer(patient, context={'request': request})
-        return Response(serializer.data, status=status.HTTP_200_OK)
+            plan_queryset(Patient.active_patients(), PatientDetailSerializer, fields=('updated_at',)), pk=pk)
+        serializer = PatientDetailSerializer(patient, context=context)
+        response = Response(serializer.data, status=status.HTTP_200_OK)
+        return set_validators(response, patient_etag(patient.updated_at, *etag_parts), patient.updated_at)
 
 
 class PatientPaymentCreateView(CreateAPIView):
@@ -175,9 +307,8 @@ class PatientPaymentCreateView(CreateAPIView):
 
     def perform_create(self, serializer):
         patient_id = self.kwargs.get("pk")  # URL orqali patient_id ni olish
-        patient = get_object_or_404(Patient.active_patients(), pk=patient_id)  # Agar topilmasa, 404 qaytarish
-        serializer.save(patient=patient)  # To‘lovga bemorni qo‘shish
-        patient.update_status()  # Qarzni yangilash
+        # Bemor topilmasa 404, aks holda to‘lov va qarz/status bitta tranzaksiyada yoziladi
+        serializer.instance = create_payment(patient_id, **serializer.validated_data)
 
 
 class PatientPaymentDeleteView(DestroyAPIView):
@@ -189,14 +320,9 @@ class PatientPaymentDeleteView(DestroyAPIView):
     queryset = PatientPayment.objects.all()
     serializer_class = PatientPaymentSerializer
 
-    def delete(self, request, *args, **kwargs):
-        payment = self.get_object()
-        patient = payment.patient  # Bemorni olish
-
-        response = super().delete(request, *args, **kwargs)  # To‘lovni o‘chirish
-
-        patient.update_status()  # Qarzni qayta hisoblash
-        return response
+    def delete(self, request, pk, payment_id):
+        delete_payment(pk, payment_id)  # Qarz va status shu tranzaksiyaning o‘zida qaytariladi
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 class UpdatePatientStatusView(APIView):
@@ -224,16 +350,62 @@ class PatientStatisticsView(APIView):
     # permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        total_patients = Patient.active_patients().count()
-
-        # Default qiymatlar bilan status hisoblash
-        status_counts = defaultdict(int, dict(Patient.active_patients().values_list('status').annotate(Count('id'))))
-
-        return Response({
-            "total_patients": total_patients,
+        # Hisoblagichlar jadvalidan o‘qiladi (bemorlar jadvali sanalmaydi)
+        return Response(self.build_statistics(PatientStatusCounter.objects.values_list('status', 'count')))
+
+    @staticmethod
+    def build_statistics(status_counts):
+        """`(status, soni)` juftliklaridan javob (yo‘q statuslar 0 bilan)"""
+        status_counts = defaultdict(int, status_counts)
+        return {
+            "total_patients": sum(status_counts.values()),
             "treated": status_counts["treated"],
             "debtor": status_counts["debtor"],
             "paid": status_counts["paid"]
+        }
+
+
+class DebtAgingReportView(APIView):
+    """
+    Qolgan qarzlar yoshi bo‘yicha hisobot: 0–30, 31–60, 61–90 va 90+ kun (oxirgi to‘lovdan, to‘lov
+    bo‘lmasa bemor yaratilgan sanadan beri). `?group_by=region|type_disease` bilan guruhlanadi.
+    Davriy yangilanadigan yig‘madan o‘qiladi: `refreshed_at` — ma’lumotlar qachon hisoblangani.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        group_by = request.query_params.get('group_by') or None
+        if group_by is not None and group_by not in PatientDebtSummary.GROUP_FIELDS:
+            return Response({"error": f"group_by faqat {', '.join(PatientDebtSummary.GROUP_FIELDS)} bo‘lishi mumkin"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return Response({"group_by": group_by, **PatientDebtSummary.aging(group_by)})
+
+
+class AppointmentCalendarView(APIView):
+    """
+    Sana oralig‘i (`?start=YYYY-MM-DD&end=YYYY-MM-DD`, ikkalasi ham kiradi) bo‘yicha uchrashuvlar taqvimi.
+    Har bir kun uchun uchrashuvlar soni, bemorlar soni va bemorlar ro‘yxati qaytadi.
+    """
+    permission_classes = [IsAuthenticated]
+    max_days = 92  # Bir so‘rovda ko‘pi bilan ~3 oy
+
+    def get(self, request):
+        try:
+            start = parse_date(request.query_params.get('start', ''))
+            end = parse_date(request.query_params['end']) if 'end' in request.query_params else start
+        except ValueError:
+            start = end = None
+        if start is None or end is None or end < start:
+            return Response({"error": "start va end sanalari YYYY-MM-DD ko‘rinishida bo‘lishi kerak"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if (end - start).days >= self.max_days:
+            return Response({"error": f"Oraliq {self.max_days} kundan oshmasligi kerak"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "days": appointment_calendar(start, end, request),
         })
 
 
@@ -246,15 +418,9 @@ class TomorrowAppointmentsView(APIView):
     # permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        tomorrow = now().date() + timedelta(days=1)  # Ertangi sana (faqat kun)
-
-        # Ertangi uchrashuvi bor bemorlarni olish
-        patients = Patient.active_patients().filter(appointments__appointment_time__date=tomorrow).distinct()
-
-        # JSON formatga o'tkazish
-        response_data = PatientSerializer(patients, many=True, context={'request': request}).data
-
-        return Response(response_data)
+        tomorrow = localdate() + timedelta(days=1)  # Ertangi sana (faqat kun)
+        day, = appointment_calendar(tomorrow, tomorrow, request)
+        return Response(day['patients'])
 
 
 class TomorrowAppointmentsCountView(APIView):
@@ -265,9 +431,73 @@ class TomorrowAppointmentsCountView(APIView):
     # permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        tomorrow = now().date() + timedelta(days=1)  # Ertangi sana
-        patient_count = Appointment.objects.filter(appointment_time__date=tomorrow,
-                                                   patient__is_deleted=False).values_list("patient",
-                                                                                          flat=True).distinct().count()
+        tomorrow = localdate() + timedelta(days=1)  # Ertangi sana
+        patient_count = appointments_between(tomorrow, tomorrow).values_list("patient", flat=True).distinct().count()
 
         return Response({"tomorrow_patient_count": patient_count})
+
+
+class ExportView(APIView):
+    """
+    Bemorlar, to‘lovlar yoki uchrashuvlarni CSV/XLSX ko‘rinishida oqim bilan eksport qilish API.
+    `/exports/<patients|payments|appointments>.<csv|xlsx>?status=&region=&date_from=&date_to=`
+    Qatorlar server tomonidagi cursor orqali bo‘laklab o‘qiladi, fayl xotirada yig‘ilmaydi.
+    """
+    permission_classes = [IsAuthenticated]
+    compression = False  # Oqim bilan beriladi, xlsx esa o‘zi zip
+
+    def perform_content_negotiation(self, request, force=False):
+        # Fayl Accept sarlavhasidan qat’i nazar beriladi, xatolar esa odatdagidek JSON'da
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, dataset, extension):
+        if dataset not in EXPORTS or extension not in EXPORT_FORMATS:
+            return Response({"error": "Bunday eksport yo‘q"}, status=status.HTTP_404_NOT_FOUND)
+
+        params = request.query_params
+        try:
+            date_from, date_to = (parse_date(params[key]) if params.get(key) else None
+                                  for key in ('date_from', 'date_to'))
+        except ValueError:
+            date_from = date_to = None
+        if bool(params.get('date_from')) != bool(date_from) or bool(params.get('date_to')) != bool(date_to):
+            return Response({"error": "date_from va date_to sanalari YYYY-MM-DD ko‘rinishida bo‘lishi kerak"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        region = params.get('region')
+        if region and not region.isdigit():
+            return Response({"error": "region ID bo‘lishi kerak"}, status=status.HTTP_400_BAD_REQUEST)
+
+        header, rows = EXPORTS[dataset](status=params.get('status'), region=region,
+                                        date_from=date_from, date_to=date_to)
+        content_type, stream = EXPORT_FORMATS[extension]
+        chunks = stream(header, rows, dataset) if extension == 'xlsx' else stream(header, rows)
+        if isinstance(request._request, ASGIRequest):
+            chunks = aiterate(chunks)  # ASGI sync iteratorni oxirigacha xotiraga o‘qiydi
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{dataset}-{localdate().isoformat()}.{extension}"'
+        return response
+
+
+class PatientImportView(APIView):
+    """
+    Bemorlarni (uchrashuvlar va to‘lovlari bilan) ommaviy import qilish API.
+    JSON massiv yoki multipart `file` (CSV/JSON) qabul qilinadi; `?dry_run=1` faqat tekshiradi.
+    Qatorlar paketlab tekshiriladi va `bulk_create` bilan yoziladi, xatolar qator raqami bilan qaytadi.
+    """
+    permission_classes = [permissions.IsAdminUser]  # Faqat admin
+    parser_classes = [ORJSONParser, MultiPartParser]
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        try:
+            records = parse_records(upload.read(), upload.content_type) if upload else request.data
+        except ValueError:
+            return Response({"error": "Fayl CSV yoki JSON massiv bo‘lishi kerak"}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(records, list):
+            return Response({"error": "Bemorlar ro‘yxati (massiv) kutilgan edi"}, status=status.HTTP_400_BAD_REQUEST)
+
+        dry_run = request.query_params.get('dry_run') in ('1', 'true')
+        result = import_patients(records, batch_size=BATCH_SIZE, dry_run=dry_run)
+        if dry_run:
+            return Response(result, status=status.HTTP_200_OK)
+        return Response(result, status=status.HTTP_201_CREATED if result['created'] else status.HTTP_400_BAD_REQUEST)